@@ -20,6 +20,7 @@ if str(BASE_DIR) not in sys.path:  # pragma: no cover - runtime path setup
 
 from app.config import get_settings
 from app.database import Base
+from app.models import POSTGRES_ONLY_OBJECTS, TRANSCRIPT_PARTITION_PREFIX
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +33,16 @@ target_metadata = Base.metadata
 settings = get_settings()
 
 
+def _include_object(obj, name, type_, reflected, compare_to) -> bool:  # type: ignore[no-untyped-def]
+    """Keep autogenerate from dropping migration-managed objects absent from the models."""
+
+    if not reflected or compare_to is not None:
+        return True
+    if type_ == "table" and name.startswith(TRANSCRIPT_PARTITION_PREFIX):
+        return False
+    return name not in POSTGRES_ONLY_OBJECTS
+
+
 def _make_sync_url(url: str) -> str:
     if url.startswith("postgresql+asyncpg"):
         return url.replace("postgresql+asyncpg", "postgresql", 1)
@@ -48,6 +59,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=_include_object,
     )
 
     with context.begin_transaction():
@@ -98,7 +110,12 @@ def run_migrations_online() -> None:
     )
 
     async def _run_migrations(connection: Connection) -> None:
-        context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            include_object=_include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
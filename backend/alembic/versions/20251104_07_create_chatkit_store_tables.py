@@ -0,0 +1,73 @@
+"""create durable chatkit thread and item tables"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20251104_07"
+down_revision = "20251103_06"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chatkit_threads",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False
+        ),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_chatkit_threads_user_id_created_at",
+        "chatkit_threads",
+        ["user_id", "created_at", "id"],
+    )
+
+    op.create_table(
+        "chatkit_thread_items",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("thread_id", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False
+        ),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["thread_id"], ["chatkit_threads.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_chatkit_thread_items_thread_id_created_at",
+        "chatkit_thread_items",
+        ["thread_id", "created_at", "id"],
+    )
+
+    for table in ("chatkit_threads", "chatkit_thread_items"):
+        op.execute(
+            text(
+                f"""
+                CREATE TRIGGER set_updated_at_on_{table}
+                BEFORE UPDATE ON public.{table}
+                FOR EACH ROW
+                EXECUTE FUNCTION public.set_current_timestamp_updated_at();
+                """
+            )
+        )
+
+
+def downgrade() -> None:
+    for table in ("chatkit_thread_items", "chatkit_threads"):
+        op.execute(text(f"DROP TRIGGER IF EXISTS set_updated_at_on_{table} ON public.{table}"))
+    op.drop_index("ix_chatkit_thread_items_thread_id_created_at", table_name="chatkit_thread_items")
+    op.drop_table("chatkit_thread_items")
+    op.drop_index("ix_chatkit_threads_user_id_created_at", table_name="chatkit_threads")
+    op.drop_table("chatkit_threads")
@@ -0,0 +1,60 @@
+"""add keyset pagination indexes to chat transcript messages"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20251105_08"
+down_revision = "20251104_07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so large transcript tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_transcript_messages_user_thread_created",
+            "chat_transcript_messages",
+            ["user_id", "thread_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_chat_transcript_messages_user_created",
+            "chat_transcript_messages",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Superseded by the composite indexes, which lead with user_id.
+        op.drop_index(
+            "ix_chat_transcript_messages_user_id",
+            table_name="chat_transcript_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_transcript_messages_user_id",
+            "chat_transcript_messages",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_transcript_messages_user_created",
+            table_name="chat_transcript_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_transcript_messages_user_thread_created",
+            table_name="chat_transcript_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
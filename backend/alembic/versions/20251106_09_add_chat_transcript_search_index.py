@@ -0,0 +1,41 @@
+"""add full-text search column and index to chat transcript messages"""
+
+from __future__ import annotations
+
+from alembic import op
+from sqlalchemy import text
+
+
+revision = "20251106_09"
+down_revision = "20251105_08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A stored generated column keeps the tsvector in step with every insert and
+    # update without triggers; adding it rewrites the table once.
+    op.execute(
+        text(
+            """
+            ALTER TABLE public.chat_transcript_messages
+            ADD COLUMN IF NOT EXISTS message_tsv tsvector
+            GENERATED ALWAYS AS (to_tsvector('english', message)) STORED
+            """
+        )
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            text(
+                """
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_transcript_messages_message_tsv
+                ON public.chat_transcript_messages USING gin (message_tsv)
+                """
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(text("DROP INDEX CONCURRENTLY IF EXISTS public.ix_chat_transcript_messages_message_tsv"))
+    op.execute(text("ALTER TABLE public.chat_transcript_messages DROP COLUMN IF EXISTS message_tsv"))
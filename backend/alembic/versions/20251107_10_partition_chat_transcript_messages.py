@@ -0,0 +1,154 @@
+"""partition chat transcript messages by month on created_at"""
+
+from __future__ import annotations
+
+from alembic import op
+from sqlalchemy import text
+
+
+revision = "20251107_10"
+down_revision = "20251106_09"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = "id, user_id, thread_id, item_id, role, message, created_at, updated_at"
+# Matches TRANSCRIPT_PARTITION_MONTHS_AHEAD; the app keeps partitions topped up from then on.
+_MONTHS_AHEAD = 3
+
+_CREATE_TABLE = """
+    CREATE TABLE public.chat_transcript_messages (
+        id uuid NOT NULL DEFAULT gen_random_uuid(),
+        user_id uuid NOT NULL REFERENCES public.users (id) ON DELETE CASCADE,
+        thread_id varchar(255) NOT NULL,
+        item_id varchar(255) NOT NULL,
+        role varchar(32) NOT NULL,
+        message text NOT NULL,
+        created_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        message_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', message)) STORED
+    ){partitioning}
+"""
+
+# One partition per UTC month from the oldest existing row through _MONTHS_AHEAD
+# months from now, named like app.transcript_partitions.partition_name.
+_CREATE_PARTITIONS = f"""
+    DO $$
+    DECLARE
+        first_month date := date_trunc(
+            'month',
+            coalesce(
+                (SELECT min(created_at) FROM public.chat_transcript_messages_unpartitioned),
+                now()
+            ) AT TIME ZONE 'UTC'
+        )::date;
+        last_month date := (
+            date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{_MONTHS_AHEAD} months'
+        )::date;
+    BEGIN
+        WHILE first_month <= last_month LOOP
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.chat_transcript_messages '
+                'FOR VALUES FROM (%L) TO (%L)',
+                'chat_transcript_messages_p' || to_char(first_month, 'YYYYMM'),
+                first_month::text || ' 00:00:00+00',
+                (first_month + interval '1 month')::date::text || ' 00:00:00+00'
+            );
+            first_month := (first_month + interval '1 month')::date;
+        END LOOP;
+    END $$
+"""
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_chat_transcript_messages_thread_id", "chat_transcript_messages", ["thread_id"])
+    op.create_index(
+        "ix_chat_transcript_messages_user_created",
+        "chat_transcript_messages",
+        ["user_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_chat_transcript_messages_user_thread_created",
+        "chat_transcript_messages",
+        ["user_id", "thread_id", "created_at", "id"],
+    )
+    op.execute(
+        text(
+            "CREATE INDEX ix_chat_transcript_messages_message_tsv "
+            "ON public.chat_transcript_messages USING gin (message_tsv)"
+        )
+    )
+    op.execute(
+        text(
+            """
+            CREATE TRIGGER set_updated_at_on_chat_transcript_messages
+            BEFORE UPDATE ON public.chat_transcript_messages
+            FOR EACH ROW
+            EXECUTE FUNCTION public.set_current_timestamp_updated_at();
+            """
+        )
+    )
+
+
+def upgrade() -> None:
+    # Rebuilds the table in one transaction. Transcript writes wait on the lock and
+    # the write-behind queue retries any that time out.
+    op.execute(text("LOCK TABLE public.chat_transcript_messages IN SHARE ROW EXCLUSIVE MODE"))
+    op.execute(
+        text("ALTER TABLE public.chat_transcript_messages RENAME TO chat_transcript_messages_unpartitioned")
+    )
+    op.execute(text(_CREATE_TABLE.format(partitioning=" PARTITION BY RANGE (created_at)")))
+    op.execute(text(_CREATE_PARTITIONS))
+    op.execute(
+        text(
+            f"INSERT INTO public.chat_transcript_messages ({_COLUMNS}) "
+            f"SELECT {_COLUMNS} FROM public.chat_transcript_messages_unpartitioned"
+        )
+    )
+    # Dropping the old table frees its index and constraint names for the new one.
+    op.execute(text("DROP TABLE public.chat_transcript_messages_unpartitioned"))
+
+    # Unique constraints on a partitioned table must include the partition key.
+    op.execute(
+        text(
+            "ALTER TABLE public.chat_transcript_messages "
+            "ADD CONSTRAINT chat_transcript_messages_pkey PRIMARY KEY (id, created_at)"
+        )
+    )
+    op.execute(
+        text(
+            "ALTER TABLE public.chat_transcript_messages "
+            "ADD CONSTRAINT uq_chat_transcript_messages_item_id_created_at UNIQUE (item_id, created_at)"
+        )
+    )
+    _create_indexes()
+
+
+def downgrade() -> None:
+    # Archived (dropped) partitions are not restored; reload them from their archive files if needed.
+    op.execute(text("LOCK TABLE public.chat_transcript_messages IN SHARE ROW EXCLUSIVE MODE"))
+    op.execute(
+        text("ALTER TABLE public.chat_transcript_messages RENAME TO chat_transcript_messages_partitioned")
+    )
+    op.execute(text(_CREATE_TABLE.format(partitioning="")))
+    # item_id becomes unique on its own again, so keep only its latest version.
+    op.execute(
+        text(
+            f"INSERT INTO public.chat_transcript_messages ({_COLUMNS}) "
+            f"SELECT DISTINCT ON (item_id) {_COLUMNS} FROM public.chat_transcript_messages_partitioned "
+            "ORDER BY item_id, updated_at DESC"
+        )
+    )
+    op.execute(text("DROP TABLE public.chat_transcript_messages_partitioned"))
+    op.execute(
+        text(
+            "ALTER TABLE public.chat_transcript_messages "
+            "ADD CONSTRAINT chat_transcript_messages_pkey PRIMARY KEY (id)"
+        )
+    )
+    op.execute(
+        text(
+            "ALTER TABLE public.chat_transcript_messages "
+            "ADD CONSTRAINT uq_chat_transcript_messages_item_id UNIQUE (item_id)"
+        )
+    )
+    _create_indexes()
@@ -0,0 +1,69 @@
+"""align legacy chat transcript created_at with the ChatKit item timestamp"""
+
+from __future__ import annotations
+
+from alembic import op
+from sqlalchemy import text
+
+
+revision = "20251108_11"
+down_revision = "20251107_10"
+branch_labels = None
+depends_on = None
+
+# A legacy item re-saved since the upgrade already has its row at the item's timestamp.
+_DELETE_SUPERSEDED = """
+    DELETE FROM public.chat_transcript_messages AS transcript
+    USING public.chatkit_thread_items AS item
+    WHERE item.id = transcript.item_id
+      AND transcript.created_at <> item.created_at
+      AND EXISTS (
+          SELECT 1 FROM public.chat_transcript_messages AS newer
+          WHERE newer.item_id = item.id AND newer.created_at = item.created_at
+      )
+"""
+
+# Items can predate the oldest partition, so create any month they land in first.
+_CREATE_PARTITIONS = """
+    DO $$
+    DECLARE
+        month date;
+    BEGIN
+        FOR month IN
+            SELECT DISTINCT date_trunc('month', item.created_at AT TIME ZONE 'UTC')::date
+            FROM public.chat_transcript_messages AS transcript, public.chatkit_thread_items AS item
+            WHERE item.id = transcript.item_id AND transcript.created_at <> item.created_at
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS public.%I PARTITION OF public.chat_transcript_messages '
+                'FOR VALUES FROM (%L) TO (%L)',
+                'chat_transcript_messages_p' || to_char(month, 'YYYYMM'),
+                month::text || ' 00:00:00+00',
+                (month + interval '1 month')::date::text || ' 00:00:00+00'
+            );
+        END LOOP;
+    END $$
+"""
+
+_BACKFILL = """
+    UPDATE public.chat_transcript_messages AS transcript
+    SET created_at = item.created_at
+    FROM public.chatkit_thread_items AS item
+    WHERE item.id = transcript.item_id AND transcript.created_at <> item.created_at
+"""
+
+
+def upgrade() -> None:
+    # Rows written before transcripts were keyed by (item_id, created_at) carry the
+    # server's insert time, and re-saving their item would insert a second row under
+    # the item's own timestamp. Items only the in-memory store held cannot be re-saved
+    # after a restart, so only rows backed by chatkit_thread_items need moving.
+    op.execute(text(_DELETE_SUPERSEDED))
+    op.execute(text(_CREATE_PARTITIONS))
+    # Changing the partition key moves each row into its item's monthly partition.
+    op.execute(text(_BACKFILL))
+
+
+def downgrade() -> None:
+    # The original insert times are not kept; transcripts stay keyed by their item timestamps.
+    pass
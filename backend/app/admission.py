@@ -0,0 +1,167 @@
+"""Per-user and global admission control for ChatKit turns."""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable
+
+from .cache import TTLCache
+from .config import get_settings
+from .metrics import LatencyHistogram
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is refused; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Request rejected ({reason}); retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+@dataclass(slots=True)
+class AdmissionStats:
+    admitted: int = 0
+    rejected: Dict[str, int] = field(
+        default_factory=lambda: {"rate": 0, "user_in_flight": 0, "global_in_flight": 0}
+    )
+    peak_in_flight: int = 0
+    hold_seconds: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class Admission:
+    """Slot held by an admitted request; ``release`` is idempotent."""
+
+    __slots__ = ("_controller", "_user_id", "_started_at", "_released")
+
+    def __init__(self, controller: AdmissionController, user_id: Hashable) -> None:
+        self._controller = controller
+        self._user_id = user_id
+        self._started_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self._user_id, time.monotonic() - self._started_at)
+
+
+class AdmissionController:
+    """Admit requests through a per-user token bucket and in-flight caps.
+
+    Each user's bucket refills at ``rate`` requests per second up to
+    ``burst``; ``max_in_flight_per_user`` and ``max_in_flight`` cap concurrent
+    requests per user and for the whole worker. Checks never wait: a request
+    over any limit is rejected immediately with a retry hint, so a noisy
+    tenant cannot queue work ahead of everyone else. A limit of zero disables
+    it. Buckets idle long enough to refill completely are forgotten.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float | None = None,
+        burst: int | None = None,
+        max_in_flight_per_user: int | None = None,
+        max_in_flight: int | None = None,
+        max_users: int = 10_000,
+    ) -> None:
+        settings = get_settings()
+        self._rate = rate if rate is not None else settings.chatkit_rate_limit_per_minute / 60
+        self._burst = float(burst if burst is not None else settings.chatkit_rate_limit_burst)
+        self._max_in_flight_per_user = (
+            max_in_flight_per_user
+            if max_in_flight_per_user is not None
+            else settings.chatkit_max_in_flight_per_user
+        )
+        self._max_in_flight = (
+            max_in_flight if max_in_flight is not None else settings.chatkit_max_in_flight
+        )
+        refill_seconds = self._burst / self._rate if self._rate > 0 else 0
+        self._buckets: TTLCache[Hashable, _Bucket] = TTLCache(
+            maxsize=max_users, ttl=max(1.0, refill_seconds)
+        )
+        self._in_flight: Dict[Hashable, int] = {}
+        self._total_in_flight = 0
+        self.stats = AdmissionStats()
+
+    def acquire(self, user_id: Hashable) -> Admission:
+        """Admit a request for ``user_id`` or raise :class:`AdmissionRejected`."""
+
+        if 0 < self._max_in_flight <= self._total_in_flight:
+            self._reject("global_in_flight", 1.0)
+        if 0 < self._max_in_flight_per_user <= self._in_flight.get(user_id, 0):
+            self._reject("user_in_flight", 1.0)
+        if self._rate > 0 and self._burst > 0:
+            wait = self._take_token(user_id)
+            if wait > 0:
+                self._reject("rate", wait)
+
+        self._in_flight[user_id] = self._in_flight.get(user_id, 0) + 1
+        self._total_in_flight += 1
+        self.stats.admitted += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._total_in_flight)
+        return Admission(self, user_id)
+
+    def _take_token(self, user_id: Hashable) -> float:
+        """Spend one token and return 0, or return the seconds until one is available."""
+
+        now = time.monotonic()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = _Bucket(tokens=self._burst, updated_at=now)
+        else:
+            bucket.tokens = min(self._burst, bucket.tokens + (now - bucket.updated_at) * self._rate)
+            bucket.updated_at = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - bucket.tokens) / self._rate
+        # Re-setting refreshes the expiry, so only fully refilled buckets are dropped.
+        self._buckets.set(user_id, bucket)
+        return wait
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        self.stats.rejected[reason] += 1
+        raise AdmissionRejected(reason, retry_after)
+
+    def _release(self, user_id: Hashable, held_for: float) -> None:
+        remaining = self._in_flight.get(user_id, 0) - 1
+        if remaining > 0:
+            self._in_flight[user_id] = remaining
+        else:
+            self._in_flight.pop(user_id, None)
+        self._total_in_flight = max(0, self._total_in_flight - 1)
+        self.stats.hold_seconds.observe(held_for)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._total_in_flight,
+            "users_in_flight": len(self._in_flight),
+            "peak_in_flight": self.stats.peak_in_flight,
+            "admitted": self.stats.admitted,
+            "rejected": dict(self.stats.rejected),
+            "tracked_users": len(self._buckets),
+            "hold_seconds": self.stats.hold_seconds.snapshot(),
+        }
+
+
+chatkit_admission = AdmissionController()
+"""Process-wide admission controller for ``/chatkit``."""
+
+
+__all__ = ["Admission", "AdmissionController", "AdmissionRejected", "chatkit_admission"]
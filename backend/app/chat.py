@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import time
 from datetime import datetime
@@ -10,20 +9,35 @@ from typing import Any, AsyncIterator
 from uuid import uuid4
 
 from chatkit.server import ChatKitServer
+from chatkit.store import Store
 from chatkit.types import (
     AssistantMessageContent,
+    AssistantMessageContentPartAdded,
+    AssistantMessageContentPartDone,
+    AssistantMessageContentPartTextDelta,
     AssistantMessageItem,
     ErrorEvent,
     ThreadItemAddedEvent,
     ThreadItemDoneEvent,
+    ThreadItemUpdated,
     ThreadMetadata,
     ThreadStreamEvent,
     UserMessageItem,
 )
+from chatkit_stores import create_store, register_backend
 from openai import OpenAIError
 
-from .clients import openai_client
+from .clients import async_openai_client, openai_client
+from .config import get_settings
+from .executors import openai_executor
+from .history import extract_text, fit_token_budget, format_history_item
 from .memory_store import MemoryStore
+from .metrics import observe_upstream
+from .postgres_store import PostgresStore
+from .recall import RecallResult, local_recall
+from .tracing import tracer
+from .transcripts import TranscriptMirroringStore
+from .workflow_poller import workflow_poller
 
 logger = logging.getLogger(__name__)
 
@@ -32,66 +46,43 @@ def _gen_id(prefix: str) -> str:
     return f"{prefix}_{uuid4().hex[:8]}"
 
 
-def _extract_text(parts: Any) -> str:
-    """Coerce a list of ChatKit content parts into plain text."""
-
-    chunks: list[str] = []
-    for part in parts or []:
-        text = getattr(part, "text", None)
-        if isinstance(text, str) and text.strip():
-            chunks.append(text.strip())
-            continue
-        if hasattr(part, "model_dump"):
-            payload = part.model_dump()
-        elif isinstance(part, dict):
-            payload = part
-        else:
-            payload = {}
-        for key in ("text", "value", "output_text", "input_text"):
-            candidate = payload.get(key)
-            if isinstance(candidate, str) and candidate.strip():
-                chunks.append(candidate.strip())
-                break
-    return " ".join(chunks).strip()
-
-
 async def _load_thread_messages(
-    store: MemoryStore,
+    store: Store[dict[str, Any]],
     thread_id: str,
     context: dict[str, Any],
 ) -> list[dict[str, Any]]:
-    """Return conversation history formatted for the Responses API."""
+    """Return conversation history formatted for the Responses API.
+
+    Only the newest messages that fit the configured token budget are sent.
+    Stores with a history cache serve warm threads without reloading items.
+    """
+
+    settings = get_settings()
+    token_budget = settings.chat_history_token_budget
+    cache = store.history_cache if isinstance(store, TranscriptMirroringStore) else None
+    if cache is not None:
+        cached = cache.window(thread_id, token_budget)
+        if cached is not None:
+            return cached
 
-    history: list[dict[str, Any]] = []
+    load_token = cache.begin_load(thread_id) if cache is not None else None
     try:
-        items = await store.load_thread_items(thread_id, after=None, limit=250, order="asc", context=context)
+        page = await store.load_thread_items(
+            thread_id,
+            after=None,
+            limit=settings.chat_history_max_items,
+            order="desc",
+            context=context,
+        )
     except Exception:  # pragma: no cover - defensive guard against store failure
         logger.exception("Failed to load thread history", extra={"thread_id": thread_id})
-        return history
-
-    for item in items.data:
-        role: str | None = None
-        text = ""
-        if isinstance(item, UserMessageItem):
-            role = "user"
-            text = _extract_text(item.content)
-        elif getattr(item, "type", None) == "assistant_message":
-            role = "assistant"
-            text = _extract_text(getattr(item, "content", []))
-
-        if role and text:
-            history.append(
-                {
-                    "role": role,
-                    "content": [
-                        {
-                            "type": "input_text" if role == "user" else "output_text",
-                            "text": text,
-                        }
-                    ],
-                }
-            )
-    return history
+        return []
+
+    items = page.data[::-1]
+    if cache is not None and cache.seed(thread_id, load_token, items):
+        return cache.window(thread_id, token_budget) or []
+    entries = [entry for entry in map(format_history_item, reversed(items)) if entry is not None]
+    return fit_token_budget(entries, token_budget)
 
 
 def _extract_output_text(result: Any) -> str:
@@ -124,7 +115,7 @@ def _extract_output_text(result: Any) -> str:
                 continue
             content = entry_dict.get("content")
             if isinstance(content, list):
-                output_text = _extract_text(content)
+                output_text = extract_text(content)
                 if output_text:
                     output_candidates.append(output_text)
             elif isinstance(content, str) and content.strip():
@@ -142,7 +133,16 @@ def _extract_output_text(result: Any) -> str:
     return "\n\n".join(dict.fromkeys(output_candidates))
 
 
-async def _invoke_workflow(
+def _latest_user_text(messages: list[dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return " ".join(
+                part.get("text", "") for part in message.get("content", []) if isinstance(part, dict)
+            )
+    return ""
+
+
+def _workflow_run_request(
     *,
     workflow_id: str,
     workflow_version: str | None,
@@ -150,13 +150,8 @@ async def _invoke_workflow(
     vector_store_id: str | None,
     user_id: str | None,
     thread_id: str,
-) -> Any:
-    workflows_client = getattr(openai_client, "workflows", None)
-    if workflows_client is None or not hasattr(workflows_client, "runs"):
-        raise RuntimeError("OpenAI client does not expose the workflows surface.")
-
-    runs_client = workflows_client.runs
-
+    recall: RecallResult | None = None,
+) -> dict[str, Any]:
     input_payload: dict[str, Any] = {"messages": messages, "thread_id": thread_id}
     if workflow_version:
         input_payload["workflow_version"] = workflow_version
@@ -164,6 +159,12 @@ async def _invoke_workflow(
         input_payload["vector_store_id"] = vector_store_id
     if user_id:
         input_payload["user_id"] = user_id
+    if recall is not None:
+        # A workflow condition on memory_source can skip File Search when local recall is confident.
+        input_payload["local_memories"] = [
+            {"text": hit.text, "kind": hit.kind, "score": round(hit.score, 4)} for hit in recall.hits
+        ]
+        input_payload["memory_source"] = "local" if recall.confident else "remote"
 
     request_kwargs: dict[str, Any] = {
         "workflow_id": workflow_id,
@@ -171,6 +172,32 @@ async def _invoke_workflow(
     }
     if workflow_version:
         request_kwargs["workflow_version"] = workflow_version
+    return request_kwargs
+
+
+async def _invoke_workflow(request_kwargs: dict[str, Any]) -> Any:
+    with observe_upstream("openai", "workflow_run"):
+        return await _run_workflow(request_kwargs)
+
+
+async def _run_workflow(request_kwargs: dict[str, Any]) -> Any:
+    async_runs_client = getattr(getattr(async_openai_client, "workflows", None), "runs", None)
+    if async_runs_client is not None and callable(getattr(async_runs_client, "retrieve", None)):
+        started_at = time.monotonic()
+        run = await async_runs_client.create(**request_kwargs)
+        return await workflow_poller.wait(
+            async_runs_client,
+            run,
+            workflow_id=request_kwargs["workflow_id"],
+            started_at=started_at,
+        )
+
+    workflows_client = getattr(openai_client, "workflows", None)
+    if workflows_client is None or not hasattr(workflows_client, "runs"):
+        raise RuntimeError("OpenAI client does not expose the workflows surface.")
+
+    runs_client = workflows_client.runs
+    workflow_id = request_kwargs["workflow_id"]
 
     def _call() -> Any:
         if hasattr(runs_client, "create_and_poll"):
@@ -182,14 +209,84 @@ async def _invoke_workflow(
             run = runs_client.retrieve(workflow_id=workflow_id, run_id=run.id)
         return run
 
-    return await asyncio.to_thread(_call)
+    return await openai_executor.run(_call)
+
+
+def _streaming_runs_client() -> Any | None:
+    """Return the async workflow runs client when the SDK can stream runs."""
+
+    workflows_client = getattr(async_openai_client, "workflows", None)
+    runs_client = getattr(workflows_client, "runs", None)
+    if runs_client is None or not callable(getattr(runs_client, "create", None)):
+        return None
+    return runs_client
+
+
+def _event_field(event: Any, name: str) -> Any:
+    if isinstance(event, dict):
+        return event.get(name)
+    return getattr(event, name, None)
+
+
+async def _stream_workflow(runs_client: Any, request_kwargs: dict[str, Any]) -> AsyncIterator[str]:
+    """Yield assistant text deltas from a streamed workflow run.
+
+    Runs whose stream carries no text deltas fall back to the text of the
+    final run payload, which is yielded as a single chunk.
+    """
+
+    streamed_text = False
+    final_run: Any = None
+    with observe_upstream("openai", "workflow_stream"):
+        stream = await runs_client.create(**request_kwargs, stream=True)
+        async for event in stream:
+            event_type = _event_field(event, "type") or ""
+            if event_type.endswith("output_text.delta"):
+                delta = _event_field(event, "delta")
+                if isinstance(delta, str) and delta:
+                    streamed_text = True
+                    yield delta
+            elif event_type.endswith((".failed", ".cancelled", "error")):
+                raise RuntimeError(f"Workflow run stream ended with {event_type}")
+            elif event_type.endswith(".completed"):
+                final_run = _event_field(event, "run") or _event_field(event, "response") or event
+
+    if not streamed_text and final_run is not None:
+        text = _extract_output_text(final_run)
+        if text:
+            yield text
+
+
+# Both replace the shared package's plain backends with the transcript-mirroring variants.
+register_backend("memory", MemoryStore)
+register_backend("postgres", PostgresStore)
+
+
+def _create_store() -> TranscriptMirroringStore:
+    backend = get_settings().chatkit_store_backend
+    try:
+        store = create_store(backend)
+    except ValueError:
+        logger.warning("Unknown ChatKit store backend %r; using in-memory store", backend)
+        return MemoryStore()
+    if not isinstance(store, TranscriptMirroringStore):
+        # Shared backends such as ``sqlite`` do not mirror transcripts for the API.
+        logger.warning(
+            "ChatKit store backend %r does not mirror transcripts; using in-memory store",
+            backend,
+        )
+        return MemoryStore()
+    return store
 
 
 class FactAssistantServer(ChatKitServer[dict[str, Any]]):
     """ChatKit server that forwards requests to an Agent Builder workflow."""
 
-    def __init__(self) -> None:
-        self.store = MemoryStore()
+    # Narrowed from ChatKit's ``Store`` so callers can reach snapshot() and aclose().
+    store: TranscriptMirroringStore
+
+    def __init__(self, store: TranscriptMirroringStore | None = None) -> None:
+        self.store = store or _create_store()
         super().__init__(self.store)
 
     async def respond(
@@ -208,11 +305,15 @@ class FactAssistantServer(ChatKitServer[dict[str, Any]]):
             yield ErrorEvent(message="Chat workflow is not configured.", allow_retry=False)
             return
 
-        messages = await _load_thread_messages(self.store, thread.id, context)
+        tracer.set_trace_attribute("chatkit.thread_id", thread.id)
+        with tracer.span("chat.load_thread_messages") as span:
+            messages = await _load_thread_messages(self.store, thread.id, context)
+            if span is not None:
+                span.set_attribute("chat.history_messages", len(messages))
 
         # Ensure the current user message is included even if the store has not yet persisted it.
         if input_user_message is not None:
-            text = _extract_text(input_user_message.content)
+            text = extract_text(input_user_message.content)
             if text:
                 if not messages or messages[-1]["role"] != "user" or messages[-1]["content"][0]["text"] != text:
                     messages.append(
@@ -222,15 +323,38 @@ class FactAssistantServer(ChatKitServer[dict[str, Any]]):
                         }
                     )
 
+        recall: RecallResult | None = None
+        if user is not None and local_recall.enabled:
+            with tracer.span("recall.local_search") as span:
+                recall = await local_recall.search(
+                    user.id,
+                    _latest_user_text(messages),
+                    k=get_settings().local_recall_top_k,
+                    exclude={input_user_message.id} if input_user_message is not None else (),
+                )
+                if span is not None:
+                    span.set_attribute("recall.hits", len(recall.hits))
+                    span.set_attribute("recall.confident", recall.confident)
+
+        request_kwargs = _workflow_run_request(
+            workflow_id=workflow_id,
+            workflow_version=workflow_version,
+            messages=messages,
+            vector_store_id=vector_store_id,
+            user_id=str(getattr(user, "id", "")) or None,
+            thread_id=thread.id,
+            recall=recall,
+        )
+
+        runs_client = _streaming_runs_client() if get_settings().workflow_streaming else None
+        if runs_client is not None:
+            async for event in self._stream_response(thread, runs_client, request_kwargs):
+                yield event
+            return
+
         try:
-            result = await _invoke_workflow(
-                workflow_id=workflow_id,
-                workflow_version=workflow_version,
-                messages=messages,
-                vector_store_id=vector_store_id,
-                user_id=str(getattr(user, "id", "")) or None,
-                thread_id=thread.id,
-            )
+            with tracer.span("workflow.invoke", attributes={"workflow.id": workflow_id}):
+                result = await _invoke_workflow(request_kwargs)
         except OpenAIError:  # pragma: no cover - network/HTTP errors
             logger.exception("Workflow execution failed")
             yield ErrorEvent(message="Assistant is temporarily unavailable.", allow_retry=True)
@@ -254,6 +378,7 @@ class FactAssistantServer(ChatKitServer[dict[str, Any]]):
             yield ErrorEvent(message="Assistant returned an empty response.", allow_retry=True)
             return
 
+        # ChatKitServer persists the item when it sees ThreadItemDoneEvent.
         assistant_item = AssistantMessageItem(
             id=_gen_id("msg"),
             thread_id=thread.id,
@@ -261,11 +386,83 @@ class FactAssistantServer(ChatKitServer[dict[str, Any]]):
             content=[AssistantMessageContent(text=response_text)],
         )
 
-        await self.store.add_thread_item(thread.id, assistant_item, context)
-
         yield ThreadItemAddedEvent(item=assistant_item)
         yield ThreadItemDoneEvent(item=assistant_item)
 
+    async def _stream_response(
+        self,
+        thread: ThreadMetadata,
+        runs_client: Any,
+        request_kwargs: dict[str, Any],
+    ) -> AsyncIterator[ThreadStreamEvent]:
+        """Relay a streamed workflow run as incremental assistant message events."""
+
+        assistant_item = AssistantMessageItem(
+            id=_gen_id("msg"),
+            thread_id=thread.id,
+            created_at=datetime.utcnow(),
+            content=[],
+        )
+        chunks: list[str] = []
+        failed = False
+        # Not made current: ChatKit persists items between our yields, and those
+        # store spans belong to the turn rather than to the workflow stream.
+        span = tracer.start_span(
+            "workflow.stream", attributes={"workflow.id": request_kwargs["workflow_id"]}
+        )
+        try:
+            async for delta in _stream_workflow(runs_client, request_kwargs):
+                if not chunks:
+                    yield ThreadItemAddedEvent(item=assistant_item)
+                    yield ThreadItemUpdated(
+                        item_id=assistant_item.id,
+                        update=AssistantMessageContentPartAdded(
+                            content_index=0, content=AssistantMessageContent(text="")
+                        ),
+                    )
+                chunks.append(delta)
+                yield ThreadItemUpdated(
+                    item_id=assistant_item.id,
+                    update=AssistantMessageContentPartTextDelta(content_index=0, delta=delta),
+                )
+        except OpenAIError as exc:  # pragma: no cover - network/HTTP errors
+            logger.exception("Workflow execution failed")
+            failed = True
+            tracer.end_span(span, error=exc)
+        except Exception as exc:
+            logger.exception("Unexpected error streaming workflow run")
+            failed = True
+            tracer.end_span(span, error=exc)
+        finally:
+            tracer.end_span(span)
+
+        response_text = "".join(chunks)
+        logger.info(
+            "Workflow run completed",
+            extra={
+                "workflow_id": request_kwargs["workflow_id"],
+                "workflow_version": request_kwargs.get("workflow_version"),
+                "thread_id": thread.id,
+                "has_text": bool(response_text),
+                "streamed": True,
+            },
+        )
+
+        if chunks:
+            # Keep whatever was already shown to the user, even if the run failed midway.
+            content = AssistantMessageContent(text=response_text)
+            yield ThreadItemUpdated(
+                item_id=assistant_item.id,
+                update=AssistantMessageContentPartDone(content_index=0, content=content),
+            )
+            assistant_item.content = [content]
+            yield ThreadItemDoneEvent(item=assistant_item)
+
+        if failed:
+            yield ErrorEvent(message="Assistant is temporarily unavailable.", allow_retry=True)
+        elif not chunks:
+            yield ErrorEvent(message="Assistant returned an empty response.", allow_retry=True)
+
 
 def create_chatkit_server() -> FactAssistantServer | None:
     """Return a configured ChatKit server instance if dependencies are available."""
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 openai_client = OpenAI()
+async_openai_client = AsyncOpenAI()
 
-__all__ = ["openai_client"]
+__all__ = ["async_openai_client", "openai_client"]
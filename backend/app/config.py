@@ -16,12 +16,32 @@ def _split_env(name: str) -> list[str]:
     return [part.strip() for part in raw.split(",") if part.strip()]
 
 
+def _optional_int(name: str) -> int | None:
+    raw = os.getenv(name, "").strip()
+    return int(raw) if raw else None
+
+
 class Settings(BaseModel):
     """Application settings sourced from environment variables."""
 
     model_config = ConfigDict(extra="ignore")
 
     database_url: str | None = Field(default=os.getenv("DATABASE_URL"))
+    # PostgreSQL connection pool. Pre-ping catches connections the server dropped;
+    # turning it off saves a round trip per checkout and relies on recycling alone.
+    db_pool_size: int = Field(default=int(os.getenv("DB_POOL_SIZE", "10")))
+    db_max_overflow: int = Field(default=int(os.getenv("DB_MAX_OVERFLOW", "10")))
+    db_pool_timeout_seconds: float = Field(default=float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30")))
+    db_pool_recycle_seconds: int = Field(default=int(os.getenv("DB_POOL_RECYCLE_SECONDS", "300")))
+    db_pool_pre_ping: bool = Field(
+        default=os.getenv("DB_POOL_PRE_PING", "true").strip().lower() not in {"0", "false", "no"}
+    )
+    # asyncpg / SQLAlchemy statement caches; unset means 0 behind a PgBouncer
+    # ("-pooler") endpoint and 100 otherwise.
+    db_statement_cache_size: int | None = Field(default=_optional_int("DB_STATEMENT_CACHE_SIZE"))
+    db_prepared_statement_cache_size: int | None = Field(
+        default=_optional_int("DB_PREPARED_STATEMENT_CACHE_SIZE")
+    )
     jwt_secret: str | None = Field(default=os.getenv("JWT_SECRET"))
     jwt_algorithm: str = Field(default=os.getenv("JWT_ALGORITHM", "HS256"))
     jwt_expires_seconds: int = Field(default=int(os.getenv("JWT_EXPIRES_IN", "3600")))
@@ -68,6 +88,120 @@ class Settings(BaseModel):
     )
     stack_api_base_url: str = Field(default=os.getenv("STACK_API_BASE_URL", "https://api.stack-auth.com"))
     stack_timeout_seconds: float = Field(default=float(os.getenv("STACK_TIMEOUT_SECONDS", "10")))
+    stack_max_connections: int = Field(default=int(os.getenv("STACK_MAX_CONNECTIONS", "20")))
+    stack_max_keepalive_connections: int = Field(
+        default=int(os.getenv("STACK_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    )
+    stack_token_cache_ttl_seconds: float = Field(
+        default=float(os.getenv("STACK_TOKEN_CACHE_TTL_SECONDS", "30"))
+    )
+
+    # "memory" keeps ChatKit threads per worker; "postgres" shares them through Neon.
+    chatkit_store_backend: str = Field(default=os.getenv("CHATKIT_STORE_BACKEND", "memory"))
+    chatkit_store_batch_size: int = Field(default=int(os.getenv("CHATKIT_STORE_BATCH_SIZE", "64")))
+    chatkit_store_flush_interval_ms: int = Field(
+        default=int(os.getenv("CHATKIT_STORE_FLUSH_INTERVAL_MS", "50"))
+    )
+
+    # Limits for the in-memory ChatKit store; 0 disables a limit.
+    memory_store_max_threads: int = Field(default=int(os.getenv("MEMORY_STORE_MAX_THREADS", "10000")))
+    memory_store_max_items_per_thread: int = Field(
+        default=int(os.getenv("MEMORY_STORE_MAX_ITEMS_PER_THREAD", "2000"))
+    )
+    memory_store_max_bytes: int = Field(
+        default=int(os.getenv("MEMORY_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+    )
+    memory_store_idle_ttl_seconds: float = Field(
+        default=float(os.getenv("MEMORY_STORE_IDLE_TTL_SECONDS", "86400"))
+    )
+
+    transcript_queue_workers: int = Field(default=int(os.getenv("TRANSCRIPT_QUEUE_WORKERS", "4")))
+    transcript_queue_maxsize: int = Field(default=int(os.getenv("TRANSCRIPT_QUEUE_MAXSIZE", "1000")))
+    transcript_queue_max_attempts: int = Field(
+        default=int(os.getenv("TRANSCRIPT_QUEUE_MAX_ATTEMPTS", "5"))
+    )
+    transcript_queue_backoff_ms: int = Field(default=int(os.getenv("TRANSCRIPT_QUEUE_BACKOFF_MS", "500")))
+    # Waiting messages a transcript worker picks up and writes together.
+    transcript_queue_batch_size: int = Field(default=int(os.getenv("TRANSCRIPT_QUEUE_BATCH_SIZE", "50")))
+    # Monthly chat_transcript_messages partitions: created ahead of time (at startup and
+    # then every check interval), archived once older than the retention window (0 keeps
+    # everything).
+    transcript_partition_months_ahead: int = Field(
+        default=int(os.getenv("TRANSCRIPT_PARTITION_MONTHS_AHEAD", "3"))
+    )
+    transcript_partition_check_interval_seconds: float = Field(
+        default=float(os.getenv("TRANSCRIPT_PARTITION_CHECK_INTERVAL_SECONDS", "86400"))
+    )
+    transcript_retention_months: int = Field(default=int(os.getenv("TRANSCRIPT_RETENTION_MONTHS", "12")))
+    transcript_archive_dir: str = Field(default=os.getenv("TRANSCRIPT_ARCHIVE_DIR", "transcript-archive"))
+
+    # Most facts packed into one vector store file upload.
+    vector_store_batch_max_facts: int = Field(
+        default=int(os.getenv("VECTOR_STORE_BATCH_MAX_FACTS", "50"))
+    )
+
+    vector_store_cache_maxsize: int = Field(
+        default=int(os.getenv("VECTOR_STORE_CACHE_MAXSIZE", "10000"))
+    )
+    vector_store_cache_ttl_seconds: float = Field(
+        default=float(os.getenv("VECTOR_STORE_CACHE_TTL_SECONDS", "600"))
+    )
+
+    # Stream workflow run output to ChatKit as it is generated instead of polling for the result.
+    workflow_streaming: bool = Field(
+        default=os.getenv("WORKFLOW_STREAMING", "true").strip().lower() not in {"0", "false", "no"}
+    )
+
+    workflow_poll_min_interval_ms: int = Field(
+        default=int(os.getenv("WORKFLOW_POLL_MIN_INTERVAL_MS", "250"))
+    )
+    workflow_poll_max_interval_ms: int = Field(
+        default=int(os.getenv("WORKFLOW_POLL_MAX_INTERVAL_MS", "5000"))
+    )
+    workflow_poll_concurrency: int = Field(default=int(os.getenv("WORKFLOW_POLL_CONCURRENCY", "16")))
+
+    # Dedicated thread pools for blocking upstream SDK calls.
+    openai_executor_workers: int = Field(default=int(os.getenv("OPENAI_EXECUTOR_WORKERS", "16")))
+    stripe_executor_workers: int = Field(default=int(os.getenv("STRIPE_EXECUTOR_WORKERS", "4")))
+
+    # Admission control for /chatkit; 0 disables a limit.
+    chatkit_rate_limit_per_minute: float = Field(
+        default=float(os.getenv("CHATKIT_RATE_LIMIT_PER_MINUTE", "30"))
+    )
+    chatkit_rate_limit_burst: int = Field(default=int(os.getenv("CHATKIT_RATE_LIMIT_BURST", "10")))
+    chatkit_max_in_flight_per_user: int = Field(
+        default=int(os.getenv("CHATKIT_MAX_IN_FLIGHT_PER_USER", "3"))
+    )
+    chatkit_max_in_flight: int = Field(default=int(os.getenv("CHATKIT_MAX_IN_FLIGHT", "64")))
+
+    # Request tracing: "" disables it, "file" appends OTLP JSON lines, "otlp" posts to a collector.
+    tracing_exporter: str = Field(default=os.getenv("TRACING_EXPORTER", ""))
+    tracing_file_path: str = Field(default=os.getenv("TRACING_FILE_PATH", "traces.jsonl"))
+    tracing_otlp_endpoint: str = Field(
+        default=os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    )
+    tracing_service_name: str = Field(default=os.getenv("TRACING_SERVICE_NAME", "microgen-backend"))
+
+    # Per-worker BM25 index over each user's transcript and facts, searched before file_search.
+    local_recall_enabled: bool = Field(
+        default=os.getenv("LOCAL_RECALL_ENABLED", "true").strip().lower() not in {"0", "false", "no"}
+    )
+    local_recall_top_k: int = Field(default=int(os.getenv("LOCAL_RECALL_TOP_K", "5")))
+    local_recall_min_score: float = Field(default=float(os.getenv("LOCAL_RECALL_MIN_SCORE", "0.5")))
+    local_recall_max_users: int = Field(default=int(os.getenv("LOCAL_RECALL_MAX_USERS", "1000")))
+    local_recall_max_documents_per_user: int = Field(
+        default=int(os.getenv("LOCAL_RECALL_MAX_DOCUMENTS_PER_USER", "5000"))
+    )
+    local_recall_warm_rows: int = Field(default=int(os.getenv("LOCAL_RECALL_WARM_ROWS", "2000")))
+
+    chat_history_token_budget: int = Field(default=int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "12000")))
+    chat_history_max_items: int = Field(default=int(os.getenv("CHAT_HISTORY_MAX_ITEMS", "250")))
+    chat_history_cache_threads: int = Field(
+        default=int(os.getenv("CHAT_HISTORY_CACHE_THREADS", "1000"))
+    )
+
+    auth_cache_maxsize: int = Field(default=int(os.getenv("AUTH_CACHE_MAXSIZE", "10000")))
+    auth_cache_ttl_seconds: float = Field(default=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")))
 
     def require_database_url(self) -> str:
         if not self.database_url:
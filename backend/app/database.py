@@ -5,13 +5,19 @@ from __future__ import annotations
 import logging
 import os
 import ssl
-from typing import AsyncIterator
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
 
-from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool, QueuePool
 
 from .config import get_settings
+from .metrics import db_pool_acquire_seconds
 
 
 class Base(DeclarativeBase):
@@ -20,6 +26,18 @@ class Base(DeclarativeBase):
 
 logger = logging.getLogger(__name__)
 
+
+class _TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool recording how long each checkout waits for a connection."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_acquire_seconds.observe(time.perf_counter() - started)
+
+
 settings = get_settings()
 
 raw_database_url = settings.require_database_url()
@@ -58,7 +76,65 @@ elif connect_args.get("ssl") is True:
     connect_args["ssl"] = ssl.create_default_context()
 
 database_dsn = url.render_as_string(hide_password=False)
-engine = create_async_engine(database_dsn, pool_pre_ping=True, connect_args=connect_args)
+
+
+def behind_pgbouncer(database_url: URL) -> bool:
+    """Whether ``database_url`` points at a Neon pooled (PgBouncer) endpoint."""
+
+    return "-pooler" in (database_url.host or "")
+
+
+def build_engine_options(
+    database_url: URL, connect_args: dict[str, object], **overrides: Any
+) -> dict[str, Any]:
+    """Return ``create_async_engine`` keyword arguments from the ``DB_*`` settings.
+
+    ``overrides`` replace individual pool settings, which lets benchmarks
+    compare configurations against the same database.
+    """
+
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "connect_args": dict(connect_args),
+    }
+    if database_url.get_backend_name() != "postgresql":
+        # SQLite keeps its dialect-specific default pool (in-memory databases need it).
+        options.update(overrides)
+        return options
+
+    options.update(
+        poolclass=_TimedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    pooled = behind_pgbouncer(database_url)
+    default_cache_size = 0 if pooled else 100
+    statement_cache_size = settings.db_statement_cache_size
+    prepared_cache_size = settings.db_prepared_statement_cache_size
+    driver_args = options["connect_args"]
+    # asyncpg's own cache, then SQLAlchemy's per-connection prepared statement cache.
+    driver_args["statement_cache_size"] = (
+        default_cache_size if statement_cache_size is None else statement_cache_size
+    )
+    driver_args["prepared_statement_cache_size"] = (
+        default_cache_size if prepared_cache_size is None else prepared_cache_size
+    )
+    if pooled:
+        # PgBouncer hands each transaction to any server connection, so
+        # asyncpg's sequential statement names would collide between clients.
+        driver_args["prepared_statement_name_func"] = _unique_statement_name
+    options.update(overrides)
+    return options
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+engine_options = build_engine_options(url, connect_args)
+engine = create_async_engine(database_dsn, **engine_options)
 
 logger.info(
     "Configured async engine",
@@ -67,11 +143,32 @@ logger.info(
         "host": url.host,
         "database": url.database,
         "ssl": connect_args.get("ssl"),
+        "pool_size": engine_options.get("pool_size"),
+        "pool_pre_ping": engine_options["pool_pre_ping"],
+        "statement_cache_size": engine_options["connect_args"].get("statement_cache_size"),
     },
 )
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
+def pool_snapshot(pool: Pool | None = None) -> dict[str, Any]:
+    """Checked-out connections against capacity for the engine's pool."""
+
+    pool = pool if pool is not None else engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 4) if capacity > 0 else 0.0,
+    }
+
+
 async def get_session() -> AsyncIterator[AsyncSession]:
     """Yield an async SQLAlchemy session bound to the configured engine."""
 
@@ -79,4 +176,32 @@ async def get_session() -> AsyncIterator[AsyncSession]:
         yield session
 
 
-__all__ = ["Base", "engine", "get_session", "SessionLocal"]
+def as_utc(value: datetime | None) -> datetime:
+    """Return ``value`` as an aware UTC timestamp, treating naive values as UTC and ``None`` as now."""
+
+    if value is None:
+        return datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def dialect_insert(session: AsyncSession) -> Any:
+    """Return the dialect ``insert`` construct supporting ``ON CONFLICT`` for ``session``."""
+
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
+__all__ = [
+    "Base",
+    "SessionLocal",
+    "as_utc",
+    "behind_pgbouncer",
+    "build_engine_options",
+    "dialect_insert",
+    "engine",
+    "get_session",
+    "pool_snapshot",
+]
@@ -2,18 +2,96 @@
 
 from __future__ import annotations
 
+import time
 import uuid
+from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import TTLCache
+from .config import get_settings
 from .database import get_session
 from .models import User
 from .security import decode_token
+from .tracing import tracer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class VerifiedToken:
+    """Claims from a bearer token whose signature and expiry were checked."""
+
+    user_id: uuid.UUID
+    expires_at: float
+
+
+class AuthenticatedUserCache:
+    """Cache of verified bearer tokens and the ``User`` rows they resolve to.
+
+    Users are keyed by ``(user_id, token exp)`` so a cached row never outlives
+    the token that loaded it. Cached ``User`` instances are detached from any
+    session and must be treated as read-only.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self._tokens: TTLCache[str, VerifiedToken] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._users: TTLCache[tuple[uuid.UUID, float], User] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.requests = 0
+
+    def verify(self, token: str) -> VerifiedToken:
+        """Return the token's claims, decoding the JWT only on a cache miss."""
+
+        cached = self._tokens.get(token)
+        if cached is not None:
+            return cached
+
+        payload = decode_token(token)
+        subject = payload.get("sub")
+        if not subject:
+            raise ValueError("Token is missing a subject")
+        verified = VerifiedToken(
+            user_id=uuid.UUID(subject),
+            expires_at=float(payload.get("exp") or time.time()),
+        )
+        self._tokens.set(token, verified, ttl=verified.expires_at - time.time())
+        return verified
+
+    def get_user(self, token: VerifiedToken) -> User | None:
+        return self._users.get((token.user_id, token.expires_at))
+
+    def set_user(self, token: VerifiedToken, user: User) -> None:
+        self._users.set((token.user_id, token.expires_at), user, ttl=token.expires_at - time.time())
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Drop cached rows for ``user_id`` after the user record changes."""
+
+        for key in self._users.keys():
+            if key[0] == user_id:
+                self._users.pop(key)
+
+    def snapshot(self) -> dict[str, float | int]:
+        user_stats = self._users.stats
+        return {
+            "requests": self.requests,
+            "token_hit_rate": round(self._tokens.stats.hit_rate, 4),
+            "user_hit_rate": round(user_stats.hit_rate, 4),
+            "db_round_trips_saved": user_stats.hits,
+            "db_round_trips_saved_per_request": (
+                round(user_stats.hits / self.requests, 4) if self.requests else 0.0
+            ),
+            "cached_users": len(self._users),
+        }
+
+
+auth_cache = AuthenticatedUserCache(
+    maxsize=settings.auth_cache_maxsize,
+    ttl=settings.auth_cache_ttl_seconds,
+)
 
 
 async def get_current_user(
@@ -28,25 +106,25 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = decode_token(token)
-    except ValueError as exc:
-        raise unauthorized from exc
-
-    subject = payload.get("sub")
-    if not subject:
-        raise unauthorized
+    auth_cache.requests += 1
+    with tracer.span("auth.get_current_user") as span:
+        try:
+            verified = auth_cache.verify(token)
+        except ValueError as exc:
+            raise unauthorized from exc
 
-    try:
-        user_id = uuid.UUID(subject)
-    except ValueError as exc:
-        raise unauthorized from exc
+        user = auth_cache.get_user(verified)
+        if span is not None:
+            span.set_attribute("auth.cache_hit", user is not None)
+        if user is not None:
+            return user
 
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise unauthorized
-    return user
+        result = await session.execute(select(User).where(User.id == verified.user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise unauthorized
+        auth_cache.set_user(verified, user)
+        return user
 
 
-__all__ = ["get_current_user", "oauth2_scheme"]
+__all__ = ["AuthenticatedUserCache", "auth_cache", "get_current_user", "oauth2_scheme"]
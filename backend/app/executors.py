@@ -0,0 +1,117 @@
+"""Named, size-bounded thread pools for blocking upstream SDK calls."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, TypeVar
+
+from .config import get_settings
+from .metrics import LatencyHistogram
+
+T = TypeVar("T")
+
+_QUEUE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+_RUN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+
+@dataclass(slots=True)
+class ExecutorStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    queue_seconds: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram(_QUEUE_BUCKETS)
+    )
+    run_seconds: LatencyHistogram = field(default_factory=lambda: LatencyHistogram(_RUN_BUCKETS))
+
+
+class BoundedExecutor:
+    """Run blocking calls for one upstream on its own ``max_workers`` threads.
+
+    Each upstream gets a dedicated pool instead of sharing the event loop's
+    default executor, so a slow provider saturates only its own workers.
+    ``queue_seconds`` records how long calls waited for a free worker, which
+    is the signal to raise ``max_workers`` (or shed load) for that upstream.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"{name}-sdk"
+        )
+        self._active = 0
+        # Workers update the counters and histograms concurrently.
+        self._lock = threading.Lock()
+        self.stats = ExecutorStats()
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Call ``func`` on a worker thread, propagating context variables like ``to_thread``."""
+
+        submitted_at = time.perf_counter()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+
+        def _timed() -> T:
+            started_at = time.perf_counter()
+            with self._lock:
+                self.stats.queue_seconds.observe(started_at - submitted_at)
+                self._active += 1
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self.stats.run_seconds.observe(time.perf_counter() - started_at)
+
+        self.stats.submitted += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, _timed)
+        except BaseException:
+            self.stats.failed += 1
+            raise
+        self.stats.completed += 1
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "active": self._active,
+            "queued": max(
+                0, self.stats.submitted - self.stats.completed - self.stats.failed - self._active
+            ),
+            "submitted": self.stats.submitted,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "queue_seconds": self.stats.queue_seconds.snapshot(),
+            "run_seconds": self.stats.run_seconds.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+settings = get_settings()
+
+openai_executor = BoundedExecutor("openai", settings.openai_executor_workers)
+"""Blocking OpenAI SDK calls (sessions, vector stores, non-streamed workflow runs)."""
+
+stripe_executor = BoundedExecutor("stripe", settings.stripe_executor_workers)
+"""Blocking Stripe SDK calls."""
+
+EXECUTORS: Dict[str, BoundedExecutor] = {
+    executor.name: executor for executor in (openai_executor, stripe_executor)
+}
+
+
+__all__ = ["EXECUTORS", "BoundedExecutor", "openai_executor", "stripe_executor"]
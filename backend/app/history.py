@@ -0,0 +1,208 @@
+"""Formatted conversation history for workflow runs, cached per thread."""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Iterable, NamedTuple
+
+from chatkit.types import ThreadItem, UserMessageItem
+
+from .cache import CacheStats
+
+# Rough OpenAI tokenizer ratio for English text plus per-message framing.
+_CHARS_PER_TOKEN = 4
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def extract_text(parts: Any) -> str:
+    """Coerce a list of ChatKit content parts into plain text."""
+
+    chunks: list[str] = []
+    for part in parts or []:
+        text = getattr(part, "text", None)
+        if isinstance(text, str) and text.strip():
+            chunks.append(text.strip())
+            continue
+        if hasattr(part, "model_dump"):
+            payload = part.model_dump()
+        elif isinstance(part, dict):
+            payload = part
+        else:
+            payload = {}
+        for key in ("text", "value", "output_text", "input_text"):
+            candidate = payload.get(key)
+            if isinstance(candidate, str) and candidate.strip():
+                chunks.append(candidate.strip())
+                break
+    return " ".join(chunks).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN) + _MESSAGE_OVERHEAD_TOKENS
+
+
+class HistoryEntry(NamedTuple):
+    created_at: datetime
+    message: dict[str, Any]
+    tokens: int
+
+
+def format_history_item(item: ThreadItem) -> HistoryEntry | None:
+    """Return the Responses API message for a user or assistant item, if any."""
+
+    role: str | None = None
+    text = ""
+    if isinstance(item, UserMessageItem):
+        role = "user"
+        text = extract_text(item.content)
+    elif getattr(item, "type", None) == "assistant_message":
+        role = "assistant"
+        text = extract_text(getattr(item, "content", []))
+
+    if not role or not text:
+        return None
+    message = {
+        "role": role,
+        "content": [
+            {
+                "type": "input_text" if role == "user" else "output_text",
+                "text": text,
+            }
+        ],
+    }
+    return HistoryEntry(item.created_at, message, estimate_tokens(text))
+
+
+def _is_newest(entry: HistoryEntry, newest: HistoryEntry) -> bool:
+    try:
+        return entry.created_at >= newest.created_at
+    except TypeError:  # naive and aware timestamps from different writers
+        return False
+
+
+def fit_token_budget(entries: Iterable[HistoryEntry], budget: int) -> list[dict[str, Any]]:
+    """Keep the newest messages whose estimated tokens fit in ``budget``.
+
+    ``entries`` must be ordered newest first. The most recent message is
+    always kept so a turn never goes out without context.
+    """
+
+    kept: list[dict[str, Any]] = []
+    used = 0
+    for entry in entries:
+        if kept and used + entry.tokens > budget:
+            break
+        kept.append(entry.message)
+        used += entry.tokens
+    kept.reverse()
+    return kept
+
+
+class ThreadHistoryCache:
+    """Per-thread cache of formatted history, updated as items are written.
+
+    A thread is cached only after its history has been loaded from the store
+    once (``begin_load``/``seed``); afterwards each ``record`` or ``forget``
+    keeps it current, so building a turn's input costs O(new items) instead
+    of reloading and re-formatting the whole thread. Writes that land while a
+    load is in flight invalidate that load rather than being lost. At most
+    ``max_items`` newest messages are kept per thread and ``max_threads``
+    threads overall (least recently used first out).
+    """
+
+    def __init__(self, *, max_threads: int, max_items: int) -> None:
+        self._max_threads = max(1, max_threads)
+        self._max_items = max(1, max_items)
+        self._threads: OrderedDict[str, OrderedDict[str, HistoryEntry]] = OrderedDict()
+        self._loads: dict[str, object] = {}
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def window(self, thread_id: str, token_budget: int) -> list[dict[str, Any]] | None:
+        """Return the cached history trimmed to ``token_budget``, or ``None`` on a miss.
+
+        The message dicts are shared with the cache and must not be mutated.
+        """
+
+        history = self._threads.get(thread_id)
+        if history is None:
+            self.stats.misses += 1
+            return None
+        self._threads.move_to_end(thread_id)
+        self.stats.hits += 1
+        return fit_token_budget(reversed(history.values()), token_budget)
+
+    def begin_load(self, thread_id: str) -> object:
+        token = object()
+        self._loads[thread_id] = token
+        return token
+
+    def seed(self, thread_id: str, token: object, items: Iterable[ThreadItem]) -> bool:
+        """Cache ``items`` (oldest first) unless the thread changed since ``begin_load``."""
+
+        if self._loads.get(thread_id) is not token:
+            return False
+        del self._loads[thread_id]
+        history: OrderedDict[str, HistoryEntry] = OrderedDict()
+        for item in items:
+            entry = format_history_item(item)
+            if entry is not None:
+                history[item.id] = entry
+        self._trim(history)
+        self._threads[thread_id] = history
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self._max_threads:
+            self._threads.popitem(last=False)
+        return True
+
+    def record(self, thread_id: str, item: ThreadItem) -> None:
+        """Apply an added or saved item to the cached history of its thread."""
+
+        self._loads.pop(thread_id, None)
+        history = self._threads.get(thread_id)
+        if history is None:
+            return
+        entry = format_history_item(item)
+        if entry is None:
+            if item.id in history:
+                self.drop(thread_id)
+            return
+        if item.id in history:
+            history[item.id] = entry
+            return
+        if history:
+            newest = next(reversed(history.values()))
+            if not _is_newest(entry, newest):
+                # Out-of-order insert; reload rather than re-sorting in place.
+                self.drop(thread_id)
+                return
+        history[item.id] = entry
+        self._trim(history)
+
+    def forget(self, thread_id: str, item_id: str) -> None:
+        history = self._threads.get(thread_id)
+        if history is None or item_id in history:
+            # Removals may expose messages trimmed earlier, so reload the thread.
+            self.drop(thread_id)
+
+    def drop(self, thread_id: str) -> None:
+        self._loads.pop(thread_id, None)
+        self._threads.pop(thread_id, None)
+
+    def _trim(self, history: OrderedDict[str, HistoryEntry]) -> None:
+        while len(history) > self._max_items:
+            history.popitem(last=False)
+
+
+__all__ = [
+    "HistoryEntry",
+    "ThreadHistoryCache",
+    "estimate_tokens",
+    "extract_text",
+    "fit_token_budget",
+    "format_history_item",
+]
@@ -2,9 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
-from typing import Any
+from typing import Any, AsyncIterable, AsyncIterator
 from uuid import UUID, uuid4
 
 import openai
@@ -14,11 +13,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response, StreamingResponse
 from openai import OpenAIError
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import JSONResponse
 
+from .admission import Admission, AdmissionRejected, chatkit_admission
 from .chat import (
     FactAssistantServer,
     create_chatkit_server,
@@ -26,16 +26,23 @@ from .chat import (
 from .clients import openai_client
 from .config import get_settings
 from .constants import WORKFLOW_ID, WORKFLOW_VERSION
-from .database import get_session
-from .dependencies import get_current_user
+from .database import engine, get_session, pool_snapshot
+from .dependencies import auth_cache, get_current_user
+from .executors import EXECUTORS, openai_executor
 from .facts import fact_store
-from .models import ChatTranscriptMessage, User
+from .metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware, observe_upstream
+from .models import User
+from .recall import local_recall
 from .routes import auth as auth_routes
 from .routes import microagents as microagent_routes
 from .routes import rum as rum_routes
+from .routes import transcripts as transcript_routes
 from .routes import webhooks as webhook_routes
-from .schemas import ChatTranscriptMessageRead
+from .tracing import TracingMiddleware, tracer
+from .transcript_partitions import PartitionMaintainer
+from .transcript_queue import transcript_queue
 from .vector_store import get_or_create_user_vector_store
+from .workflow_poller import workflow_poller
 
 settings = get_settings()
 
@@ -70,6 +77,8 @@ ALLOWED_ORIGIN_REGEX = (
 
 EXPOSED_HEADERS = ["set-cookie", "content-type"]
 
+TRANSCRIPT_DRAIN_TIMEOUT_SECONDS = 30.0
+
 STREAMING_HEADERS = {
     "Cache-Control": "no-cache",
     "Connection": "keep-alive",
@@ -78,6 +87,9 @@ STREAMING_HEADERS = {
 logger = logging.getLogger(__name__)
 
 # plan-step[1]: ensure session data is set up before wrapping everything with CORS.
+# Innermost so the route template is resolved when the request finishes.
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 app.add_middleware(SessionMiddleware, secret_key=settings.session_secret)
 
 # plan-step[1]: place CORSMiddleware last so it executes first and handles preflights.
@@ -95,6 +107,7 @@ app.add_middleware(
 app.include_router(auth_routes.router)
 app.include_router(microagent_routes.router)
 app.include_router(rum_routes.router)
+app.include_router(transcript_routes.router)
 app.include_router(webhook_routes.router)
 
 
@@ -132,6 +145,20 @@ async def _verify_stack_auth_configuration() -> None:
         )
 
 
+transcript_partition_maintainer = PartitionMaintainer(
+    engine,
+    months_ahead=settings.transcript_partition_months_ahead,
+    interval_seconds=settings.transcript_partition_check_interval_seconds,
+)
+
+
+@app.on_event("startup")
+async def _ensure_transcript_partitions() -> None:
+    """Create this month's and upcoming transcript partitions and re-check them on an interval."""
+
+    await transcript_partition_maintainer.start()
+
+
 class WorkflowOptions(BaseModel):
     """Options that influence which workflow powers the ChatKit session."""
 
@@ -237,7 +264,8 @@ async def _create_session(
         )
 
     try:
-        return await asyncio.to_thread(_call)
+        with observe_upstream("openai", "chatkit_session_create"):
+            return await openai_executor.run(_call)
     except OpenAIError as exc:  # pragma: no cover - network failure path
         logger.exception("Failed to create ChatKit session")
         raise HTTPException(
@@ -251,13 +279,67 @@ async def _cancel_session(session_id: str) -> None:
         openai_client.beta.chatkit.sessions.cancel(session_id)
 
     try:
-        await asyncio.to_thread(_call)
+        with observe_upstream("openai", "chatkit_session_cancel"):
+            await openai_executor.run(_call)
     except OpenAIError as exc:  # pragma: no cover - best-effort cleanup
         logger.warning("Failed to cancel ChatKit session %s", session_id, exc_info=exc)
 
 _chatkit_server: FactAssistantServer | None = create_chatkit_server()
 
 
+def _chatkit_store_snapshot() -> dict[str, Any]:
+    if _chatkit_server is None:
+        return {}
+    return _chatkit_server.store.snapshot()
+
+
+REGISTRY.register_snapshot("chatkit_store", _chatkit_store_snapshot)
+REGISTRY.register_snapshot("chatkit_admission", chatkit_admission.snapshot)
+REGISTRY.register_snapshot("transcript_queue", transcript_queue.snapshot)
+REGISTRY.register_snapshot("auth_cache", auth_cache.snapshot)
+REGISTRY.register_snapshot("workflow_runs", workflow_poller.snapshot)
+REGISTRY.register_snapshot("db_pool", pool_snapshot)
+REGISTRY.register_snapshot("local_recall", local_recall.snapshot)
+REGISTRY.register_snapshot("tracing", tracer.snapshot)
+REGISTRY.register_snapshot("transcript_partitions", transcript_partition_maintainer.snapshot)
+for _executor in EXECUTORS.values():
+    REGISTRY.register_snapshot("executor", _executor.snapshot, pool=_executor.name)
+
+
+@app.on_event("shutdown")
+async def _close_chatkit_store() -> None:
+    """Flush buffered ChatKit writes, drain transcript persistence and stop partition checks."""
+
+    if _chatkit_server is not None:
+        await _chatkit_server.store.aclose()
+    await transcript_queue.drain(timeout=TRANSCRIPT_DRAIN_TIMEOUT_SECONDS)
+    await transcript_partition_maintainer.aclose()
+
+
+@app.on_event("startup")
+async def _open_http_clients() -> None:
+    """Open pooled upstream HTTP connections; ``_close_http_clients`` releases them."""
+
+    auth_routes.open_stack_client()
+
+
+@app.on_event("shutdown")
+async def _close_http_clients() -> None:
+    """Release pooled upstream HTTP connections."""
+
+    await auth_routes.close_stack_client()
+    await workflow_poller.aclose()
+    for executor in EXECUTORS.values():
+        executor.shutdown()
+
+
+@app.on_event("shutdown")
+async def _flush_traces() -> None:
+    """Export spans still buffered, including those from drained transcript writes."""
+
+    await tracer.aclose()
+
+
 def get_chatkit_server() -> FactAssistantServer:
     if _chatkit_server is None:
         raise HTTPException(
@@ -277,34 +359,71 @@ async def chatkit_endpoint(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ) -> Response:
-    payload = await request.body()
-    # plan-step[2]: guarantee each user has a vector store record before
-    # delegating to the ChatKit server, preventing missing-table lookups and
-    # ensuring new users get provisioned automatically.
-    vector_store_id = await get_or_create_user_vector_store(db, current_user.id)
-    logger.info(
-        "Processing ChatKit payload",
-        extra={
-            "user_id": str(current_user.id),
-            "vector_store_id": vector_store_id,
-            "payload_bytes": len(payload),
-        },
-    )
-    result = await server.process(
-        payload,
-        {
-            "request": request,
-            "user": current_user,
-            "vector_store_id": vector_store_id,
-            "workflow_id": _ensure_workflow_id(None),
-            "workflow_version": WORKFLOW_VERSION,
-        },
-    )
-    if isinstance(result, StreamingResult):
-        return StreamingResponse(result, media_type="text/event-stream", headers=STREAMING_HEADERS)
-    if hasattr(result, "json"):
-        return Response(content=result.json, media_type="application/json")
-    return JSONResponse(result)
+    try:
+        admission = chatkit_admission.acquire(current_user.id)
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many chat requests; please retry shortly.",
+            headers={"Retry-After": exc.retry_after_header},
+        ) from None
+
+    streaming = False
+    try:
+        payload = await request.body()
+        # plan-step[2]: guarantee each user has a vector store record before
+        # delegating to the ChatKit server, preventing missing-table lookups and
+        # ensuring new users get provisioned automatically.
+        with tracer.span("vector_store.get_or_create_user_vector_store"):
+            vector_store_id = await get_or_create_user_vector_store(db, current_user.id)
+        logger.info(
+            "Processing ChatKit payload",
+            extra={
+                "user_id": str(current_user.id),
+                "vector_store_id": vector_store_id,
+                "payload_bytes": len(payload),
+            },
+        )
+        with tracer.span("chatkit.process", attributes={"payload.bytes": len(payload)}):
+            result = await server.process(
+                payload,
+                {
+                    "request": request,
+                    "user": current_user,
+                    "vector_store_id": vector_store_id,
+                    "workflow_id": _ensure_workflow_id(None),
+                    "workflow_version": WORKFLOW_VERSION,
+                },
+            )
+        if isinstance(result, StreamingResult):
+            # The slot stays held until the stream ends; the background task
+            # covers clients that disconnect before the stream is iterated.
+            streaming = True
+            return StreamingResponse(
+                _release_after_stream(result, admission),
+                media_type="text/event-stream",
+                headers=STREAMING_HEADERS,
+                background=BackgroundTask(admission.release),
+            )
+        if hasattr(result, "json"):
+            return Response(content=result.json, media_type="application/json")
+        return JSONResponse(result)
+    finally:
+        if not streaming:
+            admission.release()
+
+
+async def _release_after_stream(
+    stream: AsyncIterable[bytes], admission: Admission
+) -> AsyncIterator[bytes]:
+    try:
+        with tracer.span("chatkit.stream"):
+            async for chunk in stream:
+                yield chunk
+    finally:
+        admission.release()
+
+
 def _session_payload(session: Any) -> dict[str, Any]:
     return {
         "client_secret": session.client_secret,
@@ -360,27 +479,6 @@ async def refresh_chatkit_session(
     return _session_payload(session)
 
 
-@app.get("/api/chatkit/transcript", response_model=list[ChatTranscriptMessageRead])
-async def list_chat_transcript(
-    thread_id: str | None = None,
-    limit: int = 200,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
-) -> list[ChatTranscriptMessageRead]:
-    capped_limit = max(1, min(limit, 500))
-    stmt = select(ChatTranscriptMessage).where(ChatTranscriptMessage.user_id == current_user.id)
-    if thread_id:
-        stmt = stmt.where(ChatTranscriptMessage.thread_id == thread_id)
-    stmt = stmt.order_by(ChatTranscriptMessage.created_at.desc()).limit(capped_limit)
-    result = await db.execute(stmt)
-    records = result.scalars().all()
-    # plan-step[3]: expose an audit-friendly transcript surface in chronological order.
-    return [
-        ChatTranscriptMessageRead.model_validate(record)
-        for record in reversed(records)
-    ]
-
-
 @app.get("/facts")
 async def list_facts() -> dict[str, Any]:
     facts = await fact_store.list_saved()
@@ -413,3 +511,10 @@ async def root() -> dict[str, str]:
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Serve request, upstream, pool and component metrics in Prometheus text format."""
+
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
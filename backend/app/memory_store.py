@@ -1,250 +1,90 @@
 from __future__ import annotations
 
-import logging
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any
+from uuid import UUID
 
-from chatkit.store import NotFoundError, Store
-from chatkit.types import Attachment, Page, Thread, ThreadItem, ThreadMetadata
+from chatkit.types import ThreadItem
+from chatkit_stores import MemoryStore as _SharedMemoryStore
 
-from .vector_store import record_chat_message
+from .config import get_settings
+from .history import ThreadHistoryCache
+from .tracing import tracer
+from .transcripts import TranscriptMirroringStore
 
-logger = logging.getLogger(__name__)
 
+class MemoryStore(_SharedMemoryStore, TranscriptMirroringStore):
+    """Shared in-memory ChatKit store with transcript mirroring and history caching.
 
-@dataclass
-class _ThreadState:
-    thread: ThreadMetadata
-    items: List[ThreadItem]
+    Limits default to the ``MEMORY_STORE_*`` settings. Messages of evicted
+    items that were not yet queued to the transcript table are queued before
+    they are dropped.
+    """
 
-
-class MemoryStore(Store[dict[str, Any]]):
-    """Simple in-memory store compatible with the ChatKit server interface."""
-
-    def __init__(self) -> None:
-        self._threads: Dict[str, _ThreadState] = {}
-        self._persisted_item_states: Dict[str, str] = {}
-        # Attachments intentionally unsupported; use a real store that enforces auth.
-
-    @staticmethod
-    def _coerce_thread_metadata(thread: ThreadMetadata | Thread) -> ThreadMetadata:
-        """Return thread metadata without any embedded items (openai-chatkit>=1.0)."""
-        has_items = isinstance(thread, Thread) or "items" in getattr(
-            thread, "model_fields_set", set()
-        )
-        if not has_items:
-            return thread.model_copy(deep=True)
-
-        data = thread.model_dump()
-        data.pop("items", None)
-        return ThreadMetadata(**data).model_copy(deep=True)
-
-    # -- Thread metadata -------------------------------------------------
-    async def load_thread(self, thread_id: str, context: dict[str, Any]) -> ThreadMetadata:
-        state = self._threads.get(thread_id)
-        if not state:
-            raise NotFoundError(f"Thread {thread_id} not found")
-        return self._coerce_thread_metadata(state.thread)
-
-    async def save_thread(self, thread: ThreadMetadata, context: dict[str, Any]) -> None:
-        metadata = self._coerce_thread_metadata(thread)
-        state = self._threads.get(thread.id)
-        if state:
-            state.thread = metadata
-        else:
-            self._threads[thread.id] = _ThreadState(
-                thread=metadata,
-                items=[],
-            )
-
-    async def load_threads(
+    def __init__(
         self,
-        limit: int,
-        after: str | None,
-        order: str,
-        context: dict[str, Any],
-    ) -> Page[ThreadMetadata]:
-        threads = sorted(
-            (self._coerce_thread_metadata(state.thread) for state in self._threads.values()),
-            key=lambda t: t.created_at or datetime.min,
-            reverse=(order == "desc"),
-        )
-
-        if after:
-            index_map = {thread.id: idx for idx, thread in enumerate(threads)}
-            start = index_map.get(after, -1) + 1
-        else:
-            start = 0
-
-        slice_threads = threads[start : start + limit + 1]
-        has_more = len(slice_threads) > limit
-        slice_threads = slice_threads[:limit]
-        next_after = slice_threads[-1].id if has_more and slice_threads else None
-        return Page(
-            data=slice_threads,
-            has_more=has_more,
-            after=next_after,
+        *,
+        copy_on_read: bool = True,
+        max_threads: int | None = None,
+        max_items_per_thread: int | None = None,
+        max_bytes: int | None = None,
+        idle_ttl: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        _SharedMemoryStore.__init__(
+            self,
+            copy_on_read=copy_on_read,
+            max_threads=max_threads if max_threads is not None else settings.memory_store_max_threads,
+            max_items_per_thread=(
+                max_items_per_thread
+                if max_items_per_thread is not None
+                else settings.memory_store_max_items_per_thread
+            ),
+            max_bytes=max_bytes if max_bytes is not None else settings.memory_store_max_bytes,
+            idle_ttl=idle_ttl if idle_ttl is not None else settings.memory_store_idle_ttl_seconds,
         )
-
-    async def delete_thread(self, thread_id: str, context: dict[str, Any]) -> None:
-        self._threads.pop(thread_id, None)
-
-    # -- Thread items ----------------------------------------------------
-    def _items(self, thread_id: str) -> List[ThreadItem]:
-        state = self._threads.get(thread_id)
-        if state is None:
-            state = _ThreadState(
-                thread=ThreadMetadata(id=thread_id, created_at=datetime.utcnow()),
-                items=[],
-            )
-            self._threads[thread_id] = state
-        return state.items
-
-    async def load_thread_items(
-        self,
-        thread_id: str,
-        after: str | None,
-        limit: int,
-        order: str,
-        context: dict[str, Any],
-    ) -> Page[ThreadItem]:
-        items = [item.model_copy(deep=True) for item in self._items(thread_id)]
-        items.sort(
-            key=lambda item: getattr(item, "created_at", datetime.utcnow()),
-            reverse=(order == "desc"),
+        TranscriptMirroringStore.__init__(
+            self,
+            history_cache=ThreadHistoryCache(
+                max_threads=settings.chat_history_cache_threads,
+                max_items=settings.chat_history_max_items,
+            ),
         )
 
-        if after:
-            index_map = {item.id: idx for idx, item in enumerate(items)}
-            start = index_map.get(after, -1) + 1
-        else:
-            start = 0
-
-        slice_items = items[start : start + limit + 1]
-        has_more = len(slice_items) > limit
-        slice_items = slice_items[:limit]
-        next_after = slice_items[-1].id if has_more and slice_items else None
-        return Page(data=slice_items, has_more=has_more, after=next_after)
-
     async def add_thread_item(
         self, thread_id: str, item: ThreadItem, context: dict[str, Any]
     ) -> None:
-        self._items(thread_id).append(item.model_copy(deep=True))
-        await self._persist_transcript(thread_id, item, context)
+        with tracer.span("store.add_thread_item", attributes={"chatkit.item_type": item.type}):
+            await _SharedMemoryStore.add_thread_item(self, thread_id, item, context)
 
     async def save_item(self, thread_id: str, item: ThreadItem, context: dict[str, Any]) -> None:
-        items = self._items(thread_id)
-        for idx, existing in enumerate(items):
-            if existing.id == item.id:
-                items[idx] = item.model_copy(deep=True)
-                await self._persist_transcript(thread_id, item, context)
-                return
-        items.append(item.model_copy(deep=True))
-        await self._persist_transcript(thread_id, item, context)
-
-    async def load_item(self, thread_id: str, item_id: str, context: dict[str, Any]) -> ThreadItem:
-        for item in self._items(thread_id):
-            if item.id == item_id:
-                return item.model_copy(deep=True)
-        raise NotFoundError(f"Item {item_id} not found")
+        with tracer.span("store.save_item", attributes={"chatkit.item_type": item.type}):
+            await _SharedMemoryStore.save_item(self, thread_id, item, context)
 
-    async def delete_thread_item(
-        self, thread_id: str, item_id: str, context: dict[str, Any]
-    ) -> None:
-        items = self._items(thread_id)
-        self._threads[thread_id].items = [item for item in items if item.id != item_id]
-        self._persisted_item_states.pop(f"{thread_id}:{item_id}", None)
-
-    async def _persist_transcript(
-        self,
-        thread_id: str,
-        item: ThreadItem,
-        context: dict[str, Any],
+    async def _on_item_written(
+        self, thread_id: str, item: ThreadItem, context: dict[str, Any]
     ) -> None:
-        """Persist user/assistant messages to external stores."""
-
-        user = context.get("user")
-        if user is None:
-            return
-
-        item_type = getattr(item, "type", None)
-        role = None
-        if item_type == "user_message":
-            role = "user"
-        elif item_type == "assistant_message":
-            role = "assistant"
-        if role is None:
-            return
-
-        status = getattr(item, "status", None)
-        if status in {"in_progress", "streaming", "pending"}:
-            return
-
-        text_parts: list[str] = []
-        for part in getattr(item, "content", []) or []:
-            maybe_text = getattr(part, "text", None)
-            if maybe_text:
-                text_parts.append(maybe_text)
-                continue
-            dump = part.model_dump() if hasattr(part, "model_dump") else {}
-            value = dump.get("text") or dump.get("value") or dump.get("input_text") or dump.get("output_text")
-            if isinstance(value, str) and value.strip():
-                text_parts.append(value)
-
-        message = " ".join(chunk.strip() for chunk in text_parts if chunk).strip()
-        if not message:
-            return
-
-        item_id = getattr(item, "id", None)
-        if not item_id:
-            return
-
-        cache_key = f"{thread_id}:{item_id}"
-        payload_signature = f"{role}:{message}"
-        if self._persisted_item_states.get(cache_key) == payload_signature:
-            return
-
-        try:
-            # plan-step[2]: mirror every finalized chat turn into long-term storage for recalls.
-            await record_chat_message(
-                user.id,
-                thread_id=thread_id,
-                item_id=item_id,
-                role=role,
-                message=message,
-                metadata={"status": status} if status else None,
-            )
-        except Exception:  # pragma: no cover - persistence failures shouldn't break chat
-            logger.exception("Failed to persist chat transcript entry", extra={"thread_id": thread_id})
-            return
+        self._record_history(thread_id, item)
+        await self._persist_transcript(thread_id, item, context)
 
-        self._persisted_item_states[cache_key] = payload_signature
+    def _on_item_deleted(self, thread_id: str, item_id: str) -> None:
+        self._forget_transcript(thread_id, item_id)
 
-    # -- Files -----------------------------------------------------------
-    # These methods are not currently used but required to be compatible with the Store interface.
+    def _on_thread_discarded(self, thread_id: str) -> None:
+        self._forget_history(thread_id)
+        self._forget_thread_transcripts(thread_id)
 
-    async def save_attachment(
-        self,
-        attachment: Attachment,
-        context: dict[str, Any],
+    async def _on_items_evicted(
+        self, thread_id: str, owner_id: UUID | None, items: list[ThreadItem]
     ) -> None:
-        raise NotImplementedError(
-            "MemoryStore does not persist attachments. Provide a Store implementation "
-            "that enforces authentication and authorization before enabling uploads."
-        )
-
-    async def load_attachment(
-        self,
-        attachment_id: str,
-        context: dict[str, Any],
-    ) -> Attachment:
-        raise NotImplementedError(
-            "MemoryStore does not load attachments. Provide a Store implementation "
-            "that enforces authentication and authorization before enabling uploads."
-        )
-
-    async def delete_attachment(self, attachment_id: str, context: dict[str, Any]) -> None:
-        raise NotImplementedError(
-            "MemoryStore does not delete attachments because they are never stored."
-        )
+        self._forget_history(thread_id)
+        if owner_id is not None:
+            for item in items:
+                if await self._queue_transcript(thread_id, item, owner_id):
+                    self.stats.spilled_items += 1
+        states = self._persisted_item_states.get(thread_id)
+        if states is not None:
+            for item in items:
+                states.pop(item.id, None)
+
+
+__all__ = ["MemoryStore"]
@@ -0,0 +1,373 @@
+"""Prometheus text-format metrics for the API process.
+
+Counters, gauges and histograms live in a process-wide ``REGISTRY`` and are
+rendered by ``GET /metrics``. Components that already keep their own
+counters (the transcript queue, caches, stores, pools) are exported through
+``register_snapshot``, which reads their ``snapshot()`` at scrape time.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_LabelKey = tuple[tuple[str, str], ...]
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+LATENCY_BUCKETS: Sequence[float] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+
+def _metric_name(name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", name)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(
+    name: str, labels: Mapping[str, str], snapshot: Mapping[str, Any]
+) -> list[str]:
+    lines = [
+        f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(snapshot['sum']))}")
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    DEFAULT_BUCKETS: Sequence[float] = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (0 when empty)."""
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self._bounds, self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative: dict[str, int] = {}
+        seen = 0
+        for bound, bucket_count in zip(self._bounds, self._counts):
+            seen += bucket_count
+            cumulative[f"{bound:g}"] = seen
+        cumulative["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.sum, 3), "buckets": cumulative}
+
+
+class _Family:
+    __slots__ = ("name", "kind", "help", "lines")
+
+    def __init__(self, name: str, kind: str, help_text: str) -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.lines: list[str] = []
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(f"{line}\n" for line in self.lines)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = _metric_name(name)
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Mapping[str, str]) -> _LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def collect(self, family: _Family) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[_LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self, family: _Family) -> None:
+        for key, value in self._values.items():
+            family.lines.append(f"{self.name}{_format_labels(dict(key))} {_format_value(value)}")
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._buckets = tuple(buckets)
+        self._series: Dict[_LabelKey, LatencyHistogram] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = LatencyHistogram(self._buckets)
+        series.observe(value)
+
+    def collect(self, family: _Family) -> None:
+        for key, series in self._series.items():
+            family.lines.extend(_histogram_lines(self.name, dict(key), series.snapshot()))
+
+
+class MetricsRegistry:
+    """Named metrics plus snapshot callbacks rendered in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._snapshots: list[tuple[str, Callable[[], Mapping[str, Any]], Dict[str, str]]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_snapshot(
+        self, prefix: str, snapshot: Callable[[], Mapping[str, Any]], **labels: str
+    ) -> None:
+        """Export a component's ``snapshot()`` dict as ``<prefix>_<key>`` series.
+
+        Numbers become untyped samples, ``LatencyHistogram`` snapshots become
+        histograms and flat dicts of numbers get a ``key`` label.
+        """
+
+        self._snapshots.append((prefix, snapshot, labels))
+
+    def render(self) -> str:
+        families: Dict[str, _Family] = {}
+
+        def _family(name: str, kind: str, help_text: str) -> _Family:
+            family = families.get(name)
+            if family is None:
+                family = families[name] = _Family(name, kind, help_text)
+            return family
+
+        for metric in self._metrics.values():
+            metric.collect(_family(metric.name, metric.kind, metric.help))
+
+        for prefix, snapshot, labels in self._snapshots:
+            try:
+                values = snapshot()
+            except Exception:  # pragma: no cover - a broken collector must not fail the scrape
+                logger.exception("Metrics snapshot failed", extra={"prefix": prefix})
+                continue
+            for key, value in values.items():
+                name = _metric_name(f"{prefix}_{key}")
+                help_text = f"{key} reported by {prefix}"
+                if isinstance(value, bool) or value is None:
+                    continue
+                if isinstance(value, (int, float)):
+                    _family(name, "untyped", help_text).lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+                elif isinstance(value, Mapping) and "buckets" in value:
+                    _family(name, "histogram", help_text).lines.extend(
+                        _histogram_lines(name, labels, value)
+                    )
+                elif isinstance(value, Mapping):
+                    family = _family(name, "untyped", help_text)
+                    for sub_key, sub_value in value.items():
+                        if isinstance(sub_value, (int, float)) and not isinstance(sub_value, bool):
+                            family.lines.append(
+                                f"{name}{_format_labels({**labels, 'key': sub_key})} "
+                                f"{_format_value(sub_value)}"
+                            )
+
+        return "".join(family.render() for family in families.values() if family.lines)
+
+
+REGISTRY = MetricsRegistry()
+
+http_requests_in_flight = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+http_request_duration_seconds = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, including streamed bodies.",
+    ("method", "route", "status"),
+)
+upstream_request_duration_seconds = REGISTRY.histogram(
+    "upstream_request_duration_seconds",
+    "Duration of calls to upstream services.",
+    ("upstream", "operation", "outcome"),
+)
+db_pool_acquire_seconds = REGISTRY.histogram(
+    "db_pool_acquire_seconds",
+    "Time to check a connection out of the database pool, including new connects.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+
+@contextmanager
+def observe_upstream(upstream: str, operation: str) -> Iterator[None]:
+    """Time the enclosed upstream call into ``upstream_request_duration_seconds``."""
+
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    except BaseException:
+        outcome = "cancelled"
+        raise
+    finally:
+        upstream_request_duration_seconds.observe(
+            time.perf_counter() - started, upstream=upstream, operation=operation, outcome=outcome
+        )
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests and per-route latency.
+
+    Routes are labelled by their path template (``/facts/{fact_id}/save``),
+    and unmatched paths share one ``unmatched`` label to bound cardinality.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def _send(message: Any) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route,
+                status=str(status_code),
+            )
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "LatencyHistogram",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "REGISTRY",
+    "db_pool_acquire_seconds",
+    "http_request_duration_seconds",
+    "http_requests_in_flight",
+    "observe_upstream",
+    "upstream_request_duration_seconds",
+]
@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+from typing import Any
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, String, Text, UniqueConstraint, func
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -114,24 +115,97 @@ class UserVectorStore(Base, TimestampMixin):
 
 
 class ChatTranscriptMessage(Base, TimestampMixin):
-    """Archived chat transcript entries for user review."""
+    """Archived chat transcript entries for user review.
+
+    On PostgreSQL the table is range partitioned by month on ``created_at``, so
+    the primary key and ``item_id`` uniqueness both include the partition key.
+    """
 
     __tablename__ = "chat_transcript_messages"
+    # Keyset pagination walks (created_at, id) within a user, optionally within one thread.
+    __table_args__ = (
+        UniqueConstraint("item_id", "created_at", name="uq_chat_transcript_messages_item_id_created_at"),
+        Index("ix_chat_transcript_messages_user_created", "user_id", "created_at", "id"),
+        Index(
+            "ix_chat_transcript_messages_user_thread_created",
+            "user_id",
+            "thread_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
     )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     thread_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    item_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    item_id: Mapped[str] = mapped_column(String(255), nullable=False)
     role: Mapped[str] = mapped_column(String(32), nullable=False)
     message: Mapped[str] = mapped_column(Text, nullable=False)
 
     user: Mapped[User] = relationship(back_populates="transcript_messages")
 
 
+# Created by migrations on PostgreSQL only (SQLite has no tsvector), so they are not
+# mapped above; alembic's autogenerate skips them instead of proposing to drop them.
+TRANSCRIPT_SEARCH_COLUMN = "message_tsv"
+POSTGRES_ONLY_OBJECTS = frozenset(
+    {TRANSCRIPT_SEARCH_COLUMN, "ix_chat_transcript_messages_message_tsv"}
+)
+# Monthly partitions are named ``chat_transcript_messages_pYYYYMM``.
+TRANSCRIPT_PARTITION_PREFIX = "chat_transcript_messages_p"
+
+
+class ChatKitThread(Base):
+    """Durable ChatKit thread metadata shared across API workers."""
+
+    __tablename__ = "chatkit_threads"
+    __table_args__ = (Index("ix_chatkit_threads_user_id_created_at", "user_id", "created_at", "id"),)
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    payload: Mapped[dict[str, Any]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=False
+    )
+
+
+class ChatKitThreadItem(Base):
+    """Durable ChatKit thread item keyed for ``(created_at, id)`` keyset pagination."""
+
+    __tablename__ = "chatkit_thread_items"
+    __table_args__ = (
+        Index("ix_chatkit_thread_items_thread_id_created_at", "thread_id", "created_at", "id"),
+    )
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    thread_id: Mapped[str] = mapped_column(
+        String(255), ForeignKey("chatkit_threads.id", ondelete="CASCADE"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    payload: Mapped[dict[str, Any]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=False
+    )
+
+
 class OutboundEmail(Base, TimestampMixin):
     """Email messages queued for delivery (stored in Neon)."""
 
@@ -147,10 +221,14 @@ class OutboundEmail(Base, TimestampMixin):
 
 
 __all__ = [
+    "ChatKitThread",
+    "ChatKitThreadItem",
     "ChatTranscriptMessage",
     "MicroAgent",
     "MicroAgentStatus",
     "OutboundEmail",
+    "POSTGRES_ONLY_OBJECTS",
+    "TRANSCRIPT_SEARCH_COLUMN",
     "UserVectorStore",
     "PasswordResetToken",
     "User",
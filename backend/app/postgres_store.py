@@ -0,0 +1,371 @@
+"""Postgres-backed ChatKit store shared across API workers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Sequence, TypeVar
+
+from chatkit.store import NotFoundError
+from chatkit.types import Attachment, Page, Thread, ThreadItem, ThreadMetadata
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, and_, delete, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .config import get_settings
+from .database import SessionLocal, as_utc, dialect_insert
+from .history import ThreadHistoryCache
+from .models import ChatKitThread, ChatKitThreadItem
+from .tracing import tracer
+from .transcripts import TranscriptMirroringStore
+
+logger = logging.getLogger(__name__)
+
+_thread_item_adapter: TypeAdapter[ThreadItem] = TypeAdapter(ThreadItem)
+
+_Row = TypeVar("_Row", ChatKitThread, ChatKitThreadItem)
+
+
+class _PendingItem(NamedTuple):
+    thread_id: str
+    user_id: uuid.UUID | None
+    created_at: datetime
+    payload: dict[str, Any]
+
+
+def _context_user_id(context: dict[str, Any]) -> uuid.UUID | None:
+    return getattr(context.get("user"), "id", None)
+
+
+def _visible_to(user_id: uuid.UUID | None, owner_id: uuid.UUID | None) -> bool:
+    return user_id is None or owner_id in {None, user_id}
+
+
+def _owned_thread(thread_id: str, user_id: uuid.UUID | None) -> ColumnElement[bool]:
+    """Match ``thread_id`` only when it is unowned or owned by ``user_id``, like ``load_thread``."""
+
+    if user_id is None:
+        return ChatKitThread.id == thread_id
+    return and_(
+        ChatKitThread.id == thread_id,
+        or_(ChatKitThread.user_id.is_(None), ChatKitThread.user_id == user_id),
+    )
+
+
+def _thread_item_filters(thread_id: str, context: dict[str, Any]) -> list[ColumnElement[bool]]:
+    owned = select(ChatKitThread.id).where(_owned_thread(thread_id, _context_user_id(context)))
+    return [ChatKitThreadItem.thread_id == thread_id, ChatKitThreadItem.thread_id.in_(owned)]
+
+
+def _thread_payload(thread: ThreadMetadata | Thread) -> dict[str, Any]:
+    payload = thread.model_dump(mode="json")
+    payload.pop("items", None)
+    return payload
+
+
+async def _keyset_page(
+    session: AsyncSession,
+    model: type[_Row],
+    filters: Sequence[ColumnElement[bool]],
+    after: str | None,
+    limit: int,
+    order: str,
+) -> tuple[list[_Row], bool]:
+    """Fetch a ``(created_at, id)`` keyset page of ``model`` rows after the ``after`` cursor."""
+
+    descending = order == "desc"
+    cursor = tuple_(model.created_at, model.id)
+    stmt = select(model).where(*filters)
+    if after:
+        anchor = (
+            await session.execute(
+                select(model.created_at, model.id).where(model.id == after, *filters)
+            )
+        ).first()
+        if anchor is not None:
+            bound = tuple_(anchor.created_at, anchor.id)
+            stmt = stmt.where(cursor < bound if descending else cursor > bound)
+
+    if descending:
+        stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        stmt = stmt.order_by(model.created_at.asc(), model.id.asc())
+    rows = list((await session.scalars(stmt.limit(limit + 1))).all())
+    return rows[:limit], len(rows) > limit
+
+
+class PostgresStore(TranscriptMirroringStore):
+    """ChatKit store persisting threads and items to Postgres.
+
+    Item writes from ``add_thread_item`` and ``save_item`` are buffered and
+    flushed as a single multi-row upsert once ``batch_size`` items are pending
+    or ``flush_interval`` seconds have passed. Reads flush the buffer first so
+    callers always observe their own writes; ``load_item`` also serves the
+    batch a flush is still writing, and deletes wait for that flush to commit.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        *,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        history_cache: ThreadHistoryCache | None = None,
+    ) -> None:
+        # Other workers write the same threads, so history caching is opt-in here.
+        super().__init__(history_cache=history_cache)
+        settings = get_settings()
+        self._session_factory = session_factory
+        self._batch_size = max(1, batch_size or settings.chatkit_store_batch_size)
+        self._flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else settings.chatkit_store_flush_interval_ms / 1000
+        )
+        self._pending: dict[str, _PendingItem] = {}
+        # The batch being written by ``flush``, readable until its commit lands.
+        self._in_flight: dict[str, _PendingItem] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    # -- Thread metadata -------------------------------------------------
+    async def load_thread(self, thread_id: str, context: dict[str, Any]) -> ThreadMetadata:
+        user_id = _context_user_id(context)
+        async with self._session_factory() as session:
+            row = await session.get(ChatKitThread, thread_id)
+        if row is None or not _visible_to(user_id, row.user_id):
+            raise NotFoundError(f"Thread {thread_id} not found")
+        return ThreadMetadata.model_validate(row.payload)
+
+    async def save_thread(self, thread: ThreadMetadata, context: dict[str, Any]) -> None:
+        user_id = _context_user_id(context)
+        async with self._session_factory() as session:
+            insert = dialect_insert(session)
+            stmt = insert(ChatKitThread).values(
+                id=thread.id,
+                user_id=user_id,
+                created_at=as_utc(thread.created_at),
+                payload=_thread_payload(thread),
+            )
+            # Another user's thread with the same id is left untouched.
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ChatKitThread.id],
+                set_={"payload": stmt.excluded.payload, "created_at": stmt.excluded.created_at},
+                where=_owned_thread(thread.id, user_id),
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def load_threads(
+        self,
+        limit: int,
+        after: str | None,
+        order: str,
+        context: dict[str, Any],
+    ) -> Page[ThreadMetadata]:
+        user_id = _context_user_id(context)
+        filters = [ChatKitThread.user_id == user_id] if user_id is not None else []
+        async with self._session_factory() as session:
+            rows, has_more = await _keyset_page(
+                session, ChatKitThread, filters, after, limit, order
+            )
+        threads = [ThreadMetadata.model_validate(row.payload) for row in rows]
+        next_after = threads[-1].id if has_more and threads else None
+        return Page(data=threads, has_more=has_more, after=next_after)
+
+    async def delete_thread(self, thread_id: str, context: dict[str, Any]) -> None:
+        user_id = _context_user_id(context)
+        # Holding the flush lock keeps an in-flight batch from re-creating deleted items.
+        async with self._flush_lock, self._session_factory() as session:
+            for item_id, pending in list(self._pending.items()):
+                if pending.thread_id == thread_id and _visible_to(user_id, pending.user_id):
+                    del self._pending[item_id]
+            await session.execute(
+                delete(ChatKitThreadItem).where(*_thread_item_filters(thread_id, context))
+            )
+            await session.execute(delete(ChatKitThread).where(_owned_thread(thread_id, user_id)))
+            await session.commit()
+        self._forget_history(thread_id)
+        self._forget_thread_transcripts(thread_id)
+
+    # -- Thread items ----------------------------------------------------
+    async def load_thread_items(
+        self,
+        thread_id: str,
+        after: str | None,
+        limit: int,
+        order: str,
+        context: dict[str, Any],
+    ) -> Page[ThreadItem]:
+        await self.flush()
+        filters = _thread_item_filters(thread_id, context)
+        async with self._session_factory() as session:
+            rows, has_more = await _keyset_page(
+                session, ChatKitThreadItem, filters, after, limit, order
+            )
+        items = [_thread_item_adapter.validate_python(row.payload) for row in rows]
+        next_after = items[-1].id if has_more and items else None
+        return Page(data=items, has_more=has_more, after=next_after)
+
+    async def add_thread_item(
+        self, thread_id: str, item: ThreadItem, context: dict[str, Any]
+    ) -> None:
+        with tracer.span("store.add_thread_item", attributes={"chatkit.item_type": item.type}):
+            await self._enqueue(thread_id, item, context)
+            self._record_history(thread_id, item)
+            await self._persist_transcript(thread_id, item, context)
+
+    async def save_item(self, thread_id: str, item: ThreadItem, context: dict[str, Any]) -> None:
+        with tracer.span("store.save_item", attributes={"chatkit.item_type": item.type}):
+            await self._enqueue(thread_id, item, context)
+            self._record_history(thread_id, item)
+            await self._persist_transcript(thread_id, item, context)
+
+    async def load_item(self, thread_id: str, item_id: str, context: dict[str, Any]) -> ThreadItem:
+        pending = self._pending.get(item_id) or self._in_flight.get(item_id)
+        if (
+            pending is not None
+            and pending.thread_id == thread_id
+            and _visible_to(_context_user_id(context), pending.user_id)
+        ):
+            return _thread_item_adapter.validate_python(pending.payload)
+
+        async with self._session_factory() as session:
+            row = await session.scalar(
+                select(ChatKitThreadItem).where(
+                    ChatKitThreadItem.id == item_id, *_thread_item_filters(thread_id, context)
+                )
+            )
+        if row is None:
+            raise NotFoundError(f"Item {item_id} not found")
+        return _thread_item_adapter.validate_python(row.payload)
+
+    async def delete_thread_item(
+        self, thread_id: str, item_id: str, context: dict[str, Any]
+    ) -> None:
+        async with self._flush_lock, self._session_factory() as session:
+            pending = self._pending.get(item_id)
+            if pending is not None and _visible_to(_context_user_id(context), pending.user_id):
+                del self._pending[item_id]
+            await session.execute(
+                delete(ChatKitThreadItem).where(
+                    ChatKitThreadItem.id == item_id, *_thread_item_filters(thread_id, context)
+                )
+            )
+            await session.commit()
+        self._forget_transcript(thread_id, item_id)
+
+    # -- Write batching --------------------------------------------------
+    async def _enqueue(self, thread_id: str, item: ThreadItem, context: dict[str, Any]) -> None:
+        self._pending[item.id] = _PendingItem(
+            thread_id=thread_id,
+            user_id=_context_user_id(context),
+            created_at=as_utc(item.created_at),
+            payload=item.model_dump(mode="json"),
+        )
+        if len(self._pending) >= self._batch_size or self._flush_interval <= 0:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        try:
+            await self.flush()
+        except Exception:  # pragma: no cover - retried on the next write or read
+            logger.exception("Failed to flush buffered ChatKit items")
+
+    async def flush(self) -> None:
+        """Write all buffered items in one multi-row upsert."""
+
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._in_flight = batch
+            try:
+                await self._write_items(batch)
+            except BaseException:
+                for item_id, pending in batch.items():
+                    self._pending.setdefault(item_id, pending)
+                raise
+            finally:
+                self._in_flight = {}
+
+    async def _write_items(self, batch: dict[str, _PendingItem]) -> None:
+        now = datetime.now(timezone.utc)
+        threads: dict[str, dict[str, Any]] = {}
+        for pending in batch.values():
+            threads.setdefault(
+                pending.thread_id,
+                {
+                    "id": pending.thread_id,
+                    "user_id": pending.user_id,
+                    "created_at": now,
+                    "payload": _thread_payload(
+                        ThreadMetadata(id=pending.thread_id, created_at=now)
+                    ),
+                },
+            )
+
+        async with self._session_factory() as session:
+            insert = dialect_insert(session)
+            await session.execute(
+                insert(ChatKitThread)
+                .values(list(threads.values()))
+                .on_conflict_do_nothing(index_elements=[ChatKitThread.id])
+            )
+            stmt = insert(ChatKitThreadItem).values(
+                [
+                    {
+                        "id": item_id,
+                        "thread_id": pending.thread_id,
+                        "created_at": pending.created_at,
+                        "payload": pending.payload,
+                    }
+                    for item_id, pending in batch.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ChatKitThreadItem.id],
+                set_={
+                    "thread_id": stmt.excluded.thread_id,
+                    "created_at": stmt.excluded.created_at,
+                    "payload": stmt.excluded.payload,
+                },
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"pending_items": len(self._pending)}
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    # -- Files -----------------------------------------------------------
+    async def save_attachment(
+        self,
+        attachment: Attachment,
+        context: dict[str, Any],
+    ) -> None:
+        raise NotImplementedError("PostgresStore does not persist attachments.")
+
+    async def load_attachment(
+        self,
+        attachment_id: str,
+        context: dict[str, Any],
+    ) -> Attachment:
+        raise NotImplementedError("PostgresStore does not load attachments.")
+
+    async def delete_attachment(self, attachment_id: str, context: dict[str, Any]) -> None:
+        raise NotImplementedError(
+            "PostgresStore does not delete attachments because they are never stored."
+        )
+
+
+__all__ = ["PostgresStore"]
@@ -0,0 +1,337 @@
+"""Local BM25 recall over each user's transcript and fact text.
+
+Every memory written to a user's OpenAI vector store is also added to a
+small in-process inverted index, so a chat turn can look up the user's most
+relevant memories in microseconds. Workflow runs receive the local top-k as
+``local_memories`` together with ``memory_source``: ``"local"`` when the best
+match clears ``LOCAL_RECALL_MIN_SCORE`` and ``"remote"`` otherwise, which an
+Agent Builder condition can use to skip the paid ``file_search`` step.
+
+Indexes are per worker and start cold; the first lookup for a user warms it
+from the transcript table.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Collection, Iterable, Iterator, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+
+from .config import get_settings
+from .database import SessionLocal
+from .metrics import LatencyHistogram
+from .models import ChatTranscriptMessage
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[^\W_]+")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by do does for from had has have i i'm if in into is it its
+    me my of on or our so than that the their them then there these they this to was we
+    were what when where which who why will with you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in _TOKEN.findall(text.lower())
+        if token not in _STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+class RecallHit(NamedTuple):
+    doc_id: str
+    text: str
+    kind: str
+    score: float
+    """BM25 score relative to an average-length document containing each query term once, capped at 1."""
+
+
+class _Document(NamedTuple):
+    text: str
+    kind: str
+    terms: Counter[str]
+    length: int
+
+
+class BM25Index:
+    """Incrementally maintained BM25 inverted index over one user's documents.
+
+    Re-adding a ``doc_id`` replaces its text. Once ``max_documents`` are
+    stored, the oldest document is dropped for each new one.
+    """
+
+    def __init__(self, *, max_documents: int = 5000, k1: float = 1.2, b: float = 0.75) -> None:
+        self.max_documents = max(1, max_documents)
+        self.k1 = k1
+        self.b = b
+        self._documents: OrderedDict[str, _Document] = OrderedDict()
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def documents(self) -> Iterator[tuple[str, str, str]]:
+        """Yield ``(doc_id, text, kind)`` from oldest to newest."""
+
+        for doc_id, document in self._documents.items():
+            yield doc_id, document.text, document.kind
+
+    def add(self, doc_id: str, text: str, *, kind: str = "message") -> None:
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        if not terms:
+            return
+        length = sum(terms.values())
+        self._documents[doc_id] = _Document(text, kind, terms, length)
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        while len(self._documents) > self.max_documents:
+            self.remove(next(iter(self._documents)))
+
+    def remove(self, doc_id: str) -> None:
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def _idf(self, term: str) -> float:
+        frequency = len(self._postings.get(term, ()))
+        count = len(self._documents)
+        return math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query: str, k: int = 5, *, exclude: Collection[str] = ()) -> list[RecallHit]:
+        """Return up to ``k`` documents sharing terms with ``query``, best first."""
+
+        terms = set(tokenize(query))
+        if not terms or not self._documents:
+            return []
+        average_length = self._total_length / len(self._documents)
+        scores: dict[str, float] = {}
+        ceiling = 0.0
+        for term in terms:
+            idf = self._idf(term)
+            ceiling += idf
+            for doc_id, frequency in self._postings.get(term, {}).items():
+                if doc_id in exclude:
+                    continue
+                length = self._documents[doc_id].length
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (
+                    frequency + norm
+                )
+        if ceiling <= 0:
+            return []
+        ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)[: max(1, k)]
+        return [
+            RecallHit(
+                doc_id,
+                self._documents[doc_id].text,
+                self._documents[doc_id].kind,
+                min(1.0, score / ceiling),
+            )
+            for doc_id, score in ranked
+        ]
+
+
+WarmLoader = Callable[[UUID, int], Awaitable[Iterable[tuple[str, str]]]]
+
+
+async def _load_transcript(user_id: UUID, limit: int) -> list[tuple[str, str]]:
+    async with SessionLocal() as session:
+        rows = await session.execute(
+            select(ChatTranscriptMessage.item_id, ChatTranscriptMessage.message)
+            .where(ChatTranscriptMessage.user_id == user_id)
+            .order_by(ChatTranscriptMessage.created_at.desc())
+            .limit(limit)
+        )
+        # Oldest first, so the newest rows are the last to be evicted.
+        return [(row.item_id, row.message) for row in reversed(rows.all())]
+
+
+@dataclass(slots=True)
+class RecallStats:
+    queries: int = 0
+    local_hits: int = 0
+    misses: int = 0
+    documents_added: int = 0
+    warm_loads: int = 0
+    warm_failures: int = 0
+    evicted_users: int = 0
+    query_seconds: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram((0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+    )
+
+
+class RecallResult(NamedTuple):
+    hits: list[RecallHit]
+    confident: bool
+
+
+class LocalRecall:
+    """Per-user BM25 indexes for the ``max_users`` most recently active users."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        max_users: int = 1000,
+        max_documents_per_user: int = 5000,
+        warm_rows: int = 2000,
+        min_score: float = 0.5,
+        warm_retry_seconds: float = 30.0,
+        loader: WarmLoader = _load_transcript,
+    ) -> None:
+        self.enabled = enabled
+        self.max_users = max(1, max_users)
+        self.max_documents_per_user = max_documents_per_user
+        self.warm_rows = warm_rows
+        self.min_score = min_score
+        self.warm_retry_seconds = warm_retry_seconds
+        self._loader = loader
+        self._indexes: OrderedDict[UUID, BM25Index] = OrderedDict()
+        self._warmed: set[UUID] = set()
+        self._warming: dict[UUID, asyncio.Future[None]] = {}
+        # Users whose warm-up failed, with the monotonic time of the next attempt.
+        self._warm_retry_at: dict[UUID, float] = {}
+        self.stats = RecallStats()
+
+    def _index(self, user_id: UUID) -> BM25Index:
+        index = self._indexes.get(user_id)
+        if index is None:
+            index = self._indexes[user_id] = BM25Index(max_documents=self.max_documents_per_user)
+            while len(self._indexes) > self.max_users:
+                evicted, _ = self._indexes.popitem(last=False)
+                self._warmed.discard(evicted)
+                self._warm_retry_at.pop(evicted, None)
+                self.stats.evicted_users += 1
+        else:
+            self._indexes.move_to_end(user_id)
+        return index
+
+    def add(self, user_id: UUID, doc_id: str, text: str, *, kind: str = "message") -> None:
+        """Index one memory as it is written; replaces an earlier version of ``doc_id``."""
+
+        if not self.enabled:
+            return
+        self._index(user_id).add(doc_id, text, kind=kind)
+        self.stats.documents_added += 1
+
+    async def _warm(self, user_id: UUID) -> None:
+        if user_id in self._warmed or self.warm_rows <= 0:
+            return
+        if self._warm_retry_at.get(user_id, 0.0) > time.monotonic():
+            return
+        pending = self._warming.get(user_id)
+        if pending is not None:
+            await asyncio.shield(pending)
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._warming[user_id] = future
+        try:
+            rows = await self._loader(user_id, self.warm_rows)
+            warmed = BM25Index(max_documents=self.max_documents_per_user)
+            for doc_id, text in rows:
+                warmed.add(doc_id, text)
+            # Memories indexed before or during the load are the newest; re-adding
+            # them last keeps them furthest from eviction.
+            for doc_id, text, kind in self._index(user_id).documents():
+                warmed.add(doc_id, text, kind=kind)
+            self._indexes[user_id] = warmed
+            self._warmed.add(user_id)
+            self._warm_retry_at.pop(user_id, None)
+            self.stats.warm_loads += 1
+        except Exception:
+            # Serve from what is indexed until the retry time instead of reloading every turn.
+            self._warm_retry_at[user_id] = time.monotonic() + self.warm_retry_seconds
+            self.stats.warm_failures += 1
+            logger.warning(
+                "Failed to warm local recall index", extra={"user_id": str(user_id)}, exc_info=True
+            )
+        finally:
+            self._warming.pop(user_id, None)
+            future.set_result(None)
+
+    async def search(
+        self, user_id: UUID, query: str, *, k: int = 5, exclude: Collection[str] = ()
+    ) -> RecallResult:
+        """Return the user's top ``k`` local memories and whether the best clears ``min_score``.
+
+        ``exclude`` drops documents such as the message being answered, which
+        the transcript queue may already have indexed.
+        """
+
+        if not self.enabled or not query.strip():
+            return RecallResult([], False)
+        await self._warm(user_id)
+        started = time.perf_counter()
+        index = self._indexes.get(user_id)
+        hits = index.search(query, k, exclude=exclude) if index is not None else []
+        self.stats.query_seconds.observe(time.perf_counter() - started)
+        self.stats.queries += 1
+        confident = bool(hits) and hits[0].score >= self.min_score
+        if confident:
+            self.stats.local_hits += 1
+        else:
+            self.stats.misses += 1
+        return RecallResult(hits, confident)
+
+    def forget_user(self, user_id: UUID) -> None:
+        self._indexes.pop(user_id, None)
+        self._warmed.discard(user_id)
+        self._warm_retry_at.pop(user_id, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "users": len(self._indexes),
+            "documents": sum(len(index) for index in self._indexes.values()),
+            "queries": self.stats.queries,
+            "local_hits": self.stats.local_hits,
+            "misses": self.stats.misses,
+            "local_hit_rate": self.stats.local_hits / self.stats.queries
+            if self.stats.queries
+            else 0.0,
+            "documents_added": self.stats.documents_added,
+            "warm_loads": self.stats.warm_loads,
+            "warm_failures": self.stats.warm_failures,
+            "evicted_users": self.stats.evicted_users,
+            "query_seconds": self.stats.query_seconds.snapshot(),
+        }
+
+
+settings = get_settings()
+
+local_recall = LocalRecall(
+    enabled=settings.local_recall_enabled,
+    max_users=settings.local_recall_max_users,
+    max_documents_per_user=settings.local_recall_max_documents_per_user,
+    warm_rows=settings.local_recall_warm_rows,
+    min_score=settings.local_recall_min_score,
+)
+
+
+__all__ = ["BM25Index", "LocalRecall", "RecallHit", "RecallResult", "local_recall", "tokenize"]
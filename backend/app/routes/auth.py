@@ -15,7 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import get_settings
 from ..database import get_session
-from ..dependencies import get_current_user
+from ..dependencies import auth_cache, get_current_user
 from ..email import queue_email
 from ..models import PasswordResetToken, User
 from ..schemas import (
@@ -83,6 +83,19 @@ def _get_stack_client() -> StackAuthClient:
     return StackAuthClient.from_settings()
 
 
+def open_stack_client() -> None:
+    """Open the pooled Stack Auth HTTP client before the first exchange."""
+
+    _get_stack_client().start()
+
+
+async def close_stack_client() -> None:
+    """Close the pooled Stack Auth HTTP client if one was created."""
+
+    if _get_stack_client.cache_info().currsize:
+        await _get_stack_client().aclose()
+
+
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(
     payload: SignupRequest,
@@ -183,6 +196,7 @@ async def reset_password(
     reset_record.consumed_at = datetime.now(timezone.utc)
     await session.delete(reset_record)
     await session.commit()
+    auth_cache.invalidate_user(user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -13,6 +13,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import get_settings
 from ..database import get_session
 from ..dependencies import get_current_user
+from ..executors import stripe_executor
+from ..metrics import observe_upstream
 from ..models import MicroAgent, MicroAgentStatus, User
 from ..schemas import (
     CheckoutSessionResponse,
@@ -54,18 +56,20 @@ async def subscribe_micro_agent(
     await session.flush()
 
     try:
-        checkout_session = stripe.checkout.Session.create(
-            mode="subscription",
-            success_url=settings.stripe_success_url,
-            cancel_url=settings.stripe_cancel_url,
-            line_items=[{"price": payload.price_id, "quantity": 1}],
-            customer_email=current_user.email,
-            metadata={
-                "micro_agent_id": str(micro_agent.id),
-                "user_id": str(current_user.id),
-                "workflow_id": payload.workflow_id,
-            },
-        )
+        with observe_upstream("stripe", "checkout_session_create"):
+            checkout_session = await stripe_executor.run(
+                stripe.checkout.Session.create,
+                mode="subscription",
+                success_url=settings.stripe_success_url,
+                cancel_url=settings.stripe_cancel_url,
+                line_items=[{"price": payload.price_id, "quantity": 1}],
+                customer_email=current_user.email,
+                metadata={
+                    "micro_agent_id": str(micro_agent.id),
+                    "user_id": str(current_user.id),
+                    "workflow_id": payload.workflow_id,
+                },
+            )
     except stripe.error.StripeError as exc:  # pragma: no cover - network failure path
         await session.rollback()
         logger.exception("Stripe checkout creation failed")
@@ -106,7 +110,10 @@ async def cancel_micro_agent(
 
     if micro_agent.stripe_subscription_id:
         try:
-            stripe.Subscription.delete(micro_agent.stripe_subscription_id)
+            with observe_upstream("stripe", "subscription_delete"):
+                await stripe_executor.run(
+                    stripe.Subscription.delete, micro_agent.stripe_subscription_id
+                )
         except stripe.error.InvalidRequestError as exc:  # pragma: no cover - cleanup failure
             logger.warning(
                 "Stripe subscription cancellation failed for %s", micro_agent.stripe_subscription_id, exc_info=exc
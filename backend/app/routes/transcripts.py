@@ -0,0 +1,308 @@
+"""Endpoints for reading and exporting archived chat transcripts."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import html
+import re
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    ColumnElement,
+    RowMapping,
+    Select,
+    and_,
+    func,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..database import SessionLocal, get_session
+from ..dependencies import get_current_user
+from ..models import TRANSCRIPT_SEARCH_COLUMN, ChatTranscriptMessage, User
+from ..schemas import (
+    ChatTranscriptMessageRead,
+    ChatTranscriptPage,
+    ChatTranscriptSearchHit,
+    ChatTranscriptSearchResponse,
+)
+
+router = APIRouter(prefix="/api/chatkit/transcript", tags=["transcripts"])
+
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+MAX_SEARCH_RESULTS = 50
+SEARCH_CONFIG = "english"
+# Control characters cannot come from typed text, so highlights survive HTML escaping.
+_MARK_START = "\x02"
+_MARK_STOP = "\x03"
+_HEADLINE_OPTIONS = (
+    f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, "
+    'MaxFragments=2, MinWords=8, MaxWords=24, FragmentDelimiter=" … "'
+)
+_SNIPPET_CONTEXT_CHARS = 80
+_SEARCH_TERM = re.compile(r"\w+")
+
+# Columns rather than ORM entities, so streamed rows never accumulate in a session's identity map.
+_COLUMNS = (
+    ChatTranscriptMessage.id,
+    ChatTranscriptMessage.thread_id,
+    ChatTranscriptMessage.item_id,
+    ChatTranscriptMessage.role,
+    ChatTranscriptMessage.message,
+    ChatTranscriptMessage.created_at,
+    ChatTranscriptMessage.updated_at,
+)
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Return an opaque cursor pointing just past ``(created_at, row_id)``."""
+
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+
+def _transcript_query(user_id: uuid.UUID, thread_id: str | None, order: str) -> Select:
+    stmt = select(*_COLUMNS).where(ChatTranscriptMessage.user_id == user_id)
+    if thread_id:
+        stmt = stmt.where(ChatTranscriptMessage.thread_id == thread_id)
+    if order == "desc":
+        return stmt.order_by(
+            ChatTranscriptMessage.created_at.desc(), ChatTranscriptMessage.id.desc()
+        )
+    return stmt.order_by(ChatTranscriptMessage.created_at.asc(), ChatTranscriptMessage.id.asc())
+
+
+@router.get("", response_model=ChatTranscriptPage)
+async def list_chat_transcript(
+    thread_id: str | None = None,
+    limit: int = 200,
+    after: str | None = None,
+    order: Literal["asc", "desc"] = "desc",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+) -> ChatTranscriptPage:
+    """Page through the user's transcript by ``(created_at, id)``, newest first by default."""
+
+    capped_limit = max(1, min(limit, MAX_PAGE_SIZE))
+    stmt = _transcript_query(current_user.id, thread_id, order)
+    if after:
+        created_at, row_id = decode_cursor(after)
+        key = tuple_(ChatTranscriptMessage.created_at, ChatTranscriptMessage.id)
+        # Bind the cursor with the columns' types so it compares like the key.
+        bound = tuple_(
+            literal(created_at, ChatTranscriptMessage.created_at.type),
+            literal(row_id, ChatTranscriptMessage.id.type),
+        )
+        stmt = stmt.where(key < bound if order == "desc" else key > bound)
+
+    rows = (await db.execute(stmt.limit(capped_limit + 1))).all()
+    has_more = len(rows) > capped_limit
+    data = [ChatTranscriptMessageRead.model_validate(row) for row in rows[:capped_limit]]
+    next_cursor = encode_cursor(data[-1].created_at, data[-1].id) if has_more else None
+    return ChatTranscriptPage(data=data, has_more=has_more, after=next_cursor)
+
+
+async def stream_transcript_ndjson(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: uuid.UUID,
+    thread_id: str | None = None,
+    *,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield the transcript oldest first as NDJSON, reading through a server-side cursor.
+
+    The export owns its session because the response body is produced after
+    request-scoped dependencies have been closed.
+    """
+
+    stmt = _transcript_query(user_id, thread_id, "asc").execution_options(yield_per=batch_size)
+    async with session_factory() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield b"".join(
+                ChatTranscriptMessageRead.model_validate(row).model_dump_json().encode() + b"\n"
+                for row in partition
+            )
+
+
+def _postgres_search(user_id: uuid.UUID, query: str, thread_id: str | None, limit: int) -> Select:
+    """Rank matches through the GIN-indexed ``message_tsv`` column.
+
+    ``websearch_to_tsquery`` accepts quoted phrases, ``or`` and ``-term``.
+    Headlines are the costly part, so they are built only for the top rows.
+    """
+
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    document: ColumnElement[Any] = literal_column(
+        f"{ChatTranscriptMessage.__tablename__}.{TRANSCRIPT_SEARCH_COLUMN}"
+    )
+    rank = func.ts_rank_cd(document, tsquery).label("rank")
+    ranked = select(
+        ChatTranscriptMessage.id,
+        ChatTranscriptMessage.thread_id,
+        ChatTranscriptMessage.item_id,
+        ChatTranscriptMessage.role,
+        ChatTranscriptMessage.message,
+        ChatTranscriptMessage.created_at,
+        rank,
+    ).where(ChatTranscriptMessage.user_id == user_id, document.op("@@")(tsquery))
+    if thread_id:
+        ranked = ranked.where(ChatTranscriptMessage.thread_id == thread_id)
+    top = (
+        ranked.order_by(rank.desc(), ChatTranscriptMessage.created_at.desc())
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        top.c.message,
+        func.websearch_to_tsquery(SEARCH_CONFIG, query),
+        _HEADLINE_OPTIONS,
+    )
+    return select(
+        top.c.id,
+        top.c.thread_id,
+        top.c.item_id,
+        top.c.role,
+        top.c.created_at,
+        top.c.rank,
+        snippet.label("snippet"),
+    ).order_by(top.c.rank.desc(), top.c.created_at.desc())
+
+
+def _render_snippet(raw: str) -> str:
+    return html.escape(raw).replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def _fallback_hit(row: RowMapping, terms: list[str]) -> ChatTranscriptSearchHit:
+    """Rank and highlight one row for databases without full-text search (SQLite)."""
+
+    message: str = row["message"]
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    matches = list(pattern.finditer(message))
+    first = matches[0].start() if matches else 0
+    start = max(0, first - _SNIPPET_CONTEXT_CHARS)
+    end = min(len(message), first + _SNIPPET_CONTEXT_CHARS)
+    excerpt = pattern.sub(
+        lambda match: f"{_MARK_START}{match.group(0)}{_MARK_STOP}", message[start:end]
+    )
+    raw = ("… " if start else "") + excerpt + (" …" if end < len(message) else "")
+    return ChatTranscriptSearchHit(
+        id=row["id"],
+        thread_id=row["thread_id"],
+        item_id=row["item_id"],
+        role=row["role"],
+        created_at=row["created_at"],
+        rank=len(matches) / max(1, len(_SEARCH_TERM.findall(message))),
+        snippet=_render_snippet(raw),
+    )
+
+
+async def search_transcripts(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    query: str,
+    *,
+    thread_id: str | None = None,
+    limit: int = 20,
+) -> list[ChatTranscriptSearchHit]:
+    """Return the user's transcript entries matching ``query``, best first."""
+
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    if session.get_bind().dialect.name == "postgresql":
+        rows = (await session.execute(_postgres_search(user_id, query, thread_id, limit))).all()
+        return [
+            ChatTranscriptSearchHit(
+                id=row.id,
+                thread_id=row.thread_id,
+                item_id=row.item_id,
+                role=row.role,
+                created_at=row.created_at,
+                rank=row.rank,
+                snippet=_render_snippet(row.snippet),
+            )
+            for row in rows
+        ]
+
+    terms = [term.lower() for term in _SEARCH_TERM.findall(query)]
+    if not terms:
+        return []
+    stmt = select(*_COLUMNS).where(
+        ChatTranscriptMessage.user_id == user_id,
+        and_(
+            *(
+                func.lower(ChatTranscriptMessage.message).contains(term, autoescape=True)
+                for term in terms
+            )
+        ),
+    )
+    if thread_id:
+        stmt = stmt.where(ChatTranscriptMessage.thread_id == thread_id)
+    hits = [_fallback_hit(row, terms) for row in (await session.execute(stmt)).mappings()]
+    hits.sort(key=lambda hit: (hit.rank, hit.created_at), reverse=True)
+    return hits[:limit]
+
+
+@router.get("/search", response_model=ChatTranscriptSearchResponse)
+async def search_chat_transcript(
+    q: str,
+    thread_id: str | None = None,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+) -> ChatTranscriptSearchResponse:
+    """Full-text search over the user's transcript with ranked, highlighted snippets."""
+
+    query = q.strip()
+    if not query:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Query must not be empty"
+        )
+    results = await search_transcripts(db, current_user.id, query, thread_id=thread_id, limit=limit)
+    return ChatTranscriptSearchResponse(query=query, results=results)
+
+
+@router.get("/export")
+async def export_chat_transcript(
+    thread_id: str | None = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream the full transcript as newline-delimited JSON with flat memory use."""
+
+    filename = f"transcript-{_UNSAFE_FILENAME_CHARS.sub('_', thread_id or 'all')}.ndjson"
+    return StreamingResponse(
+        stream_transcript_ndjson(SessionLocal, current_user.id, thread_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+__all__ = [
+    "decode_cursor",
+    "encode_cursor",
+    "router",
+    "search_transcripts",
+    "stream_transcript_ndjson",
+]
@@ -98,8 +98,38 @@ class ChatTranscriptMessageRead(BaseModel):
     updated_at: datetime
 
 
+class ChatTranscriptPage(BaseModel):
+    """One keyset page of transcript entries; pass ``after`` back to continue."""
+
+    data: list[ChatTranscriptMessageRead]
+    has_more: bool
+    after: str | None = None
+
+
+class ChatTranscriptSearchHit(BaseModel):
+    """A transcript entry matching a search, with its highlighted snippet."""
+
+    id: uuid.UUID
+    thread_id: str
+    item_id: str
+    role: str
+    created_at: datetime
+    rank: float
+    snippet: str = Field(description="HTML-escaped excerpt with matches wrapped in <mark>.")
+
+
+class ChatTranscriptSearchResponse(BaseModel):
+    """Ranked full-text matches for a transcript search."""
+
+    query: str
+    results: list[ChatTranscriptSearchHit]
+
+
 __all__ = [
     "ChatTranscriptMessageRead",
+    "ChatTranscriptPage",
+    "ChatTranscriptSearchHit",
+    "ChatTranscriptSearchResponse",
     "CheckoutSessionResponse",
     "ForgotPasswordRequest",
     "LoginRequest",
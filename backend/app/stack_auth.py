@@ -2,14 +2,21 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import importlib.util
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
 import httpx
 from pydantic import BaseModel, EmailStr, ValidationError
 
+from .cache import TTLCache
 from .config import get_settings
+from .metrics import observe_upstream
+
+# HTTP/2 multiplexing needs the optional ``h2`` package (``httpx[http2]``).
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
 def _resolve_email(payload: dict[str, Any]) -> str | None:
@@ -73,6 +80,15 @@ class StackAuthClient:
     _project_id: str
     _secret_key: str
     _timeout: float
+    _max_connections: int = 20
+    _max_keepalive_connections: int = 10
+    _keepalive_expiry: float = 30.0
+    _token_cache_ttl: float = 30.0
+    _http: httpx.AsyncClient | None = field(default=None, init=False)
+    _verified: TTLCache[str, StackAuthSession] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._verified = TTLCache(maxsize=4096, ttl=self._token_cache_ttl)
 
     @classmethod
     def from_settings(cls) -> "StackAuthClient":
@@ -85,8 +101,38 @@ class StackAuthClient:
             _project_id=project_id,
             _secret_key=secret_key,
             _timeout=timeout,
+            _max_connections=settings.stack_max_connections,
+            _max_keepalive_connections=settings.stack_max_keepalive_connections,
+            _token_cache_ttl=settings.stack_token_cache_ttl_seconds,
         )
 
+    def start(self) -> None:
+        """Open the pooled HTTP client (called from the application startup hook)."""
+
+        self._shared_client()
+
+    def _shared_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it if it is not open yet."""
+
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=self._timeout,
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_keepalive_connections,
+                    keepalive_expiry=self._keepalive_expiry,
+                ),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called from the application shutdown hook)."""
+
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     async def verify_tokens(
         self,
         *,
@@ -94,7 +140,18 @@ class StackAuthClient:
         refresh_token: str | None = None,
         client: httpx.AsyncClient | None = None,
     ) -> StackAuthSession:
-        """Validate Stack Auth tokens and return the associated session."""
+        """Validate Stack Auth tokens and return the associated session.
+
+        Successful verifications are cached briefly, keyed by a hash of both
+        tokens, so repeated exchanges skip the remote call.
+        """
+
+        cache_key = hashlib.sha256(
+            f"{access_token}\0{refresh_token or ''}".encode("utf-8")
+        ).hexdigest()
+        cached = self._verified.get(cache_key)
+        if cached is not None:
+            return cached
 
         base = self._base_url.rstrip("/")
         url = f"{base}/api/v1/users/me"
@@ -107,14 +164,13 @@ class StackAuthClient:
         if refresh_token:
             headers["X-Stack-Refresh-Token"] = refresh_token
 
-        needs_close = False
         if client is None:
-            client = httpx.AsyncClient(timeout=self._timeout)
-            needs_close = True
+            client = self._shared_client()
 
         try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
+            with observe_upstream("stack_auth", "verify_tokens"):
+                response = await client.get(url, headers=headers)
+                response.raise_for_status()
         except httpx.HTTPStatusError as exc:
             detail = exc.response.text if exc.response is not None else ""
             message = "Stack Auth rejected the provided tokens"
@@ -123,9 +179,6 @@ class StackAuthClient:
             raise StackAuthError(message) from exc
         except httpx.RequestError as exc:  # pragma: no cover - network failure handled by caller
             raise StackAuthError("Failed to contact Stack Auth") from exc
-        finally:
-            if needs_close:
-                await client.aclose()
 
         data = response.json()
         try:
@@ -147,10 +200,12 @@ class StackAuthClient:
                 expires_at=None,
                 user=user,
             )
-            return session
         except (KeyError, TypeError, ValidationError, ValueError) as exc:
             raise StackAuthError("Unexpected response from Stack Auth") from exc
 
+        self._verified.set(cache_key, session)
+        return session
+
 
 __all__ = [
     "StackAuthClient",
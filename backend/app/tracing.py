@@ -0,0 +1,484 @@
+"""Lightweight request tracing with OpenTelemetry-compatible export.
+
+Spans are tracked through a context variable, so every ``with tracer.span()``
+opened while handling a request (or from work that captured the request's
+context) nests under the request's root span. Spans of one trace are held
+until the root span ends, then stamped with trace-wide attributes such as
+``chatkit.thread_id`` and handed to the exporter, which batches them as OTLP
+JSON either to a collector (``/v1/traces``) or to a JSON-lines file that any
+OTLP file receiver can replay. With no exporter configured, ``span()`` only
+costs a context-variable lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Mapping
+
+import httpx
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SpanSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# OTLP span kinds and status codes.
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class _Trace:
+    """Spans of one trace that are waiting for the root span to end."""
+
+    __slots__ = ("trace_id", "root", "attributes", "pending", "closed")
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.root: Span | None = None
+        self.attributes: Dict[str, Any] = {}
+        self.pending: List[Span] = []
+        self.closed = False
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "kind",
+        "span_id",
+        "parent_span_id",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_trace",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: _Trace,
+        parent_span_id: str | None,
+        kind: int,
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.span_id = _new_id(64)
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: str | None = None
+        self._trace = trace
+
+    @property
+    def trace_id(self) -> str:
+        return self._trace.trace_id
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes({**self._trace.attributes, **self.attributes}),
+            "status": (
+                {"code": _STATUS_ERROR, "message": self.error}
+                if self.error is not None
+                else {"code": _STATUS_OK}
+            ),
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+_current_span: ContextVar[Span | None] = ContextVar("tracing_current_span", default=None)
+
+
+class BatchSpanExporter:
+    """Buffer finished spans and ship them to ``sink`` as OTLP JSON requests.
+
+    Spans are flushed every ``interval`` seconds or once ``max_batch`` are
+    buffered. When the sink falls behind, spans beyond ``max_queue`` are
+    dropped and counted rather than held in memory.
+    """
+
+    def __init__(
+        self,
+        sink: SpanSink,
+        *,
+        service_name: str,
+        max_batch: int = 512,
+        max_queue: int = 10000,
+        interval: float = 1.0,
+    ) -> None:
+        self._sink = sink
+        self._resource = {"attributes": _otlp_attributes({"service.name": service_name})}
+        self._max_batch = max_batch
+        self._max_queue = max_queue
+        self._interval = interval
+        self._buffer: List[Span] = []
+        self._flush_task: asyncio.Task[None] | None = None
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def export(self, spans: List[Span]) -> None:
+        room = self._max_queue - len(self._buffer)
+        if room < len(spans):
+            self.dropped += len(spans) - max(room, 0)
+            spans = spans[: max(room, 0)]
+        self._buffer.extend(spans)
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # No loop (e.g. a synchronous script); the next flush() picks them up.
+                pass
+
+    async def _flush_later(self) -> None:
+        deadline = time.monotonic() + self._interval
+        while self._buffer and len(self._buffer) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, 0.05))
+        await self.flush()
+
+    def _request(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = self._buffer[: self._max_batch]
+            del self._buffer[: self._max_batch]
+            try:
+                await self._sink(self._request(batch))
+            except Exception:
+                self.failed += len(batch)
+                logger.warning("Failed to export %d spans", len(batch), exc_info=True)
+            else:
+                self.exported += len(batch)
+
+    async def aclose(self) -> None:
+        task, self._flush_task = self._flush_task, None
+        # Let a scheduled flush finish rather than cancelling a batch mid-send.
+        self._interval = 0
+        if task is not None:
+            await task
+        await self.flush()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+def file_sink(path: str | Path) -> SpanSink:
+    """Append each export request as one line of OTLP JSON to ``path``."""
+
+    target = Path(path)
+
+    def _append(line: str) -> None:
+        with target.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+
+    async def _write(request: Dict[str, Any]) -> None:
+        line = json.dumps(request, separators=(",", ":")) + "\n"
+        await asyncio.to_thread(_append, line)
+
+    return _write
+
+
+def otlp_http_sink(endpoint: str, *, timeout: float = 5.0) -> SpanSink:
+    """POST export requests to an OTLP/HTTP collector using the JSON encoding."""
+
+    client: httpx.AsyncClient | None = None
+
+    async def _post(request: Dict[str, Any]) -> None:
+        nonlocal client
+        if client is None:
+            client = httpx.AsyncClient(timeout=timeout)
+        response = await client.post(endpoint, json=request)
+        response.raise_for_status()
+
+    return _post
+
+
+class Tracer:
+    """Create spans and hand finished traces to an exporter."""
+
+    def __init__(self, exporter: BatchSpanExporter | None = None) -> None:
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_span(self) -> Span | None:
+        return _current_span.get()
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        kind: int = KIND_INTERNAL,
+        parent: Span | None = None,
+        trace_id: str | None = None,
+        parent_span_id: str | None = None,
+        attributes: Mapping[str, Any] | None = None,
+    ) -> Iterator[Span | None]:
+        """Time the enclosed block as a child of ``parent`` or the current span.
+
+        ``trace_id``/``parent_span_id`` continue a trace started elsewhere
+        (for example from an incoming ``traceparent`` header) when there is
+        no local parent.
+        """
+
+        span = self.start_span(
+            name,
+            kind=kind,
+            parent=parent,
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            attributes=attributes,
+        )
+        if span is None:
+            yield None
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end_span(span, error=exc)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Ended in a different context (e.g. an async generator closed by
+                # another task); that context never saw the span become current.
+                pass
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: int = KIND_INTERNAL,
+        parent: Span | None = None,
+        trace_id: str | None = None,
+        parent_span_id: str | None = None,
+        attributes: Mapping[str, Any] | None = None,
+    ) -> Span | None:
+        """Start a span without making it current; finish it with ``end_span``.
+
+        Use this for work that yields control to its caller mid-span, such as
+        relaying a stream, so the caller's own spans are not nested under it.
+        """
+
+        if self.exporter is None:
+            return None
+        values = dict(attributes or {})
+        parent = parent or _current_span.get()
+        if parent is not None:
+            return Span(name, parent._trace, parent.span_id, kind, values)
+        trace = _Trace(trace_id or _new_id(128))
+        trace.root = Span(name, trace, parent_span_id, kind, values)
+        return trace.root
+
+    def end_span(self, span: Span | None, *, error: BaseException | None = None) -> None:
+        if span is None or span.end_ns:
+            return
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"[:512]
+        span.end_ns = time.time_ns()
+        trace = span._trace
+        if trace.closed:
+            # Background work (such as a transcript write) outlived the request.
+            self._export([span])
+            return
+        trace.pending.append(span)
+        if trace.root is span:
+            trace.closed = True
+            spans, trace.pending = trace.pending, []
+            self._export(spans)
+
+    def set_trace_attribute(self, key: str, value: Any) -> None:
+        """Attach ``key`` to every span in the current trace, including ended ones."""
+
+        span = _current_span.get()
+        if span is not None:
+            span._trace.attributes[key] = value
+
+    def _export(self, spans: List[Span]) -> None:
+        if self.exporter is not None:
+            self.exporter.export(spans)
+
+    async def aclose(self) -> None:
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self.exporter is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.exporter.snapshot()}
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    """Return ``(trace_id, parent_span_id)`` from a W3C ``traceparent`` header."""
+
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    trace_id, span_id = parts[1].lower(), parts[2].lower()
+    try:
+        int(trace_id, 16)
+        int(span_id, 16)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span for every HTTP request.
+
+    The span is named ``"<METHOD> <route template>"`` once routing has run
+    and joins the caller's trace when a valid ``traceparent`` header is sent.
+    """
+
+    def __init__(self, app: Any, tracer: Tracer | None = None) -> None:
+        self.app = app
+        self.tracer = tracer if tracer is not None else _default_tracer()
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        remote = None
+        for name, value in scope.get("headers") or ():
+            if name == b"traceparent":
+                remote = parse_traceparent(value.decode("latin-1"))
+                break
+
+        async def _send(message: Any) -> None:
+            if message["type"] == "http.response.start" and span is not None:
+                span.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        with self.tracer.span(
+            scope["method"],
+            kind=KIND_SERVER,
+            trace_id=remote[0] if remote else None,
+            parent_span_id=remote[1] if remote else None,
+            attributes={"http.method": scope["method"], "http.target": scope.get("path", "")},
+        ) as span:
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                if span is not None:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
+
+
+def _build_exporter() -> BatchSpanExporter | None:
+    settings = get_settings()
+    kind = settings.tracing_exporter.strip().lower()
+    if kind in {"", "none", "off"}:
+        return None
+    if kind == "file":
+        sink = file_sink(settings.tracing_file_path)
+    elif kind == "otlp":
+        sink = otlp_http_sink(settings.tracing_otlp_endpoint)
+    else:
+        raise RuntimeError(f"Unknown TRACING_EXPORTER {settings.tracing_exporter!r}")
+    return BatchSpanExporter(sink, service_name=settings.tracing_service_name)
+
+
+tracer = Tracer(_build_exporter())
+
+
+def _default_tracer() -> Tracer:
+    return tracer
+
+
+__all__ = [
+    "BatchSpanExporter",
+    "KIND_INTERNAL",
+    "KIND_SERVER",
+    "Span",
+    "Tracer",
+    "TracingMiddleware",
+    "file_sink",
+    "otlp_http_sink",
+    "parse_traceparent",
+    "tracer",
+]
@@ -0,0 +1,441 @@
+"""Monthly partitions of ``chat_transcript_messages`` and their retention.
+
+On PostgreSQL the transcript table is range partitioned by UTC month on
+``created_at``, so each month's rows and indexes live in their own
+``chat_transcript_messages_pYYYYMM`` table. Indexes stay the size of one
+month, inserts only touch the current partition, and old history leaves by
+detaching a partition instead of a bulk ``DELETE``.
+
+There is no default partition, which lets old partitions detach
+concurrently; partitions are therefore created ahead of time, by each API
+worker's ``PartitionMaintainer`` (at startup, then on an interval) and by
+the ``ensure`` command. A write for a month outside that window (such as a
+legacy item re-saved with its original timestamp) is rejected by
+PostgreSQL; ``upsert_transcript_messages`` then creates the missing
+partitions with ``create_month_partitions`` and retries. Run the commands from the ``backend`` directory,
+preferably against a direct (non ``-pooler``) connection::
+
+    python -m app.transcript_partitions ensure
+    python -m app.transcript_partitions archive --dry-run
+
+``archive`` detaches every partition older than the retention window,
+writes its rows to ``<archive dir>/<partition>.ndjson.gz``, checks the row
+count and drops the table. A run interrupted at any step is finished by the
+next one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Mapping, Sequence
+from uuid import UUID
+
+from sqlalchemy import RowMapping, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .config import get_settings
+from .database import engine
+from .models import TRANSCRIPT_PARTITION_PREFIX, ChatTranscriptMessage
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = ChatTranscriptMessage.__tablename__
+ARCHIVE_BATCH_SIZE = 5000
+_PARTITION_NAME = re.compile(rf"^{TRANSCRIPT_PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+# PostgreSQL reports a row that no partition accepts as a check_violation.
+_CHECK_VIOLATION = "23514"
+# Everything but the generated message_tsv column, which is rebuilt from message on reload.
+_ARCHIVE_COLUMNS = (
+    "id",
+    "user_id",
+    "thread_id",
+    "item_id",
+    "role",
+    "message",
+    "created_at",
+    "updated_at",
+)
+
+
+def month_start(value: date | datetime) -> date:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TRANSCRIPT_PARTITION_PREFIX}{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(month: date) -> str:
+    """``CREATE TABLE`` statement for the partition holding UTC month ``month``."""
+
+    lower = f"{month:%Y-%m-%d} 00:00:00+00"
+    upper = f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00"
+    return (
+        f"CREATE TABLE IF NOT EXISTS public.{partition_name(month)} "
+        f"PARTITION OF public.{PARENT_TABLE} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptPartition:
+    name: str
+    month: date
+    attached: bool
+    detach_pending: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ArchivedPartition:
+    name: str
+    rows: int
+    path: Path | None
+
+
+async def list_partitions(connection: AsyncConnection) -> list[TranscriptPartition]:
+    """Attached partitions plus detached ones an interrupted archive run left behind."""
+
+    rows = await connection.execute(
+        text(
+            """
+            SELECT c.relname AS name,
+                   i.inhrelid IS NOT NULL AS attached,
+                   coalesce(i.inhdetachpending, false) AS detach_pending
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+            WHERE n.nspname = 'public' AND c.relkind = 'r' AND starts_with(c.relname, :prefix)
+            """
+        ),
+        {"prefix": TRANSCRIPT_PARTITION_PREFIX},
+    )
+    partitions = []
+    for row in rows:
+        month = partition_month(row.name)
+        if month is not None:
+            partitions.append(
+                TranscriptPartition(row.name, month, row.attached, row.detach_pending)
+            )
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+async def create_month_partitions(
+    connection: AsyncConnection, months: Iterable[date | datetime]
+) -> list[str]:
+    """Create the partitions holding ``months`` that do not exist yet.
+
+    Returns the names created. A no-op on databases other than PostgreSQL.
+    """
+
+    if connection.dialect.name != "postgresql":
+        return []
+    existing = {partition.name for partition in await list_partitions(connection)}
+    created: list[str] = []
+    for month in sorted({month_start(value) for value in months}):
+        if partition_name(month) in existing:
+            continue
+        await connection.execute(text(create_partition_sql(month)))
+        created.append(partition_name(month))
+    return created
+
+
+async def ensure_partitions(
+    connection: AsyncConnection, *, months_ahead: int, today: date | None = None
+) -> list[str]:
+    """Create partitions from this month through ``months_ahead`` months ahead.
+
+    Returns the names created. A no-op on databases other than PostgreSQL.
+    """
+
+    current = month_start(today or datetime.now(timezone.utc))
+    return await create_month_partitions(
+        connection, (add_months(current, offset) for offset in range(max(0, months_ahead) + 1))
+    )
+
+
+def is_missing_partition_error(exc: BaseException) -> bool:
+    """Whether ``exc`` is PostgreSQL rejecting a row that no partition accepts."""
+
+    orig = getattr(exc, "orig", exc)
+    return getattr(orig, "sqlstate", None) == _CHECK_VIOLATION and "no partition" in str(orig)
+
+
+@dataclass(slots=True)
+class PartitionMaintenanceStats:
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    partitions_created: int = 0
+    last_success_timestamp: float = 0.0
+
+
+class PartitionMaintainer:
+    """Keeps upcoming partitions in place for as long as the worker runs.
+
+    ``start`` creates them once and then re-checks every ``interval_seconds``,
+    so a long-running worker never reaches a month without a partition. A
+    failed check is logged, counted in ``snapshot()`` and retried after
+    ``retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        *,
+        months_ahead: int,
+        interval_seconds: float,
+        retry_seconds: float = 300.0,
+    ) -> None:
+        self._engine = db_engine
+        self._months_ahead = months_ahead
+        self._interval = max(1.0, interval_seconds)
+        self._retry = max(1.0, min(retry_seconds, self._interval))
+        self._task: asyncio.Task[None] | None = None
+        self.stats = PartitionMaintenanceStats()
+
+    async def run_once(self) -> bool:
+        """Create any missing partitions; returns whether the check succeeded."""
+
+        self.stats.runs += 1
+        try:
+            async with self._engine.begin() as connection:
+                created = await ensure_partitions(connection, months_ahead=self._months_ahead)
+        except Exception:
+            self.stats.failures += 1
+            self.stats.consecutive_failures += 1
+            logger.exception(
+                "Failed to create transcript partitions",
+                extra={"consecutive_failures": self.stats.consecutive_failures},
+            )
+            return False
+        self.stats.consecutive_failures = 0
+        self.stats.partitions_created += len(created)
+        self.stats.last_success_timestamp = time.time()
+        if created:
+            logger.info("Created transcript partitions", extra={"partitions": created})
+        return True
+
+    async def start(self) -> None:
+        """Run the first check now and schedule the following ones."""
+
+        succeeded = await self.run_once()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run_forever(self._interval if succeeded else self._retry),
+                name="transcript-partition-maintainer",
+            )
+
+    async def _run_forever(self, delay: float) -> None:
+        while True:
+            await asyncio.sleep(delay)
+            delay = self._interval if await self.run_once() else self._retry
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> dict[str, float | int]:
+        return {
+            "runs": self.stats.runs,
+            "failures": self.stats.failures,
+            "consecutive_failures": self.stats.consecutive_failures,
+            "partitions_created": self.stats.partitions_created,
+            "last_success_timestamp": round(self.stats.last_success_timestamp, 3),
+        }
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot archive {type(value).__name__}")
+
+
+def _commit(handle: gzip.GzipFile, partial: Path, path: Path) -> None:
+    handle.close()
+    with open(partial, "rb") as written:
+        os.fsync(written.fileno())
+    os.replace(partial, path)
+
+
+async def write_ndjson_gzip(batches: AsyncIterator[Sequence[Mapping[Any, Any]]], path: Path) -> int:
+    """Write ``batches`` of rows to ``path`` as gzipped NDJSON and return the row count.
+
+    Rows go to a ``.partial`` file that replaces ``path`` only once complete.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.partial")
+    handle = await asyncio.to_thread(gzip.open, partial, "wb")
+    written = 0
+    try:
+        async for batch in batches:
+            chunk = b"".join(
+                json.dumps(dict(row), default=_json_default, ensure_ascii=False).encode() + b"\n"
+                for row in batch
+            )
+            await asyncio.to_thread(handle.write, chunk)
+            written += len(batch)
+    except BaseException:
+        await asyncio.to_thread(handle.close)
+        partial.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(_commit, handle, partial, path)
+    return written
+
+
+async def _stream_partition(
+    connection: AsyncConnection, name: str, batch_size: int
+) -> AsyncIterator[Sequence[RowMapping]]:
+    stmt = text(f"SELECT {', '.join(_ARCHIVE_COLUMNS)} FROM public.{name}").execution_options(
+        yield_per=batch_size
+    )
+    result = await connection.stream(stmt)
+    async for partition in result.mappings().partitions():
+        yield partition
+
+
+async def _archive_partition(
+    db_engine: AsyncEngine, partition: TranscriptPartition, archive_dir: Path, batch_size: int
+) -> ArchivedPartition:
+    name = partition.name
+    if partition.attached:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block.
+        async with db_engine.execution_options(
+            isolation_level="AUTOCOMMIT"
+        ).connect() as connection:
+            mode = "FINALIZE" if partition.detach_pending else "CONCURRENTLY"
+            await connection.execute(
+                text(f"ALTER TABLE public.{PARENT_TABLE} DETACH PARTITION public.{name} {mode}")
+            )
+
+    path = archive_dir / f"{name}.ndjson.gz"
+    async with db_engine.connect() as connection:
+        rows = await write_ndjson_gzip(_stream_partition(connection, name, batch_size), path)
+    async with db_engine.begin() as connection:
+        expected = await connection.scalar(text(f"SELECT count(*) FROM public.{name}"))
+        if rows != expected:
+            raise RuntimeError(f"Archived {rows} of {expected} rows from {name}; keeping the table")
+        await connection.execute(text(f"DROP TABLE public.{name}"))
+    logger.info(
+        "Archived transcript partition", extra={"partition": name, "rows": rows, "path": str(path)}
+    )
+    return ArchivedPartition(name, rows, path)
+
+
+async def archive_partitions(
+    db_engine: AsyncEngine,
+    *,
+    retention_months: int,
+    archive_dir: Path,
+    today: date | None = None,
+    dry_run: bool = False,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> list[ArchivedPartition]:
+    """Archive and drop partitions for months before the retention window.
+
+    The current month plus ``retention_months`` full months are kept; ``0``
+    keeps everything.
+    """
+
+    if db_engine.dialect.name != "postgresql" or retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc)), -retention_months)
+    async with db_engine.connect() as connection:
+        expired = [
+            partition for partition in await list_partitions(connection) if partition.month < cutoff
+        ]
+    if dry_run:
+        return [ArchivedPartition(partition.name, 0, None) for partition in expired]
+    return [
+        await _archive_partition(db_engine, partition, archive_dir, batch_size)
+        for partition in expired
+    ]
+
+
+async def main(argv: Sequence[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser(
+        "ensure", help="create the current and upcoming monthly partitions"
+    )
+    ensure.add_argument(
+        "--months-ahead", type=int, default=settings.transcript_partition_months_ahead
+    )
+    archive = commands.add_parser("archive", help="archive and drop partitions past retention")
+    archive.add_argument(
+        "--retention-months", type=int, default=settings.transcript_retention_months
+    )
+    archive.add_argument("--archive-dir", type=Path, default=Path(settings.transcript_archive_dir))
+    archive.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "ensure":
+            async with engine.begin() as connection:
+                created = await ensure_partitions(connection, months_ahead=args.months_ahead)
+            print(f"created {len(created)} partition(s): {', '.join(created) or '-'}")
+            return
+        archived = await archive_partitions(
+            engine,
+            retention_months=args.retention_months,
+            archive_dir=args.archive_dir,
+            dry_run=args.dry_run,
+        )
+        for partition in archived:
+            if partition.path is None:
+                print(f"would archive {partition.name}")
+            else:
+                print(f"archived {partition.name}: {partition.rows} rows -> {partition.path}")
+        if not archived:
+            print("no partitions past retention")
+    finally:
+        await engine.dispose()
+
+
+__all__ = [
+    "ArchivedPartition",
+    "PartitionMaintainer",
+    "TranscriptPartition",
+    "add_months",
+    "archive_partitions",
+    "create_month_partitions",
+    "create_partition_sql",
+    "ensure_partitions",
+    "is_missing_partition_error",
+    "list_partitions",
+    "month_start",
+    "partition_name",
+    "write_ndjson_gzip",
+]
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,263 @@
+"""Background write-behind queue for chat transcript persistence."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+from uuid import UUID
+
+from .config import get_settings
+from .tracing import Span, tracer
+from .vector_store import ChatMessage, save_chat_messages, upload_chat_messages
+
+logger = logging.getLogger(__name__)
+
+TranscriptWriter = Callable[[Sequence[ChatMessage]], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class TranscriptJob:
+    """A finalized chat message waiting to be mirrored to long-term storage."""
+
+    user_id: UUID
+    thread_id: str
+    item_id: str
+    role: str
+    message: str
+    metadata: dict[str, Any] | None = None
+    # The ChatKit item's timestamp, which keys the transcript row with item_id.
+    created_at: datetime | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # Span that queued the job, so the write is traced as part of its chat turn.
+    trace_parent: Span | None = field(default_factory=tracer.current_span)
+
+    def to_message(self) -> ChatMessage:
+        return ChatMessage(
+            self.user_id,
+            self.thread_id,
+            self.item_id,
+            self.role,
+            self.message,
+            self.metadata,
+            self.created_at,
+        )
+
+
+@dataclass(slots=True)
+class TranscriptQueueStats:
+    submitted: int = 0
+    coalesced: int = 0
+    written: int = 0
+    batches: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class TranscriptWriteQueue:
+    """Bounded asyncio queue that persists transcript entries off the request path.
+
+    Submissions for an ``item_id`` that is still waiting are coalesced so only
+    the latest text is written. A worker takes up to ``batch_size`` waiting
+    items at once and passes each user's share through the ``writers`` in order,
+    one call per writer. Each item
+    is written by at most one worker at a time; a newer version submitted
+    mid-write is queued again once the write finishes. A failed writer is
+    retried with exponential backoff without repeating the writers that
+    already succeeded, so a database error does not re-upload to OpenAI.
+    """
+
+    def __init__(
+        self,
+        writers: Sequence[TranscriptWriter] = (upload_chat_messages, save_chat_messages),
+        *,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        maxsize: int | None = None,
+        max_attempts: int | None = None,
+        backoff_seconds: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._writers = tuple(writers)
+        self._worker_count = max(1, workers or settings.transcript_queue_workers)
+        self._batch_size = max(1, batch_size or settings.transcript_queue_batch_size)
+        self._max_attempts = max(1, max_attempts or settings.transcript_queue_max_attempts)
+        self._backoff = (
+            backoff_seconds
+            if backoff_seconds is not None
+            else settings.transcript_queue_backoff_ms / 1000
+        )
+        self._maxsize = max(1, maxsize or settings.transcript_queue_maxsize)
+        self._slots = asyncio.Semaphore(self._maxsize)
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._jobs: Dict[str, TranscriptJob] = {}
+        self._in_flight: Dict[str, TranscriptJob] = {}
+        self._workers: List[asyncio.Task[None]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closed = False
+        self.stats = TranscriptQueueStats()
+
+    # -- Producer --------------------------------------------------------
+    async def submit(self, job: TranscriptJob) -> None:
+        """Queue ``job``, waiting for a free slot when the queue is full."""
+
+        if self._closed:
+            raise RuntimeError("Transcript queue is shut down")
+        self._ensure_workers()
+        self.stats.submitted += 1
+
+        existing = self._jobs.get(job.item_id)
+        if existing is not None:
+            job.enqueued_at = existing.enqueued_at
+            self._jobs[job.item_id] = job
+            self.stats.coalesced += 1
+            return
+
+        await self._slots.acquire()
+        if job.item_id in self._jobs:
+            # Another submission for the same item claimed a slot while we waited.
+            self._slots.release()
+            job.enqueued_at = self._jobs[job.item_id].enqueued_at
+            self._jobs[job.item_id] = job
+            self.stats.coalesced += 1
+            return
+        self._jobs[job.item_id] = job
+        if job.item_id not in self._in_flight:
+            self._queue.put_nowait(job.item_id)
+
+    # -- Metrics ---------------------------------------------------------
+    def depth(self) -> int:
+        """Number of transcript entries waiting or being written."""
+
+        return len(self._jobs) + len(self._in_flight)
+
+    def lag_seconds(self) -> float:
+        """Age of the oldest entry that has not been written yet."""
+
+        pending = [*self._jobs.values(), *self._in_flight.values()]
+        if not pending:
+            return 0.0
+        return time.monotonic() - min(job.enqueued_at for job in pending)
+
+    def snapshot(self) -> dict[str, float | int]:
+        return {
+            "depth": self.depth(),
+            "lag_seconds": round(self.lag_seconds(), 3),
+            "submitted": self.stats.submitted,
+            "coalesced": self.stats.coalesced,
+            "written": self.stats.written,
+            "batches": self.stats.batches,
+            "retried": self.stats.retried,
+            "failed": self.stats.failed,
+        }
+
+    # -- Lifecycle -------------------------------------------------------
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        if self._loop is not loop:
+            # asyncio primitives bind to the first loop that uses them.
+            self._slots = asyncio.Semaphore(self._maxsize)
+            self._queue = asyncio.Queue()
+            self._jobs.clear()
+            self._in_flight.clear()
+        self._loop = loop
+        self._workers = [
+            # Fresh contexts keep workers from inheriting the submitting request's span.
+            loop.create_task(
+                self._run_worker(), name=f"transcript-writer-{index}", context=contextvars.Context()
+            )
+            for index in range(self._worker_count)
+        ]
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Stop accepting work, wait for queued writes, then stop the workers."""
+
+        self._closed = True
+        if self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Transcript queue drain timed out", extra={"pending": self.depth()})
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # -- Consumer --------------------------------------------------------
+    async def _run_worker(self) -> None:
+        while True:
+            item_ids = [await self._queue.get()]
+            while len(item_ids) < self._batch_size and not self._queue.empty():
+                item_ids.append(self._queue.get_nowait())
+            try:
+                batches: Dict[UUID, List[TranscriptJob]] = {}
+                for item_id in item_ids:
+                    job = self._jobs.pop(item_id, None)
+                    if job is None:
+                        continue
+                    self._in_flight[item_id] = job
+                    batches.setdefault(job.user_id, []).append(job)
+                try:
+                    await asyncio.gather(*(self._write(jobs) for jobs in batches.values()))
+                finally:
+                    for jobs in batches.values():
+                        for job in jobs:
+                            del self._in_flight[job.item_id]
+                            self._slots.release()
+                            if job.item_id in self._jobs:
+                                self._queue.put_nowait(job.item_id)
+            finally:
+                for _ in item_ids:
+                    self._queue.task_done()
+
+    async def _write(self, jobs: List[TranscriptJob]) -> None:
+        step = 0
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                with tracer.span(
+                    "transcript.record_chat_messages",
+                    parent=jobs[0].trace_parent,
+                    attributes={
+                        "chatkit.thread_id": jobs[0].thread_id,
+                        "transcript.batch_size": len(jobs),
+                        "transcript.attempt": attempt,
+                        "transcript.step": step,
+                        "transcript.queue_seconds": time.monotonic()
+                        - min(job.enqueued_at for job in jobs),
+                    },
+                ):
+                    messages = [job.to_message() for job in jobs]
+                    while step < len(self._writers):
+                        await self._writers[step](messages)
+                        step += 1
+            except Exception:
+                if attempt == self._max_attempts:
+                    self.stats.failed += len(jobs)
+                    logger.exception(
+                        "Failed to persist chat transcript entries",
+                        extra={"item_ids": [job.item_id for job in jobs]},
+                    )
+                    return
+                # Newer queued versions supersede their items' writes.
+                jobs = [job for job in jobs if job.item_id not in self._jobs]
+                if not jobs:
+                    return
+                self.stats.retried += 1
+                await asyncio.sleep(self._backoff * 2 ** (attempt - 1))
+            else:
+                self.stats.written += len(jobs)
+                self.stats.batches += 1
+                return
+
+
+transcript_queue = TranscriptWriteQueue()
+"""Process-wide queue used by the ChatKit stores."""
+
+
+__all__ = ["TranscriptJob", "TranscriptWriteQueue", "transcript_queue"]
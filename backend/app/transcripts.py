@@ -0,0 +1,137 @@
+"""Shared transcript mirroring for ChatKit store implementations."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+from uuid import UUID
+
+from chatkit.store import Store
+from chatkit.types import ThreadItem
+
+from .history import ThreadHistoryCache
+from .transcript_queue import TranscriptJob, TranscriptWriteQueue, transcript_queue
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptMirroringStore(Store[dict[str, Any]]):
+    """ChatKit store base that mirrors finalized chat turns to long-term storage."""
+
+    def __init__(
+        self,
+        queue: TranscriptWriteQueue | None = None,
+        *,
+        history_cache: ThreadHistoryCache | None = None,
+    ) -> None:
+        # thread_id -> item_id -> signature of the last queued transcript text.
+        self._persisted_item_states: Dict[str, Dict[str, str]] = {}
+        self._transcript_queue = queue or transcript_queue
+        # Only stores that see every write to their threads may cache formatted history.
+        self.history_cache = history_cache
+
+    async def aclose(self) -> None:
+        """Release resources held by the store (called on application shutdown)."""
+
+    def snapshot(self) -> dict[str, Any]:
+        """Resident-size and eviction counters exported as ``chatkit_store_*`` metrics."""
+
+        return {}
+
+    def _forget_transcript(self, thread_id: str, item_id: str) -> None:
+        states = self._persisted_item_states.get(thread_id)
+        if states is not None:
+            states.pop(item_id, None)
+        if self.history_cache is not None:
+            self.history_cache.forget(thread_id, item_id)
+
+    def _forget_thread_transcripts(self, thread_id: str) -> None:
+        self._persisted_item_states.pop(thread_id, None)
+
+    def _record_history(self, thread_id: str, item: ThreadItem) -> None:
+        if self.history_cache is not None:
+            self.history_cache.record(thread_id, item)
+
+    def _forget_history(self, thread_id: str) -> None:
+        if self.history_cache is not None:
+            self.history_cache.drop(thread_id)
+
+    async def _persist_transcript(
+        self,
+        thread_id: str,
+        item: ThreadItem,
+        context: dict[str, Any],
+    ) -> None:
+        """Queue user/assistant messages for persistence to external stores."""
+
+        user = context.get("user")
+        if user is None:
+            return
+        await self._queue_transcript(thread_id, item, user.id)
+
+    async def _queue_transcript(self, thread_id: str, item: ThreadItem, user_id: UUID) -> bool:
+        """Queue ``item``'s text unless that exact text was already queued."""
+
+        item_type = getattr(item, "type", None)
+        role = None
+        if item_type == "user_message":
+            role = "user"
+        elif item_type == "assistant_message":
+            role = "assistant"
+        if role is None:
+            return False
+
+        status = getattr(item, "status", None)
+        if status in {"in_progress", "streaming", "pending"}:
+            return False
+
+        text_parts: list[str] = []
+        for part in getattr(item, "content", []) or []:
+            maybe_text = getattr(part, "text", None)
+            if maybe_text:
+                text_parts.append(maybe_text)
+                continue
+            dump = part.model_dump() if hasattr(part, "model_dump") else {}
+            value = (
+                dump.get("text")
+                or dump.get("value")
+                or dump.get("input_text")
+                or dump.get("output_text")
+            )
+            if isinstance(value, str) and value.strip():
+                text_parts.append(value)
+
+        message = " ".join(chunk.strip() for chunk in text_parts if chunk).strip()
+        if not message:
+            return False
+
+        item_id = getattr(item, "id", None)
+        if not item_id:
+            return False
+
+        payload_signature = f"{role}:{message}"
+        if self._persisted_item_states.get(thread_id, {}).get(item_id) == payload_signature:
+            return False
+
+        try:
+            # plan-step[2]: mirror every finalized chat turn into long-term storage for recalls.
+            # The upload runs on the write-behind queue so it never adds to turn latency.
+            await self._transcript_queue.submit(
+                TranscriptJob(
+                    user_id=user_id,
+                    thread_id=thread_id,
+                    item_id=item_id,
+                    role=role,
+                    message=message,
+                    metadata={"status": status} if status else None,
+                    created_at=getattr(item, "created_at", None),
+                )
+            )
+        except Exception:  # pragma: no cover - persistence failures shouldn't break chat
+            logger.exception(
+                "Failed to queue chat transcript entry", extra={"thread_id": thread_id}
+            )
+            return False
+
+        self._persisted_item_states.setdefault(thread_id, {})[item_id] = payload_signature
+        return True
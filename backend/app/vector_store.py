@@ -5,19 +5,29 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+from datetime import datetime
 from functools import lru_cache
 from io import BytesIO
-from typing import Any, NamedTuple
+from typing import Any, Awaitable, Callable, NamedTuple, Sequence
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import TTLCache
 from .clients import openai_client
-from .database import SessionLocal
+from .config import get_settings
+from .database import SessionLocal, as_utc, dialect_insert
+from .executors import openai_executor
+from .metrics import observe_upstream
 from .models import ChatTranscriptMessage, UserVectorStore
+from .recall import local_recall
+from .tracing import tracer
+from .transcript_partitions import create_month_partitions, is_missing_partition_error
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class _VectorStoreClients(NamedTuple):
@@ -57,21 +67,32 @@ async def _create_vector_store(name: str) -> str:
         store = vector_store_client.create(name=name)
         return store.id
 
-    return await asyncio.to_thread(_call)
+    with observe_upstream("openai", "vector_store_create"):
+        return await openai_executor.run(_call)
 
 
-async def _upload_fact(vector_store_id: str, content: str, metadata: dict[str, Any] | None) -> None:
+def _pack_facts(contents: list[str]) -> bytes:
+    """Pack JSON fact payloads into a single JSON array (not JSON Lines).
+
+    Each fact is one array element on its own line.
+    """
+
+    return ("[\n" + ",\n".join(contents) + "\n]\n").encode("utf-8")
+
+
+async def _upload_facts(vector_store_id: str, contents: list[str]) -> None:
     filename = f"memory-{uuid4().hex}.json"
-    file_bytes = content.encode("utf-8")
+    file_bytes = _pack_facts(contents)
 
     def _create_and_attach() -> None:
         vector_store_client, files_client, file_batches_client, surface = _resolve_vector_store_clients()
         logger.debug(
-            "Uploading fact to vector store",
+            "Uploading facts to vector store",
             extra={
                 "vector_store_id": vector_store_id,
                 "surface": surface,
-                "metadata_keys": sorted(metadata.keys()) if metadata else [],
+                "fact_count": len(contents),
+                "bytes": len(file_bytes),
             },
         )
 
@@ -91,28 +112,169 @@ async def _upload_fact(vector_store_id: str, content: str, metadata: dict[str, A
             file_id=file.id,
         )
 
-    await asyncio.to_thread(_create_and_attach)
+    with observe_upstream("openai", "vector_store_upload"):
+        await openai_executor.run(_create_and_attach)
 
 
-async def get_or_create_user_vector_store(
-    session: AsyncSession,
-    user_id: UUID,
-) -> str:
+async def _delete_vector_store(vector_store_id: str) -> None:
+    def _call() -> None:
+        vector_store_client, _, _, _ = _resolve_vector_store_clients()
+        vector_store_client.delete(vector_store_id=vector_store_id)
+
+    with observe_upstream("openai", "vector_store_delete"):
+        await openai_executor.run(_call)
+
+
+class _VectorStoreIdCache:
+    """Async LRU cache of user → vector store id with TTL and single-flight loads.
+
+    Concurrent misses for one user share a single in-flight load, so a burst of
+    first requests resolves (and, if needed, creates) the vector store once.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self._entries: TTLCache[UUID, str] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._loads: dict[UUID, asyncio.Task[str]] = {}
+
+    def get(self, user_id: UUID) -> str | None:
+        return self._entries.get(user_id)
+
+    def set(self, user_id: UUID, vector_store_id: str) -> None:
+        self._entries.set(user_id, vector_store_id)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self._entries.pop(user_id)
+
+    def _forget_load(self, user_id: UUID, task: asyncio.Task[str]) -> None:
+        if self._loads.get(user_id) is task:
+            del self._loads[user_id]
+
+    async def get_or_load(self, user_id: UUID, load: Callable[[], Awaitable[str]]) -> str:
+        while True:
+            cached = self.get(user_id)
+            if cached is not None:
+                return cached
+
+            task = self._loads.get(user_id)
+            if task is None:
+                task = asyncio.create_task(load())
+                self._loads[user_id] = task
+                task.add_done_callback(lambda done: self._forget_load(user_id, done))
+                vector_store_id = await task
+                self.set(user_id, vector_store_id)
+                return vector_store_id
+
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if task.cancelled() and not (current and current.cancelling()):
+                    # The request that started the load went away; try again.
+                    continue
+                raise
+
+
+_vector_store_ids = _VectorStoreIdCache(
+    maxsize=settings.vector_store_cache_maxsize,
+    ttl=settings.vector_store_cache_ttl_seconds,
+)
+
+
+async def _load_or_create_user_vector_store(session: AsyncSession, user_id: UUID) -> str:
     record = await session.get(UserVectorStore, user_id)
     if record is not None:
         return record.vector_store_id
 
     vector_store_id = await _create_vector_store(name=f"user-{user_id}-memory")
-    record = UserVectorStore(user_id=user_id, vector_store_id=vector_store_id)
-    session.add(record)
+    insert = dialect_insert(session)
+    await session.execute(
+        insert(UserVectorStore)
+        .values(user_id=user_id, vector_store_id=vector_store_id)
+        .on_conflict_do_nothing(index_elements=[UserVectorStore.user_id])
+    )
     await session.commit()
+
+    # Another worker may have inserted its own store first; keep theirs and drop ours.
+    stored_id = await session.scalar(
+        select(UserVectorStore.vector_store_id).where(UserVectorStore.user_id == user_id)
+    )
+    if stored_id is not None and stored_id != vector_store_id:
+        logger.warning(
+            "Discarding duplicate vector store created concurrently",
+            extra={"user_id": str(user_id), "vector_store_id": vector_store_id},
+        )
+        try:
+            await _delete_vector_store(vector_store_id)
+        except Exception:  # pragma: no cover - best-effort cleanup
+            logger.exception("Failed to delete duplicate vector store %s", vector_store_id)
+        return stored_id
     return vector_store_id
 
 
+async def get_or_create_user_vector_store(
+    session: AsyncSession,
+    user_id: UUID,
+) -> str:
+    return await _vector_store_ids.get_or_load(
+        user_id, lambda: _load_or_create_user_vector_store(session, user_id)
+    )
+
+
 async def get_user_vector_store_id(user_id: UUID) -> str | None:
+    cached = _vector_store_ids.get(user_id)
+    if cached is not None:
+        return cached
     async with SessionLocal() as session:
         record = await session.get(UserVectorStore, user_id)
-        return record.vector_store_id if record else None
+    if record is None:
+        return None
+    _vector_store_ids.set(user_id, record.vector_store_id)
+    return record.vector_store_id
+
+
+async def _resolve_user_vector_store(user_id: UUID) -> str:
+    cached = _vector_store_ids.get(user_id)
+    if cached is not None:
+        return cached
+    async with SessionLocal() as session:
+        return await get_or_create_user_vector_store(session, user_id)
+
+
+async def append_facts_for_user(
+    user_id: UUID,
+    facts: Sequence[tuple[str, dict[str, Any] | None]],
+    *,
+    payload_key: str = "fact",
+) -> None:
+    """Store ``(text, metadata)`` facts, uploading them as few files as possible.
+
+    Each file holds up to ``VECTOR_STORE_BATCH_MAX_FACTS`` facts.
+    """
+
+    payloads: list[str] = []
+    for fact_text, metadata in facts:
+        # Index locally first so the next turn can recall it without waiting for the upload.
+        doc_id = str((metadata or {}).get("item_id") or uuid4())
+        local_recall.add(user_id, doc_id, fact_text, kind=payload_key)
+        payloads.append(
+            json.dumps(
+                {
+                    payload_key: fact_text,
+                    **(metadata or {}),
+                },
+                ensure_ascii=False,
+            )
+        )
+    if not payloads:
+        return
+    vector_store_id = await _resolve_user_vector_store(user_id)
+    size = max(1, settings.vector_store_batch_max_facts)
+    await asyncio.gather(
+        *(
+            _upload_facts(vector_store_id, payloads[offset : offset + size])
+            for offset in range(0, len(payloads), size)
+        )
+    )
 
 
 async def append_fact_for_user(
@@ -122,21 +284,153 @@ async def append_fact_for_user(
     *,
     payload_key: str = "fact",
 ) -> None:
-    async with SessionLocal() as session:
-        vector_store_id = await get_or_create_user_vector_store(session, user_id)
-        payload = json.dumps(
-            {
-                payload_key: fact_text,
-                **(metadata or {}),
+    await append_facts_for_user(user_id, [(fact_text, metadata)], payload_key=payload_key)
+
+
+class TranscriptRow(NamedTuple):
+    """One ``chat_transcript_messages`` row, keyed by the ChatKit ``item_id`` and ``created_at``.
+
+    ``created_at`` is the item's own timestamp and picks the monthly partition;
+    every rewrite of an item must pass the same value to update its row.
+    """
+
+    user_id: UUID
+    thread_id: str
+    item_id: str
+    role: str
+    message: str
+    created_at: datetime | None = None
+
+
+# Seven bind parameters per row (the TranscriptRow fields plus the generated id)
+# keep each statement well under PostgreSQL's 32767 limit.
+TRANSCRIPT_UPSERT_BATCH_SIZE = 1000
+
+
+async def upsert_transcript_messages(
+    session: AsyncSession,
+    rows: Sequence[TranscriptRow],
+    *,
+    batch_size: int = TRANSCRIPT_UPSERT_BATCH_SIZE,
+) -> int:
+    """Insert or update transcript rows with one ``INSERT ... ON CONFLICT`` per batch.
+
+    Later rows win when ``rows`` repeats an ``item_id``. Rows for a month
+    without a partition make PostgreSQL reject the batch; the missing
+    partitions are then created and the rows written again. Commits and
+    returns the number of distinct items written.
+    """
+
+    latest = {row.item_id: row for row in rows}
+    if not latest:
+        return 0
+    pending = list(latest.values())
+    try:
+        await _insert_transcript_batches(session, pending, batch_size)
+    except IntegrityError as exc:
+        if not is_missing_partition_error(exc):
+            raise
+        await session.rollback()
+        created = await create_month_partitions(
+            await session.connection(),
+            (as_utc(row.created_at) for row in pending),
+        )
+        await session.commit()
+        logger.warning(
+            "Created transcript partitions for out-of-window rows",
+            extra={"partitions": created},
+        )
+        await _insert_transcript_batches(session, pending, batch_size)
+    await session.commit()
+    return len(pending)
+
+
+async def _insert_transcript_batches(
+    session: AsyncSession, pending: Sequence[TranscriptRow], batch_size: int
+) -> None:
+    insert = dialect_insert(session)
+    for offset in range(0, len(pending), max(1, batch_size)):
+        stmt = insert(ChatTranscriptMessage).values(
+            [
+                {**row._asdict(), "created_at": as_utc(row.created_at)}
+                for row in pending[offset : offset + batch_size]
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChatTranscriptMessage.item_id, ChatTranscriptMessage.created_at],
+            set_={
+                "thread_id": stmt.excluded.thread_id,
+                "role": stmt.excluded.role,
+                "message": stmt.excluded.message,
+                "updated_at": func.now(),
             },
-            ensure_ascii=False,
         )
-        await _upload_fact(
-            vector_store_id,
-            content=payload,
-            metadata={"user_id": str(user_id), **(metadata or {})},
+        await session.execute(stmt)
+
+
+class ChatMessage(NamedTuple):
+    """A finalized chat message to mirror to the vector store and transcript table."""
+
+    user_id: UUID
+    thread_id: str
+    item_id: str
+    role: str
+    message: str
+    metadata: dict[str, Any] | None = None
+    created_at: datetime | None = None
+
+
+async def upload_chat_messages(messages: Sequence[ChatMessage]) -> None:
+    """Append chat messages to their users' OpenAI vector stores, one upload per user."""
+
+    facts: dict[UUID, list[tuple[str, dict[str, Any]]]] = {}
+    for entry in messages:
+        meta = {
+            "type": "chat_message",
+            "role": entry.role,
+            "thread_id": entry.thread_id,
+            "item_id": entry.item_id,
+            **(entry.metadata or {}),
+        }
+        facts.setdefault(entry.user_id, []).append((entry.message, meta))
+
+    with tracer.span(
+        "vector_store.append_fact", attributes={"vector_store.fact_count": len(messages)}
+    ):
+        await asyncio.gather(
+            *(
+                append_facts_for_user(user_id, user_facts, payload_key="message")
+                for user_id, user_facts in facts.items()
+            )
         )
-        await session.commit()
+
+
+async def save_chat_messages(messages: Sequence[ChatMessage]) -> None:
+    """Upsert chat messages into the Neon transcript table in one statement."""
+
+    with tracer.span("db.save_transcript_message"):
+        async with SessionLocal() as session:
+            await upsert_transcript_messages(
+                session,
+                [
+                    TranscriptRow(
+                        entry.user_id,
+                        entry.thread_id,
+                        entry.item_id,
+                        entry.role,
+                        entry.message,
+                        entry.created_at,
+                    )
+                    for entry in messages
+                ],
+            )
+
+
+async def record_chat_messages(messages: Sequence[ChatMessage]) -> None:
+    """Persist chat messages to OpenAI vector stores and Neon history."""
+
+    await upload_chat_messages(messages)
+    await save_chat_messages(messages)
 
 
 async def record_chat_message(
@@ -147,48 +441,25 @@ async def record_chat_message(
     role: str,
     message: str,
     metadata: dict[str, Any] | None = None,
+    created_at: datetime | None = None,
 ) -> None:
     """Persist a chat message to OpenAI vector store and Neon history."""
 
-    meta = {
-        "type": "chat_message",
-        "role": role,
-        "thread_id": thread_id,
-        "item_id": item_id,
-        **(metadata or {}),
-    }
-
-    await append_fact_for_user(
-        user_id,
-        message,
-        metadata=meta,
-        payload_key="message",
+    await record_chat_messages(
+        [ChatMessage(user_id, thread_id, item_id, role, message, metadata, created_at)]
     )
 
-    async with SessionLocal() as session:
-        existing = await session.scalar(
-            select(ChatTranscriptMessage).where(ChatTranscriptMessage.item_id == item_id)
-        )
-        if existing:
-            existing.message = message
-            existing.role = role
-            existing.thread_id = thread_id
-        else:
-            session.add(
-                ChatTranscriptMessage(
-                    user_id=user_id,
-                    thread_id=thread_id,
-                    item_id=item_id,
-                    role=role,
-                    message=message,
-                )
-            )
-        await session.commit()
-
 
 __all__ = [
+    "ChatMessage",
     "append_fact_for_user",
+    "append_facts_for_user",
     "get_or_create_user_vector_store",
     "record_chat_message",
+    "record_chat_messages",
+    "save_chat_messages",
+    "TranscriptRow",
+    "upload_chat_messages",
+    "upsert_transcript_messages",
     "get_user_vector_store_id",
 ]
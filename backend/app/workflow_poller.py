@@ -0,0 +1,242 @@
+"""Shared poller that waits on pending workflow runs without a thread per run."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from .config import get_settings
+from .metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+_PENDING_STATUSES = frozenset({"queued", "in_progress"})
+
+
+def _run_status(run: Any) -> str | None:
+    if isinstance(run, dict):
+        return run.get("status")
+    return getattr(run, "status", None)
+
+
+def _run_id(run: Any) -> str:
+    return run["id"] if isinstance(run, dict) else run.id
+
+
+@dataclass(slots=True)
+class _PendingRun:
+    runs_client: Any
+    workflow_id: str
+    run_id: str
+    future: asyncio.Future[Any]
+    started_at: float
+    next_poll_at: float
+    interval: float
+    polls: int = 0
+    errors: int = 0
+
+
+@dataclass(slots=True)
+class WorkflowPollerStats:
+    polls: int = 0
+    completed: int = 0
+    failed: int = 0
+    run_seconds: LatencyHistogram = field(default_factory=LatencyHistogram)
+    polls_per_run: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram((1, 2, 3, 5, 8, 13, 21, 34))
+    )
+
+
+class WorkflowRunPoller:
+    """Track every pending workflow run from one polling task.
+
+    Runs that are due are checked together in one round, bounded by
+    ``concurrency`` concurrent ``retrieve`` calls. The first check of a run is
+    scheduled from the typical duration of recently finished runs and later
+    checks back off geometrically up to ``max_interval``. Callers await a
+    future that resolves with the finished run.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        backoff: float = 1.5,
+        concurrency: int | None = None,
+        max_errors: int = 3,
+    ) -> None:
+        settings = get_settings()
+        self._min_interval = (
+            min_interval
+            if min_interval is not None
+            else settings.workflow_poll_min_interval_ms / 1000
+        )
+        self._max_interval = max(
+            self._min_interval,
+            max_interval
+            if max_interval is not None
+            else settings.workflow_poll_max_interval_ms / 1000,
+        )
+        self._backoff = max(1.0, backoff)
+        self._concurrency = max(1, concurrency or settings.workflow_poll_concurrency)
+        self._max_errors = max(1, max_errors)
+        self._expected_duration: float | None = None
+        self._runs: Dict[str, _PendingRun] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = WorkflowPollerStats()
+
+    async def wait(
+        self,
+        runs_client: Any,
+        run: Any,
+        *,
+        workflow_id: str,
+        started_at: float | None = None,
+    ) -> Any:
+        """Return ``run`` once it has left the queued/in-progress states."""
+
+        started_at = started_at if started_at is not None else time.monotonic()
+        if _run_status(run) not in _PENDING_STATUSES:
+            self._record_finished(started_at, polls=0)
+            return run
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives bind to the first loop that uses them.
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._runs.clear()
+            self._task = None
+
+        interval = self._first_interval()
+        pending = _PendingRun(
+            runs_client=runs_client,
+            workflow_id=workflow_id,
+            run_id=_run_id(run),
+            future=loop.create_future(),
+            started_at=started_at,
+            next_poll_at=started_at + interval,
+            interval=interval,
+        )
+        self._runs[pending.run_id] = pending
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._poll_forever(), name="workflow-run-poller")
+        self._wakeup.set()
+        try:
+            return await pending.future
+        finally:
+            self._runs.pop(pending.run_id, None)
+
+    def pending(self) -> int:
+        return len(self._runs)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "pending": self.pending(),
+            "polls": self.stats.polls,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "expected_run_seconds": round(self._expected_duration or 0.0, 3),
+            "run_seconds_p50": self.stats.run_seconds.quantile(0.5),
+            "run_seconds_p95": self.stats.run_seconds.quantile(0.95),
+            "run_seconds": self.stats.run_seconds.snapshot(),
+            "polls_per_run": self.stats.polls_per_run.snapshot(),
+        }
+
+    async def aclose(self) -> None:
+        """Stop polling and cancel every waiter."""
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for pending in list(self._runs.values()):
+            pending.future.cancel()
+        self._runs.clear()
+
+    # -- Scheduling ------------------------------------------------------
+    def _first_interval(self) -> float:
+        if self._expected_duration is None:
+            return self._min_interval
+        # Aim the first check slightly before a typical run finishes.
+        return min(self._max_interval, max(self._min_interval, self._expected_duration * 0.8))
+
+    def _record_finished(self, started_at: float, *, polls: int) -> None:
+        duration = time.monotonic() - started_at
+        self.stats.completed += 1
+        self.stats.run_seconds.observe(duration)
+        self.stats.polls_per_run.observe(polls)
+        if self._expected_duration is None:
+            self._expected_duration = duration
+        else:
+            self._expected_duration += 0.2 * (duration - self._expected_duration)
+
+    async def _poll_forever(self) -> None:
+        while self._runs:
+            self._wakeup.clear()
+            now = time.monotonic()
+            due = [pending for pending in self._runs.values() if pending.next_poll_at <= now]
+            if due:
+                await self._poll_round(due)
+                continue
+            delay = min(pending.next_poll_at for pending in self._runs.values()) - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_round(self, due: list[_PendingRun]) -> None:
+        limiter = asyncio.Semaphore(self._concurrency)
+
+        async def _check(pending: _PendingRun) -> None:
+            async with limiter:
+                await self._check(pending)
+
+        await asyncio.gather(*(_check(pending) for pending in due))
+
+    async def _check(self, pending: _PendingRun) -> None:
+        if pending.future.done():
+            self._runs.pop(pending.run_id, None)
+            return
+        self.stats.polls += 1
+        pending.polls += 1
+        try:
+            run = await pending.runs_client.retrieve(
+                workflow_id=pending.workflow_id, run_id=pending.run_id
+            )
+        except Exception as exc:
+            pending.errors += 1
+            if pending.errors >= self._max_errors:
+                self.stats.failed += 1
+                self._runs.pop(pending.run_id, None)
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+                return
+            logger.warning(
+                "Workflow run status check failed",
+                extra={"run_id": pending.run_id, "attempt": pending.errors},
+            )
+        else:
+            pending.errors = 0
+            if _run_status(run) not in _PENDING_STATUSES:
+                self._runs.pop(pending.run_id, None)
+                self._record_finished(pending.started_at, polls=pending.polls)
+                if not pending.future.done():
+                    pending.future.set_result(run)
+                return
+
+        pending.interval = min(self._max_interval, pending.interval * self._backoff)
+        pending.next_poll_at = time.monotonic() + pending.interval
+
+
+workflow_poller = WorkflowRunPoller()
+"""Process-wide poller used by the ChatKit server."""
+
+
+__all__ = ["WorkflowRunPoller", "workflow_poller"]
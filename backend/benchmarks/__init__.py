@@ -0,0 +1,15 @@
+"""Micro-benchmarks for backend hot paths.
+
+Run a benchmark from the ``backend`` directory, e.g.
+``python -m benchmarks.memory_store_pagination``. Importing application modules
+requires the same environment as the API, so safe local defaults are applied
+here before any benchmark imports ``app``.
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
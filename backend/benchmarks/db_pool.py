@@ -0,0 +1,134 @@
+"""Compare database pool configurations under concurrent short queries.
+
+Each configuration gets its own engine against the same database and runs
+``--queries`` single-row lookups from ``--concurrency`` tasks, reporting
+throughput, query latency, time spent waiting for a pooled connection and
+peak pool saturation. The "untuned" row uses the previous engine options
+(SQLAlchemy's default 5+10 pool with pre-ping on every checkout); the
+"configured" row uses the ``DB_*`` settings.
+
+Point ``DATABASE_URL`` (or ``--url``) at PostgreSQL to see the effect of
+pre-ping and statement caching; each avoided round trip is worth one
+network RTT. Without a URL the benchmark falls back to a temporary SQLite
+file, which only exercises pool sizing and checkout contention.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app import database
+from app.config import get_settings
+
+
+@dataclass(slots=True)
+class Result:
+    label: str
+    elapsed: float
+    latencies: list[float]
+    waits: list[float]
+    peak_saturation: float
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _run(label: str, engine: AsyncEngine, *, queries: int, concurrency: int) -> Result:
+    latencies: list[float] = []
+    waits: list[float] = []
+    peak = 0.0
+    remaining = queries
+
+    async def _worker() -> None:
+        nonlocal remaining, peak
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            async with engine.connect() as connection:
+                checked_out = time.perf_counter()
+                peak = max(peak, database.pool_snapshot(engine.pool).get("saturation", 0.0))
+                await connection.execute(text("SELECT :value AS value"), {"value": remaining})
+            finished = time.perf_counter()
+            waits.append(checked_out - started)
+            latencies.append(finished - started)
+
+    # Warm the pool so connection setup is not counted against either configuration.
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return Result(label, elapsed, latencies, waits, peak)
+
+
+def _report(result: Result) -> None:
+    ms = 1000
+    print(result.label)
+    print(f"  throughput       {len(result.latencies) / result.elapsed:10.0f} queries/s")
+    print(f"  latency p50/p99  {_percentile(result.latencies, 0.5) * ms:7.2f} / "
+          f"{_percentile(result.latencies, 0.99) * ms:7.2f} ms")
+    print(f"  pool wait p99    {_percentile(result.waits, 0.99) * ms:7.2f} ms"
+          f" (mean {statistics.fmean(result.waits) * ms:.2f} ms)")
+    print(f"  peak saturation  {result.peak_saturation:10.0%}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=database.database_dsn)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    url = make_url(args.url)
+    if url.get_backend_name() == "sqlite" and url.database in {None, "", ":memory:"}:
+        # In-memory SQLite uses a single static connection; a file gets a real queue pool.
+        url = make_url(f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='db-pool-bench-')}/bench.db")
+    print(
+        f"{args.queries} queries from {args.concurrency} tasks against "
+        f"{url.get_backend_name()} ({url.host or url.database})"
+    )
+    settings = get_settings()
+    configured = database.build_engine_options(
+        url,
+        database.connect_args,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
+    untuned = database.build_engine_options(
+        url, database.connect_args, pool_pre_ping=True, pool_size=5, max_overflow=10, pool_recycle=-1
+    )
+    if url.get_backend_name() == "postgresql":
+        untuned["connect_args"] = {
+            key: value
+            for key, value in untuned["connect_args"].items()
+            if key not in {"statement_cache_size", "prepared_statement_cache_size"}
+        }
+
+    configurations: list[tuple[str, dict[str, Any]]] = [
+        ("untuned (pre-ping, 5+10 pool)", untuned),
+        (
+            f"configured (pre-ping={configured['pool_pre_ping']}, "
+            f"{configured['pool_size']}+{configured['max_overflow']} pool)",
+            configured,
+        ),
+    ]
+    for label, options in configurations:
+        engine = create_async_engine(url.render_as_string(hide_password=False), **options)
+        _report(await _run(label, engine, queries=args.queries, concurrency=args.concurrency))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""Measure local BM25 recall quality and latency on a synthetic memory corpus.
+
+Each simulated user accumulates ``--documents`` memories: one distinctive fact
+per person ("Priya's favourite food is ramen") buried among chit-chat that
+reuses the same everyday vocabulary and often mentions the same people.
+Questions are paraphrases that share only the distinctive terms with their
+fact; a second set asks about people who were never mentioned and should fall
+through to the remote vector store.
+
+The report covers recall@1, recall@k and MRR for answerable questions, how
+often local recall was confident (and how often it was confidently wrong on
+unanswerable ones), index and query latency, and the remote round trips
+avoided at ``--remote-rtt-ms`` each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from app.recall import LocalRecall
+
+NAMES = [
+    f"{first}{suffix}"
+    for first in ("priya", "mateo", "aiko", "lars", "noor", "tomas", "ines", "kofi", "yara", "bram")
+    for suffix in ("", "lyn", "ton", "ella", "ric")
+]
+ATTRIBUTES = {
+    "favourite food": ["ramen", "paella", "pierogi", "injera", "tamales", "baklava", "laksa", "gnocchi"],
+    "home town": ["lisbon", "osaka", "tromso", "accra", "cusco", "ghent", "tbilisi", "hobart"],
+    "instrument": ["cello", "oud", "banjo", "sitar", "theremin", "bassoon", "marimba", "ukulele"],
+    "pet": ["ferret", "iguana", "parrot", "axolotl", "beagle", "tortoise", "hedgehog", "corgi"],
+}
+# Questions share the name and one attribute word with their fact, never the answer.
+QUESTIONS = {
+    "favourite food": "what food does {name} like best",
+    "home town": "which town is {name} from",
+    "instrument": "what instrument does {name} play",
+    "pet": "what kind of pet does {name} have",
+}
+KNOWN_NAMES = 30
+CHATTER = (
+    "thanks that helps a lot",
+    "can you remind me later about the meeting",
+    "I had a long day at work today",
+    "let's plan something fun for the weekend",
+    "could you summarise what we talked about",
+    "the weather has been strange this week",
+    "I want to eat healthier and sleep more",
+    "my friend asked about a good book to read",
+)
+
+
+def _corpus(rng: random.Random, documents: int) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """Return ``(doc_id, text)`` memories and ``(question, doc_id)`` pairs."""
+
+    memories: list[tuple[str, str]] = []
+    questions: list[tuple[str, str]] = []
+    known = rng.sample(NAMES, KNOWN_NAMES)
+    facts = [(name, attribute) for name in known for attribute in ATTRIBUTES]
+    rng.shuffle(facts)
+    spacing = max(1, documents // len(facts))
+    for index in range(documents):
+        doc_id = f"doc_{index}"
+        if index % spacing == 0 and facts:
+            name, attribute = facts.pop()
+            value = rng.choice(ATTRIBUTES[attribute])
+            memories.append((doc_id, f"{name.title()}'s {attribute} is {value}, {rng.choice(CHATTER)}"))
+            questions.append((QUESTIONS[attribute].format(name=name.title()) + "?", doc_id))
+        elif index % 3 == 0:
+            # Decoys mention a known person without stating any attribute.
+            memories.append((doc_id, f"{rng.choice(known).title()} said {rng.choice(CHATTER)}"))
+        else:
+            memories.append((doc_id, f"{rng.choice(CHATTER)} and {rng.choice(CHATTER)}"))
+    return memories, questions
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=0.5)
+    parser.add_argument("--remote-rtt-ms", type=float, default=350.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    async def _no_warm(user_id: uuid.UUID, limit: int) -> list[tuple[str, str]]:
+        return []
+
+    rng = random.Random(args.seed)
+    recall = LocalRecall(
+        max_users=args.users,
+        max_documents_per_user=args.documents,
+        min_score=args.min_score,
+        loader=_no_warm,
+    )
+    add_seconds: list[float] = []
+    query_seconds: list[float] = []
+    reciprocal_ranks: list[float] = []
+    top1 = topk = answered_locally = false_confident = unanswerable = 0
+
+    for _ in range(args.users):
+        user_id = uuid.uuid4()
+        memories, questions = _corpus(rng, args.documents)
+        for doc_id, text in memories:
+            started = time.perf_counter()
+            recall.add(user_id, doc_id, text)
+            add_seconds.append(time.perf_counter() - started)
+
+        mentioned = {text.split("'", 1)[0].lower() for _, text in memories if "'s " in text}
+        strangers = [name for name in NAMES if name not in mentioned]
+        for question, expected in questions:
+            started = time.perf_counter()
+            result = await recall.search(user_id, question, k=args.top_k)
+            query_seconds.append(time.perf_counter() - started)
+            ranked = [hit.doc_id for hit in result.hits]
+            rank = ranked.index(expected) + 1 if expected in ranked else 0
+            top1 += rank == 1
+            topk += rank > 0
+            reciprocal_ranks.append(1 / rank if rank else 0.0)
+            answered_locally += result.confident and rank == 1
+        for name in strangers[:10]:
+            attribute = rng.choice(list(QUESTIONS))
+            result = await recall.search(user_id, QUESTIONS[attribute].format(name=name.title()), k=args.top_k)
+            unanswerable += 1
+            false_confident += result.confident
+
+    answerable = len(reciprocal_ranks)
+    ms = 1000
+    print(f"{args.users} users x {args.documents} memories, {answerable} answerable and "
+          f"{unanswerable} unanswerable questions, min score {args.min_score}")
+    print(f"  recall@1 / recall@{args.top_k}   {top1 / answerable:6.1%} / {topk / answerable:6.1%}")
+    print(f"  MRR                  {sum(reciprocal_ranks) / answerable:8.3f}")
+    print(f"  answered locally     {answered_locally / answerable:6.1%} of answerable")
+    print(f"  confidently wrong    {false_confident / max(1, unanswerable):6.1%} of unanswerable")
+    print(f"  add p50/p99          {_percentile(add_seconds, 0.5) * ms * 1000:7.1f} / "
+          f"{_percentile(add_seconds, 0.99) * ms * 1000:7.1f} us")
+    print(f"  search p50/p99       {_percentile(query_seconds, 0.5) * ms:7.3f} / "
+          f"{_percentile(query_seconds, 0.99) * ms:7.3f} ms")
+    saved = answered_locally * args.remote_rtt_ms / ms
+    print(f"  remote time avoided  {saved:7.1f} s over {answerable + unanswerable} lookups "
+          f"at {args.remote_rtt_ms:.0f} ms each")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
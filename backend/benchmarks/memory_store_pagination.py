@@ -0,0 +1,99 @@
+"""Compare MemoryStore cursor pagination against the previous sort-per-call approach."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from chatkit.types import AssistantMessageContent, AssistantMessageItem, ThreadMetadata
+
+from app.memory_store import MemoryStore
+
+THREADS = 10_000
+ITEMS_PER_THREAD = 5_000
+PAGE_SIZE = 20
+PAGES = 50
+EPOCH = datetime(2025, 1, 1)
+
+PageLoader = Callable[[str | None], Awaitable[list[Any]]]
+
+
+def _legacy_loader(values: list[Any], order: str) -> PageLoader:
+    """Reproduce the original copy, sort, and index-map pagination."""
+
+    async def _load(after: str | None) -> list[Any]:
+        ordered = sorted(
+            (value.model_copy(deep=True) for value in values),
+            key=lambda value: value.created_at or datetime.min,
+            reverse=(order == "desc"),
+        )
+        if after:
+            index_map = {value.id: idx for idx, value in enumerate(ordered)}
+            start = index_map.get(after, -1) + 1
+        else:
+            start = 0
+        return ordered[start : start + PAGE_SIZE]
+
+    return _load
+
+
+async def _walk(load_page: PageLoader) -> float:
+    started = time.perf_counter()
+    after: str | None = None
+    for _ in range(PAGES):
+        data = await load_page(after)
+        after = data[-1].id
+    return (time.perf_counter() - started) * 1000 / PAGES
+
+
+async def _compare(label: str, legacy: PageLoader, indexed: PageLoader) -> None:
+    legacy_ms = await _walk(legacy)
+    indexed_ms = await _walk(indexed)
+    print(label)
+    print(f"  legacy   {legacy_ms:9.3f} ms/page")
+    print(f"  indexed  {indexed_ms:9.3f} ms/page  ({legacy_ms / indexed_ms:.0f}x faster)")
+
+
+async def main() -> None:
+    store = MemoryStore()
+    threads = [
+        ThreadMetadata(id=f"thr_{index:05d}", created_at=EPOCH + timedelta(seconds=index))
+        for index in range(THREADS)
+    ]
+    for thread in threads:
+        await store.save_thread(thread, {})
+
+    items = [
+        AssistantMessageItem(
+            id=f"msg_{index:05d}",
+            thread_id="thr_00000",
+            created_at=EPOCH + timedelta(milliseconds=index),
+            content=[AssistantMessageContent(text=f"message {index}")],
+        )
+        for index in range(ITEMS_PER_THREAD)
+    ]
+    for item in items:
+        await store.add_thread_item("thr_00000", item, {})
+
+    async def _threads_page(after: str | None) -> list[Any]:
+        return (await store.load_threads(PAGE_SIZE, after, "desc", {})).data
+
+    async def _items_page(after: str | None) -> list[Any]:
+        return (await store.load_thread_items("thr_00000", after, PAGE_SIZE, "asc", {})).data
+
+    await _compare(
+        f"load_threads ({THREADS} threads, {PAGES} pages of {PAGE_SIZE})",
+        _legacy_loader(threads, "desc"),
+        _threads_page,
+    )
+    await _compare(
+        f"load_thread_items ({ITEMS_PER_THREAD} items, {PAGES} pages of {PAGE_SIZE})",
+        _legacy_loader(items, "asc"),
+        _items_page,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
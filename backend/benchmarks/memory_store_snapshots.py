@@ -0,0 +1,76 @@
+"""Compare shared snapshot reads against deep-copy-per-read in MemoryStore."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from chatkit.types import AssistantMessageContent, AssistantMessageItem
+
+from app.memory_store import MemoryStore
+
+THREADS = 50
+ITEMS_PER_THREAD = 200
+TEXT_BYTES = 4_000
+PAGE_SIZE = 50
+TURNS = 2_000
+EPOCH = datetime(2025, 1, 1)
+
+
+async def _populate(store: MemoryStore) -> None:
+    text = "x" * TEXT_BYTES
+    for thread_index in range(THREADS):
+        thread_id = f"thr_{thread_index:03d}"
+        for index in range(ITEMS_PER_THREAD):
+            await store.add_thread_item(
+                thread_id,
+                AssistantMessageItem(
+                    id=f"msg_{thread_index:03d}_{index:04d}",
+                    thread_id=thread_id,
+                    created_at=EPOCH + timedelta(seconds=index),
+                    content=[AssistantMessageContent(text=text)],
+                ),
+                {},
+            )
+
+
+async def _turns(store: MemoryStore) -> None:
+    """Each turn reads the newest page of a thread and re-reads its last item."""
+
+    for turn in range(TURNS):
+        thread_id = f"thr_{turn % THREADS:03d}"
+        page = await store.load_thread_items(thread_id, None, PAGE_SIZE, "desc", {})
+        await store.load_item(thread_id, page.data[0].id, {})
+
+
+async def _measure(label: str, store: MemoryStore) -> None:
+    await _populate(store)
+
+    started = time.perf_counter()
+    await _turns(store)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await _turns(store)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"  {label:<13} {TURNS / elapsed:9.0f} turns/s  "
+        f"{elapsed * 1000 / TURNS:7.3f} ms/turn  peak read allocations {peak / 1024:9.1f} KiB"
+    )
+
+
+async def main() -> None:
+    print(
+        f"{TURNS} turns over {THREADS} threads x {ITEMS_PER_THREAD} items "
+        f"({TEXT_BYTES} byte messages, pages of {PAGE_SIZE})"
+    )
+    await _measure("deep copy", MemoryStore())
+    await _measure("shared views", MemoryStore(copy_on_read=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Compare id-indexed item updates and deletes against linear list scans."""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from chatkit.types import AssistantMessageContent, AssistantMessageItem
+from chatkit_stores import OrderedIndex
+
+ITEMS = 20_000
+UPDATES = 2_000
+DELETES = 2_000
+EPOCH = datetime(2025, 1, 1)
+
+
+def _items() -> list[AssistantMessageItem]:
+    return [
+        AssistantMessageItem(
+            id=f"msg_{index:05d}",
+            thread_id="thr_1",
+            created_at=EPOCH + timedelta(milliseconds=index),
+            content=[AssistantMessageContent(text=f"message {index}")],
+        )
+        for index in range(ITEMS)
+    ]
+
+
+def _timed(action: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    action()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    items = _items()
+    streamed = items[-1]
+    victims = random.Random(7).sample([item.id for item in items[:-1]], DELETES)
+
+    legacy = list(items)
+
+    def _legacy_updates() -> None:
+        for _ in range(UPDATES):
+            for position, existing in enumerate(legacy):
+                if existing.id == streamed.id:
+                    legacy[position] = streamed
+                    break
+
+    def _legacy_deletes() -> None:
+        nonlocal legacy
+        for item_id in victims:
+            legacy = [item for item in legacy if item.id != item_id]
+
+    index: OrderedIndex[AssistantMessageItem] = OrderedIndex()
+    for item in items:
+        index.upsert(item.id, item.created_at, item)
+
+    def _indexed_updates() -> None:
+        for _ in range(UPDATES):
+            index.upsert(streamed.id, streamed.created_at, streamed)
+
+    def _indexed_deletes() -> None:
+        for item_id in victims:
+            index.remove(item_id)
+
+    print(f"{ITEMS} items in one thread")
+    for label, legacy_action, indexed_action, count in (
+        ("save_item on the streamed message", _legacy_updates, _indexed_updates, UPDATES),
+        ("delete_thread_item", _legacy_deletes, _indexed_deletes, DELETES),
+    ):
+        legacy_ms = _timed(legacy_action)
+        indexed_ms = _timed(indexed_action)
+        print(f"{label} x{count}")
+        print(f"  list scan  {legacy_ms * 1000 / count:10.2f} us/op")
+        print(
+            f"  indexed    {indexed_ms * 1000 / count:10.2f} us/op  "
+            f"({legacy_ms / indexed_ms:.0f}x faster)"
+        )
+
+    assert [item.id for item in legacy] == [item.id for item in index.page(None, ITEMS, "asc")[0]]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare per-message vector store uploads against batched transcript writes.
+
+Chat messages go through ``TranscriptWriteQueue`` exactly as the ChatKit
+stores submit them. A fake OpenAI vector store client stands in for the
+network: every ``upload_and_poll`` call sleeps for a simulated round trip
+and counts the files and bytes it receives. The transcript upsert sleeps
+for a database round trip instead of touching a database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any
+
+from app import vector_store
+from app.transcript_queue import TranscriptJob, TranscriptWriteQueue
+
+MESSAGES = 1_000
+CONCURRENT_USERS = 20
+WORKERS = 4
+ROUND_TRIP_SECONDS = 0.05
+DB_ROUND_TRIP_SECONDS = 0.005
+BATCH_MAX_FACTS = 50
+
+
+class _FakeFileBatches:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.files = 0
+        self.facts = 0
+        self.bytes = 0
+
+    def upload_and_poll(self, *, vector_store_id: str, files: list[tuple[str, Any]]) -> None:
+        time.sleep(ROUND_TRIP_SECONDS)
+        with self._lock:
+            self.calls += 1
+            self.files += len(files)
+            self.facts += sum(handle.getvalue().count(b"\n") - 2 for _, handle in files)
+            self.bytes += sum(len(handle.getvalue()) for _, handle in files)
+
+
+async def _resolve(user_id: uuid.UUID) -> str:
+    return f"vs_{user_id}"
+
+
+async def _upsert(session: Any, rows: Any, **_: Any) -> int:
+    await asyncio.sleep(DB_ROUND_TRIP_SECONDS)
+    return len(rows)
+
+
+async def _run(label: str, batch_size: int) -> None:
+    file_batches = _FakeFileBatches()
+    clients = vector_store._VectorStoreClients(object(), object(), file_batches, "fake")
+    vector_store._resolve_vector_store_clients = lambda: clients  # type: ignore[assignment]
+    vector_store._resolve_user_vector_store = _resolve  # type: ignore[assignment]
+    vector_store.upsert_transcript_messages = _upsert  # type: ignore[assignment]
+
+    queue = TranscriptWriteQueue(
+        workers=WORKERS, batch_size=batch_size, maxsize=MESSAGES, backoff_seconds=0
+    )
+    users = [uuid.uuid4() for _ in range(CONCURRENT_USERS)]
+    started = time.perf_counter()
+    for index in range(MESSAGES):
+        await queue.submit(
+            TranscriptJob(
+                user_id=users[index % CONCURRENT_USERS],
+                thread_id=f"thr_{index % CONCURRENT_USERS}",
+                item_id=f"msg_{index}",
+                role="user",
+                message=f"message number {index}",
+            )
+        )
+    await queue.drain()
+    elapsed = time.perf_counter() - started
+
+    stats = queue.snapshot()
+    print(label)
+    print(f"  writer calls  {stats['batches']:6d}")
+    print(f"  upload calls  {file_batches.calls:6d}")
+    print(f"  facts/file    {file_batches.facts / max(file_batches.files, 1):8.1f}")
+    print(f"  avg file size {file_batches.bytes / max(file_batches.files, 1):8.0f} bytes")
+    print(f"  wall time     {elapsed:8.2f} s")
+
+
+async def main() -> None:
+    print(
+        f"{MESSAGES} messages from {CONCURRENT_USERS} users through {WORKERS} queue workers, "
+        f"{ROUND_TRIP_SECONDS * 1000:.0f} ms per upload"
+    )
+    await _run("per-message writes (batch_size=1)", batch_size=1)
+    await _run(f"batched writes (batch_size={BATCH_MAX_FACTS})", batch_size=BATCH_MAX_FACTS)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -15,11 +15,17 @@ os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
 os.environ.setdefault("JWT_SECRET", "test-secret")
 os.environ.setdefault("STACK_PROJECT_ID", "stack-test-project")
 os.environ.setdefault("STACK_SECRET_KEY", "stack-test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
 
 from app.database import Base, get_session  # noqa: E402  (import after env setup)
 from app.main import app  # noqa: E402
 
 
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
 @pytest.fixture
 async def db_engine() -> AsyncIterator[AsyncEngine]:
     engine = create_async_engine(
@@ -0,0 +1,57 @@
+"""Tests for ChatKit admission control."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr("app.admission.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_rejects_bursts_with_retry_hint(clock) -> None:
+    controller = AdmissionController(
+        rate=0.5, burst=2, max_in_flight_per_user=0, max_in_flight=0
+    )
+    for _ in range(2):
+        controller.acquire("noisy").release()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("noisy")
+    assert rejected.value.reason == "rate"
+    assert rejected.value.retry_after == pytest.approx(2.0)
+    assert rejected.value.retry_after_header == "2"
+
+    # Other tenants keep their own budget.
+    controller.acquire("quiet").release()
+
+    clock[0] += 2
+    controller.acquire("noisy").release()
+    snapshot = controller.snapshot()
+    assert snapshot["admitted"] == 4
+    assert snapshot["rejected"]["rate"] == 1
+
+
+def test_in_flight_caps_hold_until_release(clock) -> None:
+    controller = AdmissionController(rate=0, burst=0, max_in_flight_per_user=1, max_in_flight=2)
+    first = controller.acquire("user_a")
+    with pytest.raises(AdmissionRejected) as per_user:
+        controller.acquire("user_a")
+    assert per_user.value.reason == "user_in_flight"
+
+    second = controller.acquire("user_b")
+    with pytest.raises(AdmissionRejected) as global_cap:
+        controller.acquire("user_c")
+    assert global_cap.value.reason == "global_in_flight"
+
+    first.release()
+    first.release()
+    assert controller.snapshot()["in_flight"] == 1
+    controller.acquire("user_a")
+    second.release()
+    assert controller.snapshot()["peak_in_flight"] == 2
@@ -0,0 +1,58 @@
+"""Tests for the authenticated-user cache used by ``get_current_user``."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+
+from app import dependencies
+from app.dependencies import AuthenticatedUserCache, get_current_user
+from app.models import User
+from app.security import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+class _UnusableSession:
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("cached lookups must not touch the database")
+
+
+async def test_repeat_requests_skip_decode_and_database(
+    session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = AuthenticatedUserCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(dependencies, "auth_cache", cache)
+
+    async with session_factory() as session:
+        user = User(email="cached@example.com")
+        session.add(user)
+        await session.commit()
+        token = create_access_token(user_id=user.id)
+        assert (await get_current_user(token=token, session=session)).id == user.id
+
+    def _fail_decode(token: str) -> dict[str, str]:
+        raise AssertionError("verified tokens must not be decoded again")
+
+    monkeypatch.setattr(dependencies, "decode_token", _fail_decode)
+    cached = await get_current_user(token=token, session=_UnusableSession())
+    assert cached.id == user.id
+
+    stats = cache.snapshot()
+    assert stats["requests"] == 2
+    assert stats["db_round_trips_saved"] == 1
+    assert stats["db_round_trips_saved_per_request"] == 0.5
+
+    cache.invalidate_user(user.id)
+    with pytest.raises(AssertionError):
+        await get_current_user(token=token, session=_UnusableSession())
+
+
+async def test_invalid_tokens_are_rejected_and_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = AuthenticatedUserCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(dependencies, "auth_cache", cache)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await get_current_user(token="not-a-jwt", session=_UnusableSession())
+    assert excinfo.value.status_code == 401
+    assert cache.snapshot()["token_hit_rate"] == 0.0
@@ -0,0 +1,98 @@
+"""Tests for the workflow-backed ChatKit server."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from chatkit.types import (
+    AssistantMessageContentPartTextDelta,
+    ErrorEvent,
+    ThreadItemAddedEvent,
+    ThreadItemDoneEvent,
+    ThreadItemUpdated,
+    ThreadMetadata,
+)
+
+from app import chat
+from app.memory_store import MemoryStore
+
+pytestmark = pytest.mark.anyio
+
+
+class _FakeStream:
+    def __init__(self, events: list[dict]) -> None:
+        self._events = events
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self._events:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+
+class _FakeRuns:
+    def __init__(self, events: list) -> None:
+        self.events = events
+        self.requests: list[dict] = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return _FakeStream(self.events)
+
+
+async def _respond(monkeypatch, events: list) -> tuple[list, _FakeRuns]:
+    runs = _FakeRuns(events)
+    monkeypatch.setattr(chat, "async_openai_client", SimpleNamespace(workflows=SimpleNamespace(runs=runs)))
+    server = chat.FactAssistantServer(MemoryStore())
+    thread = ThreadMetadata(id="thr_1", created_at=datetime(2025, 1, 1))
+    context = {"workflow_id": "wf_1", "user": SimpleNamespace(id="user_1")}
+    return [event async for event in server.respond(thread, None, context)], runs
+
+
+async def test_streamed_run_emits_incremental_updates(monkeypatch) -> None:
+    events, runs = await _respond(
+        monkeypatch,
+        [
+            {"type": "run.created"},
+            {"type": "response.output_text.delta", "delta": "Hel"},
+            {"type": "response.output_text.delta", "delta": "lo"},
+            {"type": "run.completed", "run": {"output": []}},
+        ],
+    )
+
+    assert runs.requests[0]["stream"] is True
+    assert runs.requests[0]["input"]["thread_id"] == "thr_1"
+    assert isinstance(events[0], ThreadItemAddedEvent)
+    deltas = [
+        event.update.delta
+        for event in events
+        if isinstance(event, ThreadItemUpdated)
+        and isinstance(event.update, AssistantMessageContentPartTextDelta)
+    ]
+    assert deltas == ["Hel", "lo"]
+    assert isinstance(events[-1], ThreadItemDoneEvent)
+    assert events[-1].item.content[0].text == "Hello"
+
+
+async def test_stream_without_deltas_uses_final_run_text(monkeypatch) -> None:
+    final = {"output": [{"role": "assistant", "content": [{"type": "output_text", "text": "Done"}]}]}
+    events, _ = await _respond(monkeypatch, [{"type": "run.completed", "run": final}])
+
+    assert isinstance(events[-1], ThreadItemDoneEvent)
+    assert events[-1].item.content[0].text == "Done"
+
+
+async def test_stream_failure_keeps_partial_text_and_reports_error(monkeypatch) -> None:
+    events, _ = await _respond(
+        monkeypatch,
+        [{"type": "response.output_text.delta", "delta": "Partial"}, RuntimeError("boom")],
+    )
+
+    assert isinstance(events[-2], ThreadItemDoneEvent)
+    assert events[-2].item.content[0].text == "Partial"
+    assert isinstance(events[-1], ErrorEvent)
@@ -0,0 +1,49 @@
+"""Tests for engine pool options and pool saturation reporting."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.database import build_engine_options, pool_snapshot
+
+pytestmark = pytest.mark.anyio
+
+
+def test_pgbouncer_endpoints_disable_statement_caches() -> None:
+    pooled = make_url("postgresql+asyncpg://u:p@ep-cool-123-pooler.neon.tech/app")
+    direct = make_url("postgresql+asyncpg://u:p@ep-cool-123.neon.tech/app")
+
+    pooled_args = build_engine_options(pooled, {"ssl": True})["connect_args"]
+    direct_options = build_engine_options(direct, {}, pool_size=3)
+
+    assert pooled_args["statement_cache_size"] == 0
+    assert pooled_args["prepared_statement_cache_size"] == 0
+    assert pooled_args["prepared_statement_name_func"]() != pooled_args["prepared_statement_name_func"]()
+    assert pooled_args["ssl"] is True
+    assert direct_options["connect_args"] == {
+        "statement_cache_size": 100,
+        "prepared_statement_cache_size": 100,
+    }
+    assert direct_options["pool_size"] == 3 and direct_options["pool_pre_ping"] is True
+
+
+async def test_pool_snapshot_reports_saturation(tmp_path) -> None:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=2,
+        max_overflow=2,
+    )
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            snapshot = pool_snapshot(engine.pool)
+            assert snapshot["checked_out"] == 2 and snapshot["saturation"] == 0.5
+        assert pool_snapshot(engine.pool)["checked_out"] == 0
+    finally:
+        await engine.dispose()
@@ -0,0 +1,53 @@
+"""Tests for the per-upstream bounded executors."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.executors import BoundedExecutor
+
+pytestmark = pytest.mark.anyio
+
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+
+async def test_calls_queue_for_a_free_worker_and_report_wait() -> None:
+    executor = BoundedExecutor("test", max_workers=1)
+    release = threading.Event()
+    try:
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        waiting = asyncio.ensure_future(executor.run(time.perf_counter))
+        await asyncio.sleep(0.05)
+        snapshot = executor.snapshot()
+        assert snapshot["active"] == 1 and snapshot["queued"] == 1
+
+        release.set()
+        await asyncio.gather(blocked, waiting)
+    finally:
+        executor.shutdown()
+
+    snapshot = executor.snapshot()
+    assert snapshot["completed"] == 2 and snapshot["active"] == 0
+    # Only the first call started within 10ms; the second waited behind it.
+    assert snapshot["queue_seconds"]["buckets"]["0.01"] == 1
+
+
+async def test_context_variables_and_errors_propagate() -> None:
+    executor = BoundedExecutor("test", max_workers=2)
+    _request_id.set("req-1")
+
+    def _fail() -> None:
+        raise ValueError(_request_id.get())
+
+    try:
+        assert await executor.run(_request_id.get) == "req-1"
+        with pytest.raises(ValueError, match="req-1"):
+            await executor.run(_fail)
+    finally:
+        executor.shutdown()
+    assert executor.snapshot()["failed"] == 1
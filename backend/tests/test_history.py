@@ -0,0 +1,104 @@
+"""Tests for the per-thread conversation history cache."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from chatkit.types import (
+    AssistantMessageContent,
+    AssistantMessageItem,
+    InferenceOptions,
+    UserMessageItem,
+    UserMessageTextContent,
+)
+
+from app.chat import _load_thread_messages
+from app.history import ThreadHistoryCache
+from app.memory_store import MemoryStore
+
+pytestmark = pytest.mark.anyio
+
+_EPOCH = datetime(2025, 1, 1)
+
+
+def _user(index: int, text: str) -> UserMessageItem:
+    return UserMessageItem(
+        id=f"msg_{index:04d}",
+        thread_id="thr_1",
+        created_at=_EPOCH + timedelta(seconds=index),
+        content=[UserMessageTextContent(text=text)],
+        inference_options=InferenceOptions(),
+    )
+
+
+def _assistant(index: int, text: str) -> AssistantMessageItem:
+    return AssistantMessageItem(
+        id=f"msg_{index:04d}",
+        thread_id="thr_1",
+        created_at=_EPOCH + timedelta(seconds=index),
+        content=[AssistantMessageContent(text=text)],
+    )
+
+
+def _texts(messages: list[dict]) -> list[str]:
+    return [message["content"][0]["text"] for message in messages]
+
+
+async def test_history_is_loaded_once_then_updated_incrementally(monkeypatch) -> None:
+    store = MemoryStore()
+    await store.add_thread_item("thr_1", _user(0, "hi"), {})
+    await store.add_thread_item("thr_1", _assistant(1, "hello"), {})
+
+    loads = 0
+    original = store.load_thread_items
+
+    async def _counting_load(*args, **kwargs):
+        nonlocal loads
+        loads += 1
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(store, "load_thread_items", _counting_load)
+
+    assert _texts(await _load_thread_messages(store, "thr_1", {})) == ["hi", "hello"]
+    await store.add_thread_item("thr_1", _user(2, "more"), {})
+    await store.save_item("thr_1", _assistant(1, "hello again"), {})
+    assert _texts(await _load_thread_messages(store, "thr_1", {})) == ["hi", "hello again", "more"]
+    assert loads == 1
+
+    await store.delete_thread_item("thr_1", "msg_0000", {})
+    assert _texts(await _load_thread_messages(store, "thr_1", {})) == ["hello again", "more"]
+    assert loads == 2
+
+
+def test_window_keeps_newest_messages_within_token_budget() -> None:
+    cache = ThreadHistoryCache(max_threads=10, max_items=100)
+    token = cache.begin_load("thr_1")
+    cache.seed("thr_1", token, [_user(index, "x" * 40) for index in range(10)])
+
+    # Each message is estimated at 10 text tokens plus 4 tokens of framing.
+    assert len(cache.window("thr_1", 14 * 3)) == 3
+    assert len(cache.window("thr_1", 1)) == 1
+
+
+def test_writes_during_a_load_invalidate_the_seed() -> None:
+    cache = ThreadHistoryCache(max_threads=10, max_items=100)
+    token = cache.begin_load("thr_1")
+    cache.record("thr_1", _user(5, "raced"))
+
+    assert not cache.seed("thr_1", token, [_user(0, "stale")])
+    assert cache.window("thr_1", 1000) is None
+
+
+def test_out_of_order_items_force_a_reload() -> None:
+    cache = ThreadHistoryCache(max_threads=10, max_items=2)
+    cache.seed("thr_1", cache.begin_load("thr_1"), [_user(1, "a"), _user(2, "b"), _user(3, "c")])
+    assert _texts(cache.window("thr_1", 1000)) == ["b", "c"]
+
+    cache.record("thr_1", _user(0, "late"))
+    assert cache.window("thr_1", 1000) is None
+
+    cache.seed("thr_1", cache.begin_load("thr_1"), [_user(1, "a")])
+    aware = _user(2, "aware").model_copy(update={"created_at": datetime(2025, 1, 2, tzinfo=timezone.utc)})
+    cache.record("thr_1", aware)
+    assert cache.window("thr_1", 1000) is None
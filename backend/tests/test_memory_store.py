@@ -0,0 +1,181 @@
+"""Tests for the in-memory ChatKit store."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from chatkit.store import NotFoundError
+from chatkit.types import AssistantMessageContent, AssistantMessageItem, ThreadMetadata
+
+from app.memory_store import MemoryStore
+from app.transcript_queue import TranscriptJob
+
+pytestmark = pytest.mark.anyio
+
+_EPOCH = datetime(2025, 1, 1)
+
+
+def _message(thread_id: str, index: int, *, text: str = "hello") -> AssistantMessageItem:
+    return AssistantMessageItem(
+        id=f"msg_{index:04d}",
+        thread_id=thread_id,
+        created_at=_EPOCH + timedelta(seconds=index),
+        content=[AssistantMessageContent(text=text)],
+    )
+
+
+async def _collect_ids(store: MemoryStore, thread_id: str, order: str, limit: int) -> list[str]:
+    ids: list[str] = []
+    after: str | None = None
+    while True:
+        page = await store.load_thread_items(thread_id, after, limit, order, {})
+        ids.extend(item.id for item in page.data)
+        if not page.has_more:
+            return ids
+        after = page.after
+
+
+async def test_thread_items_paginate_in_created_order() -> None:
+    store = MemoryStore()
+    for index in (3, 0, 4, 1, 2):
+        await store.add_thread_item("thr_1", _message("thr_1", index), {})
+
+    expected = [f"msg_{index:04d}" for index in range(5)]
+    assert await _collect_ids(store, "thr_1", "asc", limit=2) == expected
+    assert await _collect_ids(store, "thr_1", "desc", limit=2) == expected[::-1]
+
+
+async def test_save_item_replaces_in_place_and_reads_share_snapshots() -> None:
+    store = MemoryStore(copy_on_read=False)
+    await store.add_thread_item("thr_1", _message("thr_1", 0), {})
+    await store.add_thread_item("thr_1", _message("thr_1", 1), {})
+    written = _message("thr_1", 0, text="updated")
+    await store.save_item("thr_1", written, {})
+    written.content[0].text = "changed after save"
+
+    page = await store.load_thread_items("thr_1", None, 10, "asc", {})
+    assert [item.id for item in page.data] == ["msg_0000", "msg_0001"]
+
+    loaded = await store.load_item("thr_1", "msg_0000", {})
+    assert loaded.content[0].text == "updated"
+    assert loaded is page.data[0]
+
+    await store.delete_thread_item("thr_1", "msg_0000", {})
+    with pytest.raises(NotFoundError):
+        await store.load_item("thr_1", "msg_0000", {})
+
+
+async def test_reads_are_isolated_from_callers_that_edit_items() -> None:
+    store = MemoryStore()
+    await store.add_thread_item("thr_1", _message("thr_1", 0), {})
+
+    loaded = await store.load_item("thr_1", "msg_0000", {})
+    loaded.content[0].text = "mutated"
+    assert (await store.load_item("thr_1", "msg_0000", {})).content[0].text == "hello"
+
+
+async def test_threads_paginate_after_cursor() -> None:
+    store = MemoryStore()
+    for index in range(5):
+        await store.save_thread(
+            ThreadMetadata(id=f"thr_{index}", created_at=_EPOCH + timedelta(minutes=index)), {}
+        )
+
+    first = await store.load_threads(2, None, "desc", {})
+    assert [thread.id for thread in first.data] == ["thr_4", "thr_3"]
+    assert first.has_more and first.after == "thr_3"
+
+    second = await store.load_threads(10, first.after, "desc", {})
+    assert [thread.id for thread in second.data] == ["thr_2", "thr_1", "thr_0"]
+    assert not second.has_more
+
+    await store.delete_thread("thr_2", {})
+    remaining = await store.load_threads(10, "thr_0", "asc", {})
+    assert [thread.id for thread in remaining.data] == ["thr_1", "thr_3", "thr_4"]
+
+
+async def test_deletes_keep_pagination_consistent_across_compaction() -> None:
+    store = MemoryStore()
+    for index in range(100):
+        await store.add_thread_item("thr_1", _message("thr_1", index), {})
+
+    for index in range(0, 100, 3):
+        await store.delete_thread_item("thr_1", f"msg_{index:04d}", {})
+    expected = [f"msg_{index:04d}" for index in range(100) if index % 3]
+    assert await _collect_ids(store, "thr_1", "asc", limit=7) == expected
+    assert await _collect_ids(store, "thr_1", "desc", limit=7) == expected[::-1]
+
+    for index in range(100):
+        if index % 3 and index < 90:
+            await store.delete_thread_item("thr_1", f"msg_{index:04d}", {})
+    await store.save_item("thr_1", _message("thr_1", 95, text="edited"), {})
+    remaining = [f"msg_{index:04d}" for index in range(90, 100) if index % 3]
+    assert await _collect_ids(store, "thr_1", "asc", limit=4) == remaining
+    assert (await store.load_item("thr_1", "msg_0095", {})).content[0].text == "edited"
+
+
+class _RecordingQueue:
+    def __init__(self) -> None:
+        self.jobs: list[TranscriptJob] = []
+
+    async def submit(self, job: TranscriptJob) -> None:
+        self.jobs.append(job)
+
+
+async def test_lookups_do_not_create_threads() -> None:
+    store = MemoryStore()
+    page = await store.load_thread_items("thr_missing", None, 10, "asc", {})
+    assert page.data == []
+    with pytest.raises(NotFoundError):
+        await store.load_item("thr_missing", "msg_0000", {})
+    assert store.snapshot()["threads"] == 0
+
+
+async def test_limits_evict_least_recent_threads_and_spill_transcripts() -> None:
+    queue = _RecordingQueue()
+    store = MemoryStore(max_threads=2, max_items_per_thread=3, max_bytes=0, idle_ttl=0)
+    store._transcript_queue = queue
+    context = {"user": SimpleNamespace(id=uuid.uuid4())}
+
+    for index in range(5):
+        await store.add_thread_item("thr_a", _message("thr_a", index), {})
+    assert await _collect_ids(store, "thr_a", "asc", limit=10) == ["msg_0002", "msg_0003", "msg_0004"]
+
+    await store.add_thread_item("thr_b", _message("thr_b", 0), context)
+    await store.add_thread_item("thr_c", _message("thr_c", 0), context)
+    await store.load_thread("thr_b", {})
+    await store.add_thread_item("thr_d", _message("thr_d", 0), {})
+
+    # thr_a was least recently used, then thr_c (thr_b was read after it).
+    with pytest.raises(NotFoundError):
+        await store.load_thread("thr_a", {})
+    with pytest.raises(NotFoundError):
+        await store.load_thread("thr_c", {})
+    snapshot = store.snapshot()
+    assert snapshot["threads"] == 2
+    assert snapshot["items"] == 2
+    assert snapshot["evicted_threads"] == 2
+    assert snapshot["evicted_items"] == 2 + 3 + 1
+    assert snapshot["bytes"] > 0
+    # Messages from thr_c were queued when written, so eviction had nothing to spill.
+    assert [job.thread_id for job in queue.jobs] == ["thr_b", "thr_c"]
+    assert snapshot["spilled_items"] == 0
+    assert "thr_c" not in store._persisted_item_states
+
+
+async def test_byte_limit_spills_unqueued_messages() -> None:
+    queue = _RecordingQueue()
+    store = MemoryStore(max_threads=0, max_items_per_thread=0, max_bytes=1, idle_ttl=0)
+    store._transcript_queue = queue
+    user = SimpleNamespace(id=uuid.uuid4())
+
+    await store.save_thread(ThreadMetadata(id="thr_a", created_at=_EPOCH), {"user": user})
+    await store.add_thread_item("thr_a", _message("thr_a", 0), {})
+    await store.add_thread_item("thr_b", _message("thr_b", 0), {})
+
+    assert store.snapshot()["threads"] == 1
+    assert [(job.thread_id, job.user_id) for job in queue.jobs] == [("thr_a", user.id)]
+    assert store.snapshot()["spilled_items"] == 1
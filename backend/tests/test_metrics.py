@@ -0,0 +1,62 @@
+"""Tests for the Prometheus metrics registry and middleware."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.metrics import (
+    LatencyHistogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+    http_request_duration_seconds,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_registry_renders_metrics_and_component_snapshots() -> None:
+    registry = MetricsRegistry()
+    calls = registry.counter("upstream_calls_total", "Calls.", ("upstream",))
+    calls.inc(upstream='st"ripe')
+    latency = registry.histogram("stage_seconds", "Stage time.", buckets=(0.1, 1))
+    latency.observe(0.5)
+    histogram = LatencyHistogram((1, 2))
+    histogram.observe(1.5)
+    registry.register_snapshot(
+        "queue",
+        lambda: {"depth": 3, "label": "ignored", "rejected": {"rate": 2}, "wait": histogram.snapshot()},
+        pool="openai",
+    )
+
+    text = registry.render()
+
+    assert '# TYPE upstream_calls_total counter\nupstream_calls_total{upstream="st\\"ripe"} 1\n' in text
+    assert 'stage_seconds_bucket{le="0.1"} 0\nstage_seconds_bucket{le="1"} 1\n' in text
+    assert 'stage_seconds_bucket{le="+Inf"} 1\nstage_seconds_sum 0.5\nstage_seconds_count 1\n' in text
+    assert 'queue_depth{pool="openai"} 3\n' in text
+    assert 'queue_rejected{pool="openai",key="rate"} 2\n' in text
+    assert '# TYPE queue_wait histogram\n' in text
+    assert 'queue_wait_bucket{pool="openai",le="2"} 1\n' in text
+    assert "queue_label" not in text
+    with pytest.raises(ValueError):
+        calls.inc(route="/x")
+
+
+async def test_middleware_labels_requests_by_route_template() -> None:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def _item(item_id: str) -> dict[str, str]:
+        return {"id": item_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/items/42")).status_code == 200
+        assert (await client.get("/nowhere")).status_code == 404
+
+    series = http_request_duration_seconds._series
+    assert series[(("method", "GET"), ("route", "/items/{item_id}"), ("status", "200"))].count >= 1
+    assert series[(("method", "GET"), ("route", "unmatched"), ("status", "404"))].count >= 1
@@ -0,0 +1,124 @@
+"""Tests for the durable ChatKit store (exercised against SQLite)."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from chatkit.store import NotFoundError
+from chatkit.types import AssistantMessageContent, AssistantMessageItem, ThreadMetadata
+from sqlalchemy import func, select
+
+from app.models import ChatKitThreadItem
+from app.postgres_store import PostgresStore
+
+pytestmark = pytest.mark.anyio
+
+_EPOCH = datetime(2025, 1, 1)
+
+
+def _message(thread_id: str, index: int, *, text: str = "hello") -> AssistantMessageItem:
+    return AssistantMessageItem(
+        id=f"msg_{index:04d}",
+        thread_id=thread_id,
+        created_at=_EPOCH + timedelta(seconds=index),
+        content=[AssistantMessageContent(text=text)],
+    )
+
+
+async def test_items_are_batched_and_paginated(session_factory) -> None:
+    store = PostgresStore(session_factory, batch_size=100, flush_interval=60)
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=_EPOCH), {})
+    for index in (2, 0, 1, 3):
+        await store.add_thread_item("thr_1", _message("thr_1", index), {})
+    await store.save_item("thr_1", _message("thr_1", 0, text="updated"), {})
+
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(ChatKitThreadItem)) == 0
+
+    assert (await store.load_item("thr_1", "msg_0000", {})).content[0].text == "updated"
+
+    first = await store.load_thread_items("thr_1", None, 3, "asc", {})
+    assert [item.id for item in first.data] == ["msg_0000", "msg_0001", "msg_0002"]
+    assert first.has_more and first.after == "msg_0002"
+
+    second = await store.load_thread_items("thr_1", first.after, 3, "asc", {})
+    assert [item.id for item in second.data] == ["msg_0003"]
+    assert not second.has_more
+
+    newest = await store.load_thread_items("thr_1", None, 2, "desc", {})
+    assert [item.id for item in newest.data] == ["msg_0003", "msg_0002"]
+
+    await store.delete_thread_item("thr_1", "msg_0003", {})
+    with pytest.raises(NotFoundError):
+        await store.load_item("thr_1", "msg_0003", {})
+
+
+async def test_threads_use_keyset_pagination(session_factory) -> None:
+    store = PostgresStore(session_factory, flush_interval=0)
+    for index in range(4):
+        await store.save_thread(
+            ThreadMetadata(id=f"thr_{index}", created_at=_EPOCH + timedelta(minutes=index)), {}
+        )
+
+    page = await store.load_threads(2, None, "desc", {})
+    assert [thread.id for thread in page.data] == ["thr_3", "thr_2"]
+
+    page = await store.load_threads(2, page.after, "desc", {})
+    assert [thread.id for thread in page.data] == ["thr_1", "thr_0"]
+    assert not page.has_more
+
+    await store.delete_thread("thr_1", {})
+    with pytest.raises(NotFoundError):
+        await store.load_thread("thr_1", {})
+
+
+async def test_items_are_only_visible_to_the_thread_owner(session_factory) -> None:
+    store = PostgresStore(session_factory, flush_interval=0)
+    owner = {"user": SimpleNamespace(id=uuid.uuid4())}
+    other = {"user": SimpleNamespace(id=uuid.uuid4())}
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=_EPOCH), owner)
+    await store.add_thread_item("thr_1", _message("thr_1", 0), owner)
+
+    assert (await store.load_thread_items("thr_1", None, 10, "asc", other)).data == []
+    with pytest.raises(NotFoundError):
+        await store.load_item("thr_1", "msg_0000", other)
+    await store.delete_thread_item("thr_1", "msg_0000", other)
+    await store.delete_thread("thr_1", other)
+
+    assert (await store.load_item("thr_1", "msg_0000", owner)).id == "msg_0000"
+    assert (await store.load_thread("thr_1", owner)).id == "thr_1"
+
+    await store.save_thread(ThreadMetadata(id="thr_1", title="hijacked", created_at=_EPOCH), other)
+    assert (await store.load_thread("thr_1", owner)).title is None
+
+
+async def test_items_stay_visible_and_deletable_while_a_flush_is_writing(session_factory) -> None:
+    store = PostgresStore(session_factory, batch_size=100, flush_interval=60)
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=_EPOCH), {})
+    await store.add_thread_item("thr_1", _message("thr_1", 0), {})
+
+    write_items = store._write_items
+    writing, release = asyncio.Event(), asyncio.Event()
+
+    async def _slow_write(batch) -> None:
+        writing.set()
+        await release.wait()
+        await write_items(batch)
+
+    store._write_items = _slow_write  # type: ignore[method-assign]
+    flush = asyncio.create_task(store.flush())
+    await writing.wait()
+
+    assert (await store.load_item("thr_1", "msg_0000", {})).id == "msg_0000"
+    delete = asyncio.create_task(store.delete_thread_item("thr_1", "msg_0000", {}))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(flush, delete)
+
+    with pytest.raises(NotFoundError):
+        await store.load_item("thr_1", "msg_0000", {})
+    assert (await store.load_thread_items("thr_1", None, 10, "asc", {})).data == []
@@ -0,0 +1,104 @@
+"""Tests for the local BM25 recall layer."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.chat import _workflow_run_request
+from app.recall import BM25Index, LocalRecall, RecallResult, tokenize
+
+pytestmark = pytest.mark.anyio
+
+
+def test_index_ranks_replaces_and_evicts() -> None:
+    index = BM25Index(max_documents=3)
+    index.add("a", "My sister Alice lives in Lisbon")
+    index.add("b", "I prefer green tea over coffee")
+    index.add("c", "Alice's birthday is in March")
+
+    hits = index.search("Where does Alice live? Lisbon?")
+    assert [hit.doc_id for hit in hits] == ["a", "c"]
+    assert 0 < hits[1].score < hits[0].score <= 1
+    assert [hit.doc_id for hit in index.search("alice", exclude={"a"})] == ["c"]
+
+    index.add("a", "My sister moved to Porto")
+    assert index.search("lisbon") == []
+    index.add("d", "Porto has great tea houses")
+    assert "b" not in index and len(index) == 3
+    assert tokenize("The user's cat_name is Mo, age 7") == ["user", "cat", "name", "mo", "age", "7"]
+
+
+async def test_search_warms_once_and_keeps_newer_writes() -> None:
+    user_id = uuid.uuid4()
+    loads: list[uuid.UUID] = []
+
+    async def _loader(loaded_user: uuid.UUID, limit: int) -> list[tuple[str, str]]:
+        loads.append(loaded_user)
+        await asyncio.sleep(0)
+        return [("old", "Favourite colour is blue"), ("new", "Favourite colour was blue")]
+
+    recall = LocalRecall(loader=_loader)
+    recall.add(user_id, "new", "Favourite colour is now orange", kind="fact")
+
+    first, second = await asyncio.gather(
+        recall.search(user_id, "favourite colour orange"), recall.search(user_id, "blue")
+    )
+
+    assert loads == [user_id]
+    assert first.confident and first.hits[0].doc_id == "new" and first.hits[0].kind == "fact"
+    assert [hit.doc_id for hit in second.hits] == ["old"]
+    assert not (await recall.search(user_id, "quantum physics")).confident
+    assert recall.snapshot()["local_hits"] == 2 and recall.snapshot()["documents"] == 2
+
+
+async def test_least_recently_used_users_are_dropped() -> None:
+    async def _empty(user_id: uuid.UUID, limit: int) -> list[tuple[str, str]]:
+        return []
+
+    recall = LocalRecall(max_users=2, loader=_empty)
+    users = [uuid.uuid4() for _ in range(3)]
+    for user_id in users:
+        recall.add(user_id, "m1", "remember the dentist appointment")
+
+    assert (await recall.search(users[0], "dentist")).hits == []
+    assert (await recall.search(users[2], "dentist")).confident
+    assert recall.snapshot()["evicted_users"] == 2
+
+
+async def test_failed_warm_ups_back_off() -> None:
+    user_id = uuid.uuid4()
+    attempts = 0
+
+    async def _failing(loaded_user: uuid.UUID, limit: int) -> list[tuple[str, str]]:
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("database unavailable")
+
+    recall = LocalRecall(loader=_failing, warm_retry_seconds=60)
+    recall.add(user_id, "m1", "remember the dentist appointment")
+    for _ in range(3):
+        assert (await recall.search(user_id, "dentist")).confident
+
+    assert attempts == 1 and recall.snapshot()["warm_failures"] == 1
+    recall.forget_user(user_id)
+    await recall.search(user_id, "dentist")
+    assert attempts == 2
+
+
+def test_workflow_input_reports_memory_source() -> None:
+    recall = RecallResult(BM25Index().search("nothing indexed"), confident=False)
+    request = _workflow_run_request(
+        workflow_id="wf_1",
+        workflow_version=None,
+        messages=[],
+        vector_store_id="vs_1",
+        user_id="user_1",
+        thread_id="thr_1",
+        recall=recall,
+    )
+
+    assert request["input"]["memory_source"] == "remote"
+    assert request["input"]["local_memories"] == []
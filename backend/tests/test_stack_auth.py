@@ -0,0 +1,62 @@
+"""Tests for the pooled Stack Auth client."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from app.stack_auth import StackAuthClient, StackAuthError
+
+pytestmark = pytest.mark.anyio
+
+
+def _client(handler) -> StackAuthClient:
+    client = StackAuthClient(
+        _base_url="https://stack.test",
+        _project_id="project",
+        _secret_key="secret",
+        _timeout=5,
+    )
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def test_verified_tokens_are_cached_on_the_shared_client() -> None:
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"id": "stack-user", "primary_email": "cached@example.com"})
+
+    client = _client(_handler)
+    first = await client.verify_tokens(access_token="access-a")
+    second = await client.verify_tokens(access_token="access-a", refresh_token="refresh")
+    await client.verify_tokens(access_token="access-a")
+    await client.verify_tokens(access_token="access-a", refresh_token="refresh")
+    await client.verify_tokens(access_token="access-b")
+
+    assert first.user.email == second.user.email == "cached@example.com"
+    assert [request.headers["X-Stack-Access-Token"] for request in requests] == [
+        "access-a",
+        "access-a",
+        "access-b",
+    ]
+    assert requests[1].headers["X-Stack-Refresh-Token"] == "refresh"
+    await client.aclose()
+
+
+async def test_rejected_tokens_are_not_cached() -> None:
+    calls = 0
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(401, text="expired")
+
+    client = _client(_handler)
+    for _ in range(2):
+        with pytest.raises(StackAuthError):
+            await client.verify_tokens(access_token="bad")
+
+    assert calls == 2
+    await client.aclose()
@@ -0,0 +1,27 @@
+"""Run the shared ChatKit store conformance checks against the backend stores."""
+
+from __future__ import annotations
+
+import pytest
+from chatkit_stores.conformance import CONFORMANCE_CHECKS, ConformanceCheck
+
+from app.memory_store import MemoryStore
+from app.postgres_store import PostgresStore
+
+pytestmark = pytest.mark.anyio
+
+_CHECK_IDS = [check.__name__ for check in CONFORMANCE_CHECKS]
+
+
+@pytest.mark.parametrize("check", CONFORMANCE_CHECKS, ids=_CHECK_IDS)
+async def test_memory_store_conforms(check: ConformanceCheck) -> None:
+    await check(MemoryStore())
+
+
+@pytest.mark.parametrize("check", CONFORMANCE_CHECKS, ids=_CHECK_IDS)
+async def test_postgres_store_conforms(check: ConformanceCheck, session_factory) -> None:
+    store = PostgresStore(session_factory, batch_size=16, flush_interval=60)
+    try:
+        await check(store)
+    finally:
+        await store.aclose()
@@ -0,0 +1,110 @@
+"""Tests for request tracing spans and OTLP export."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.tracing import BatchSpanExporter, Tracer, TracingMiddleware, file_sink
+
+pytestmark = pytest.mark.anyio
+
+
+def _spans(requests: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    return {
+        span["name"]: span
+        for request in requests
+        for resource in request["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    }
+
+
+def _attributes(span: dict[str, Any]) -> dict[str, Any]:
+    return {attr["key"]: next(iter(attr["value"].values())) for attr in span["attributes"]}
+
+
+async def test_trace_is_exported_when_root_ends_and_late_spans_keep_parent() -> None:
+    requests: list[dict[str, Any]] = []
+
+    async def _sink(request: dict[str, Any]) -> None:
+        requests.append(request)
+
+    exporter = BatchSpanExporter(_sink, service_name="test", interval=0)
+    tracer = Tracer(exporter)
+
+    with tracer.span("POST /chatkit") as root:
+        with tracer.span("chat.load_thread_messages"):
+            tracer.set_trace_attribute("chatkit.thread_id", "thr_1")
+            parent = tracer.current_span()
+        stream = tracer.start_span("workflow.stream")
+        assert tracer.current_span() is root
+        tracer.end_span(stream, error=RuntimeError("boom"))
+        with pytest.raises(ValueError):
+            with tracer.span("store.add_thread_item", attributes={"chatkit.item_type": "widget"}):
+                raise ValueError("bad item")
+    assert tracer.current_span() is None
+
+    # A background write that finishes after the request is exported on its own.
+    with tracer.span("transcript.record_chat_message", parent=parent):
+        pass
+    await exporter.aclose()
+
+    spans = _spans(requests)
+    assert len(spans) == 5
+    assert {span["traceId"] for span in spans.values()} == {root.trace_id}
+    assert "parentSpanId" not in spans["POST /chatkit"]
+    assert spans["transcript.record_chat_message"]["parentSpanId"] == parent.span_id
+    assert spans["workflow.stream"]["status"] == {"code": 2, "message": "RuntimeError: boom"}
+    assert spans["store.add_thread_item"]["status"]["code"] == 2
+    assert _attributes(spans["store.add_thread_item"])["chatkit.item_type"] == "widget"
+    for name in ("POST /chatkit", "workflow.stream", "transcript.record_chat_message"):
+        assert _attributes(spans[name])["chatkit.thread_id"] == "thr_1"
+    assert exporter.snapshot()["exported"] == 5
+
+
+async def test_disabled_tracer_is_a_no_op() -> None:
+    tracer = Tracer()
+    with tracer.span("anything") as span:
+        assert span is None
+        tracer.set_trace_attribute("chatkit.thread_id", "thr_1")
+    assert tracer.start_span("x") is None
+    assert tracer.snapshot() == {"enabled": False}
+
+
+async def test_middleware_names_spans_by_route_and_joins_traceparent(tmp_path) -> None:
+    path = tmp_path / "traces.jsonl"
+    exporter = BatchSpanExporter(file_sink(path), service_name="test", interval=0)
+    tracer = Tracer(exporter)
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    @app.get("/items/{item_id}")
+    async def _item(item_id: str) -> dict[str, str]:
+        with tracer.span("lookup"):
+            await asyncio.sleep(0)
+        return {"id": item_id}
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(
+            "/items/42", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+        )
+    assert response.status_code == 200
+    await exporter.aclose()
+
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = _spans(requests)
+    server = spans["GET /items/{item_id}"]
+    assert server["traceId"] == trace_id and server["parentSpanId"] == "00f067aa0ba902b7"
+    assert server["kind"] == 2
+    assert _attributes(server)["http.status_code"] == "200"
+    assert spans["lookup"]["parentSpanId"] == server["spanId"]
+    resource = requests[0]["resourceSpans"][0]["resource"]
+    assert resource["attributes"][0]["value"] == {"stringValue": "test"}
@@ -0,0 +1,116 @@
+"""Tests for monthly transcript partitions and their archives."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import transcript_partitions
+from app.transcript_partitions import (
+    PartitionMaintainer,
+    add_months,
+    archive_partitions,
+    create_month_partitions,
+    create_partition_sql,
+    ensure_partitions,
+    is_missing_partition_error,
+    month_start,
+    partition_month,
+    partition_name,
+    write_ndjson_gzip,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_partition_bounds_follow_utc_months() -> None:
+    late_evening = datetime(2025, 12, 31, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+
+    assert month_start(late_evening) == date(2026, 1, 1)
+    assert add_months(date(2025, 11, 1), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name(date(2026, 1, 1)) == "chat_transcript_messages_p202601"
+    assert partition_month("chat_transcript_messages_p202601") == date(2026, 1, 1)
+    assert partition_month("chat_transcript_messages_pkey") is None
+    assert create_partition_sql(date(2025, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS public.chat_transcript_messages_p202512 "
+        "PARTITION OF public.chat_transcript_messages "
+        "FOR VALUES FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')"
+    )
+
+
+async def test_partition_maintenance_skips_sqlite(db_engine: AsyncEngine, tmp_path) -> None:
+    async with db_engine.begin() as connection:
+        assert await ensure_partitions(connection, months_ahead=3) == []
+        assert await create_month_partitions(connection, [date(2024, 1, 1)]) == []
+    assert await archive_partitions(db_engine, retention_months=1, archive_dir=tmp_path) == []
+
+
+def test_missing_partition_errors_are_recognised() -> None:
+    class _PgError(Exception):
+        sqlstate = "23514"
+
+    missing = _PgError('no partition of relation "chat_transcript_messages" found for row')
+    assert is_missing_partition_error(IntegrityError("INSERT", {}, missing))
+    assert not is_missing_partition_error(IntegrityError("INSERT", {}, _PgError("check failed")))
+    assert not is_missing_partition_error(RuntimeError("no partition"))
+
+
+async def test_archive_files_are_written_atomically(tmp_path) -> None:
+    row_id = uuid.uuid4()
+    created = datetime(2025, 1, 5, 12, tzinfo=timezone.utc)
+
+    async def _batches():
+        yield [{"id": row_id, "message": "héllo", "created_at": created}]
+        yield [{"id": uuid.uuid4(), "message": "again", "created_at": created}]
+
+    path = tmp_path / "archive" / "chat_transcript_messages_p202501.ndjson.gz"
+    assert await write_ndjson_gzip(_batches(), path) == 2
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        rows = [json.loads(line) for line in handle]
+    assert rows[0] == {"id": str(row_id), "message": "héllo", "created_at": "2025-01-05T12:00:00+00:00"}
+
+    async def _failing():
+        yield [{"id": row_id}]
+        raise RuntimeError("connection lost")
+
+    broken = tmp_path / "archive" / "broken.ndjson.gz"
+    with pytest.raises(RuntimeError):
+        await write_ndjson_gzip(_failing(), broken)
+    assert sorted(item.name for item in path.parent.iterdir()) == [path.name]
+
+
+async def test_maintainer_counts_failures_and_keeps_checking(
+    db_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    outcomes = [RuntimeError("lock timeout"), ["chat_transcript_messages_p202601"]]
+    checked = asyncio.Event()
+
+    async def _ensure(connection, *, months_ahead: int) -> list[str]:
+        if not outcomes:
+            checked.set()
+            return []
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(transcript_partitions, "ensure_partitions", _ensure)
+    maintainer = PartitionMaintainer(db_engine, months_ahead=3, interval_seconds=1, retry_seconds=0)
+    maintainer._interval = maintainer._retry = 0
+
+    await maintainer.start()
+    assert maintainer.snapshot()["consecutive_failures"] == 1
+    await asyncio.wait_for(checked.wait(), 1)
+    await maintainer.aclose()
+
+    snapshot = maintainer.snapshot()
+    assert snapshot["runs"] >= 3 and snapshot["failures"] == 1 and snapshot["consecutive_failures"] == 0
+    assert snapshot["partitions_created"] == 1 and snapshot["last_success_timestamp"] > 0
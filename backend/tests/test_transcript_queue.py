@@ -0,0 +1,111 @@
+"""Tests for the write-behind transcript queue."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.transcript_queue import TranscriptJob, TranscriptWriteQueue
+
+pytestmark = pytest.mark.anyio
+
+_USER_ID = uuid.uuid4()
+
+
+def _job(item_id: str, message: str, user_id: uuid.UUID = _USER_ID) -> TranscriptJob:
+    return TranscriptJob(
+        user_id=user_id, thread_id="thr_1", item_id=item_id, role="user", message=message
+    )
+
+
+class _RecordingWriter:
+    def __init__(self, *, failures: int = 0) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.batches: list[list[str]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self._failures = failures
+
+    async def __call__(self, messages) -> None:
+        await self.release.wait()
+        if self._failures:
+            self._failures -= 1
+            raise RuntimeError("upload failed")
+        self.batches.append([entry.item_id for entry in messages])
+        self.calls.extend((entry.item_id, entry.message) for entry in messages)
+
+
+async def test_pending_submissions_are_coalesced_per_item() -> None:
+    writer = _RecordingWriter()
+    writer.release.clear()
+    queue = TranscriptWriteQueue([writer], workers=1, maxsize=10, max_attempts=1, backoff_seconds=0)
+
+    await queue.submit(_job("msg_a", "first"))
+    await asyncio.sleep(0)  # worker picks up msg_a and blocks in the writer
+    await queue.submit(_job("msg_b", "draft"))
+    await queue.submit(_job("msg_b", "final"))
+    await queue.submit(_job("msg_a", "edited"))
+    assert queue.depth() == 3
+    assert queue.lag_seconds() >= 0
+
+    writer.release.set()
+    await queue.drain(timeout=1)
+
+    assert writer.calls == [("msg_a", "first"), ("msg_b", "final"), ("msg_a", "edited")]
+    assert writer.batches == [["msg_a"], ["msg_b", "msg_a"]]
+    assert queue.snapshot()["coalesced"] == 1
+    assert queue.depth() == 0
+
+
+async def test_failed_writes_are_retried_with_backoff() -> None:
+    writer = _RecordingWriter(failures=2)
+    queue = TranscriptWriteQueue([writer], workers=2, maxsize=10, max_attempts=3, backoff_seconds=0)
+
+    await queue.submit(_job("msg_a", "hello"))
+    await queue.drain(timeout=1)
+
+    assert writer.calls == [("msg_a", "hello")]
+    stats = queue.snapshot()
+    assert stats["retried"] == 2
+    assert stats["written"] == 1
+    assert stats["failed"] == 0
+
+    with pytest.raises(RuntimeError):
+        await queue.submit(_job("msg_b", "late"))
+
+
+async def test_retries_repeat_only_the_failed_writer() -> None:
+    upload = _RecordingWriter()
+    save = _RecordingWriter(failures=1)
+    queue = TranscriptWriteQueue(
+        [upload, save], workers=1, maxsize=10, max_attempts=2, backoff_seconds=0
+    )
+
+    await queue.submit(_job("msg_a", "hello"))
+    await queue.drain(timeout=1)
+
+    assert upload.calls == [("msg_a", "hello")]
+    assert save.calls == [("msg_a", "hello")]
+    assert queue.snapshot()["retried"] == 1
+    assert queue.snapshot()["written"] == 1
+
+
+async def test_waiting_jobs_are_written_in_one_batch_per_user() -> None:
+    writer = _RecordingWriter()
+    writer.release.clear()
+    queue = TranscriptWriteQueue([writer], workers=1, batch_size=3, max_attempts=1, backoff_seconds=0)
+    other_user = uuid.uuid4()
+
+    await queue.submit(_job("msg_0", "busy"))
+    await asyncio.sleep(0)  # the worker blocks on msg_0 while the rest queue up
+    for index in range(1, 5):
+        await queue.submit(_job(f"msg_{index}", "hi", other_user if index == 2 else _USER_ID))
+
+    writer.release.set()
+    await queue.drain(timeout=1)
+
+    assert sorted(map(sorted, writer.batches)) == [["msg_0"], ["msg_1", "msg_3"], ["msg_2"], ["msg_4"]]
+    assert queue.snapshot()["batches"] == 4
+    assert queue.snapshot()["written"] == 5
@@ -0,0 +1,164 @@
+"""Tests for the paginated, streaming and search transcript endpoints."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import get_session
+from app.dependencies import get_current_user
+from app.main import app
+from app.models import ChatTranscriptMessage, User
+from app.routes.transcripts import _postgres_search, stream_transcript_ndjson
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def seeded_user(session_factory: async_sessionmaker[AsyncSession]) -> User:
+    started = datetime(2025, 11, 1, 12, 0, 0)
+    async with session_factory() as session:
+        user = User(email="history@example.com")
+        other = User(email="other@example.com")
+        session.add_all([user, other])
+        await session.flush()
+        session.add_all(
+            ChatTranscriptMessage(
+                user_id=user.id,
+                thread_id="thr_a" if index % 2 else "thr_b",
+                item_id=f"msg_{index}",
+                role="user",
+                message=f"message {index}",
+                # Pairs share a timestamp so the id tiebreaker is exercised.
+                created_at=started + timedelta(seconds=index // 2),
+            )
+            for index in range(7)
+        )
+        session.add(
+            ChatTranscriptMessage(
+                user_id=other.id, thread_id="thr_a", item_id="msg_other", role="user", message="x"
+            )
+        )
+        await session.commit()
+    return user
+
+
+@pytest.fixture
+async def client(
+    session_factory: async_sessionmaker[AsyncSession], seeded_user: User
+) -> AsyncIterator[httpx.AsyncClient]:
+    async def _session() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = _session
+    app.dependency_overrides[get_current_user] = lambda: seeded_user
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            yield http
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+async def _walk(client: httpx.AsyncClient, **params: str | int) -> list[str]:
+    seen: list[str] = []
+    after: str | None = None
+    while True:
+        query = {**params, **({"after": after} if after else {})}
+        response = await client.get("/api/chatkit/transcript", params=query)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["item_id"] for item in page["data"])
+        if not page["has_more"]:
+            assert page["after"] is None
+            return seen
+        after = page["after"]
+
+
+async def test_pages_cover_every_row_once_in_both_orders(client: httpx.AsyncClient) -> None:
+    newest_first = await _walk(client, limit=2)
+    oldest_first = await _walk(client, limit=3, order="asc")
+
+    assert len(newest_first) == 7 and sorted(newest_first) == sorted(oldest_first)
+    assert newest_first == list(reversed(oldest_first))
+    assert "msg_other" not in newest_first
+    assert await _walk(client, limit=2, thread_id="thr_a") == ["msg_5", "msg_3", "msg_1"]
+
+
+async def test_invalid_cursor_is_rejected(client: httpx.AsyncClient) -> None:
+    response = await client.get("/api/chatkit/transcript", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_export_streams_ndjson_oldest_first(
+    session_factory: async_sessionmaker[AsyncSession], seeded_user: User
+) -> None:
+    chunks = [
+        chunk
+        async for chunk in stream_transcript_ndjson(session_factory, seeded_user.id, batch_size=3)
+    ]
+
+    rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert len(chunks) == 3
+    assert [row["item_id"] for row in rows][:2] in (["msg_0", "msg_1"], ["msg_1", "msg_0"])
+    assert len(rows) == 7 and {row["role"] for row in rows} == {"user"}
+
+
+async def test_search_ranks_and_escapes_snippets(
+    session_factory: async_sessionmaker[AsyncSession],
+    seeded_user: User,
+    client: httpx.AsyncClient,
+) -> None:
+    async with session_factory() as session:
+        session.add_all(
+            [
+                ChatTranscriptMessage(
+                    user_id=seeded_user.id,
+                    thread_id="thr_c",
+                    item_id="msg_garden",
+                    role="user",
+                    message="My <b>garden</b> has tomatoes and more tomatoes.",
+                ),
+                ChatTranscriptMessage(
+                    user_id=seeded_user.id,
+                    thread_id="thr_c",
+                    item_id="msg_soup",
+                    role="assistant",
+                    message="A long recipe: " + "stir gently " * 20 + "then add tomatoes.",
+                ),
+            ]
+        )
+        await session.commit()
+
+    response = await client.get("/api/chatkit/transcript/search", params={"q": "Tomatoes"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [hit["item_id"] for hit in results] == ["msg_garden", "msg_soup"]
+    assert "&lt;b&gt;garden&lt;/b&gt;" in results[0]["snippet"]
+    assert results[0]["snippet"].count("<mark>tomatoes</mark>") == 2
+    assert results[1]["snippet"].startswith("… ")
+
+    empty = await client.get("/api/chatkit/transcript/search", params={"q": "  "})
+    assert empty.status_code == 400
+
+
+def test_postgres_search_uses_the_indexed_tsvector() -> None:
+    sql = str(
+        _postgres_search(uuid.uuid4(), '"exact phrase" -other', "thr_a", 5).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert "chat_transcript_messages.message_tsv @@ websearch_to_tsquery" in sql
+    assert "ts_rank_cd" in sql and "ts_headline" in sql
+    # Headlines are computed over the limited subquery only.
+    subquery = sql[sql.index("FROM (") : sql.index("LIMIT")]
+    assert "ts_headline" not in subquery and "ts_rank_cd" in subquery
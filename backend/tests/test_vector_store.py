@@ -0,0 +1,177 @@
+"""Tests for vector store helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import vector_store
+from app.models import ChatTranscriptMessage, User, UserVectorStore
+from app.vector_store import _pack_facts
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_chat_messages_are_uploaded_once_per_user(
+    session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    uploads: list[tuple[str, list[str]]] = []
+
+    async def _upload(vector_store_id: str, contents: list[str]) -> None:
+        uploads.append((vector_store_id, [json.loads(content)["item_id"] for content in contents]))
+
+    async def _resolve(user_id) -> str:
+        return f"vs_{user_id}"
+
+    async with session_factory() as session:
+        alice, bob = User(email="alice@example.com"), User(email="bob@example.com")
+        session.add_all([alice, bob])
+        await session.commit()
+        alice_id, bob_id = alice.id, bob.id
+
+    monkeypatch.setattr(vector_store, "_upload_facts", _upload)
+    monkeypatch.setattr(vector_store, "_resolve_user_vector_store", _resolve)
+    monkeypatch.setattr(vector_store, "SessionLocal", session_factory)
+    monkeypatch.setattr(vector_store.settings, "vector_store_batch_max_facts", 2)
+    await vector_store.record_chat_messages(
+        [
+            vector_store.ChatMessage(alice_id, "thr_a", "msg_1", "user", "one"),
+            vector_store.ChatMessage(bob_id, "thr_b", "msg_2", "user", "two"),
+            vector_store.ChatMessage(alice_id, "thr_a", "msg_3", "assistant", "three"),
+            vector_store.ChatMessage(alice_id, "thr_a", "msg_4", "user", "four"),
+        ]
+    )
+
+    assert sorted(uploads) == sorted(
+        [
+            (f"vs_{alice_id}", ["msg_1", "msg_3"]),
+            (f"vs_{alice_id}", ["msg_4"]),
+            (f"vs_{bob_id}", ["msg_2"]),
+        ]
+    )
+    async with session_factory() as session:
+        stored = (await session.scalars(select(ChatTranscriptMessage.item_id))).all()
+    assert sorted(stored) == ["msg_1", "msg_2", "msg_3", "msg_4"]
+    assert _pack_facts(['{"fact": 1}', '{"fact": 3}']) == b'[\n{"fact": 1},\n{"fact": 3}\n]\n'
+
+
+async def test_concurrent_first_requests_create_one_vector_store(
+    session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    created: list[str] = []
+
+    async def _create(name: str) -> str:
+        await asyncio.sleep(0.01)
+        created.append(name)
+        return f"vs_{len(created)}"
+
+    monkeypatch.setattr(vector_store, "_create_vector_store", _create)
+
+    async with session_factory() as session:
+        user = User(email="cache@example.com")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    async def _lookup() -> str:
+        async with session_factory() as session:
+            return await vector_store.get_or_create_user_vector_store(session, user_id)
+
+    results = await asyncio.gather(*(_lookup() for _ in range(5)))
+
+    assert results == ["vs_1"] * 5
+    assert len(created) == 1
+    async with session_factory() as session:
+        record = await session.get(UserVectorStore, user_id)
+        assert record is not None and record.vector_store_id == "vs_1"
+    assert await vector_store.get_user_vector_store_id(user_id) == "vs_1"
+
+
+async def test_transcript_rows_are_upserted_by_item_and_created_at(session_factory) -> None:
+    async with session_factory() as session:
+        user = User(email="transcript@example.com")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    started = datetime(2025, 11, 30, 23, 59, 58, tzinfo=timezone.utc)
+    rows = [
+        vector_store.TranscriptRow(
+            user_id, "thr_1", f"msg_{index}", "user", f"text {index}", started + timedelta(seconds=index)
+        )
+        for index in range(5)
+    ]
+    async with session_factory() as session:
+        assert await vector_store.upsert_transcript_messages(session, rows, batch_size=2) == 5
+
+    edited = rows[3]._replace(role="assistant", message="first edit")
+    again = edited._replace(message="second edit")
+    async with session_factory() as session:
+        assert await vector_store.upsert_transcript_messages(session, [edited, again]) == 1
+
+    async with session_factory() as session:
+        stored = {
+            row.item_id: row
+            for row in (await session.scalars(select(ChatTranscriptMessage))).all()
+        }
+    assert len(stored) == 5 and len({row.id for row in stored.values()}) == 5
+    assert (stored["msg_3"].role, stored["msg_3"].message) == ("assistant", "second edit")
+    assert stored["msg_3"].created_at.replace(tzinfo=timezone.utc) == rows[3].created_at
+    assert stored["msg_4"].message == "text 4"
+
+
+class _CheckViolation(Exception):
+    sqlstate = "23514"
+
+
+async def test_rows_for_a_month_without_partition_create_it_and_are_written(
+    session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async with session_factory() as session:
+        user = User(email="late@example.com")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    insert_batches = vector_store._insert_transcript_batches
+    created_for: list[list[datetime]] = []
+    attempts = 0
+
+    async def _insert(session, pending, batch_size) -> None:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            orig = _CheckViolation('no partition of relation "chat_transcript_messages" found for row')
+            raise IntegrityError("INSERT", {}, orig)
+        await insert_batches(session, pending, batch_size)
+
+    async def _create(connection, months) -> list[str]:
+        created_for.append(list(months))
+        return ["chat_transcript_messages_p202401"]
+
+    monkeypatch.setattr(vector_store, "_insert_transcript_batches", _insert)
+    monkeypatch.setattr(vector_store, "create_month_partitions", _create)
+
+    legacy = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    row = vector_store.TranscriptRow(user_id, "thr_1", "msg_old", "user", "from 2024", legacy)
+    async with session_factory() as session:
+        assert await vector_store.upsert_transcript_messages(session, [row]) == 1
+
+    assert attempts == 2 and created_for == [[legacy]]
+    async with session_factory() as session:
+        stored = (await session.scalars(select(ChatTranscriptMessage))).one()
+    assert stored.message == "from 2024"
+
+    async def _reject(session, pending, batch_size) -> None:
+        raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    monkeypatch.setattr(vector_store, "_insert_transcript_batches", _reject)
+    async with session_factory() as session:
+        with pytest.raises(IntegrityError):
+            await vector_store.upsert_transcript_messages(session, [row])
+    assert len(created_for) == 1
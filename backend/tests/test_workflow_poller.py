@@ -0,0 +1,79 @@
+"""Tests for the shared workflow run poller."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.metrics import LatencyHistogram
+from app.workflow_poller import WorkflowRunPoller
+
+pytestmark = pytest.mark.anyio
+
+
+class _FakeRuns:
+    def __init__(self, polls_until_done: dict[str, int]) -> None:
+        self.remaining = dict(polls_until_done)
+        self.calls: list[str] = []
+
+    async def retrieve(self, *, workflow_id: str, run_id: str):
+        self.calls.append(run_id)
+        self.remaining[run_id] -= 1
+        status = "completed" if self.remaining[run_id] <= 0 else "in_progress"
+        return SimpleNamespace(id=run_id, status=status)
+
+
+def _queued(run_id: str) -> SimpleNamespace:
+    return SimpleNamespace(id=run_id, status="queued")
+
+
+async def test_concurrent_runs_share_one_poller_with_backoff() -> None:
+    runs = _FakeRuns({"run_a": 1, "run_b": 3})
+    poller = WorkflowRunPoller(min_interval=0.01, max_interval=0.05, backoff=2, concurrency=4)
+
+    done_a, done_b = await asyncio.gather(
+        poller.wait(runs, _queued("run_a"), workflow_id="wf"),
+        poller.wait(runs, _queued("run_b"), workflow_id="wf"),
+    )
+
+    assert done_a.status == done_b.status == "completed"
+    assert runs.calls.count("run_a") == 1
+    assert runs.calls.count("run_b") == 3
+    snapshot = poller.snapshot()
+    assert snapshot["pending"] == 0
+    assert snapshot["completed"] == 2
+    assert snapshot["polls"] == 4
+    assert snapshot["run_seconds"]["count"] == 2
+    assert snapshot["expected_run_seconds"] > 0
+
+
+async def test_finished_runs_return_without_polling() -> None:
+    runs = _FakeRuns({})
+    poller = WorkflowRunPoller(min_interval=0.01, max_interval=0.05)
+
+    run = SimpleNamespace(id="run_a", status="completed")
+    assert await poller.wait(runs, run, workflow_id="wf") is run
+    assert runs.calls == []
+
+
+async def test_repeated_status_errors_fail_the_waiter() -> None:
+    class _BrokenRuns:
+        async def retrieve(self, *, workflow_id: str, run_id: str):
+            raise RuntimeError("unavailable")
+
+    poller = WorkflowRunPoller(min_interval=0.001, max_interval=0.002, max_errors=2)
+    with pytest.raises(RuntimeError):
+        await poller.wait(_BrokenRuns(), _queued("run_a"), workflow_id="wf")
+    assert poller.snapshot()["failed"] == 1
+
+
+def test_latency_histogram_quantiles() -> None:
+    histogram = LatencyHistogram((1, 2, 5))
+    for value in (0.5, 1.5, 1.8, 4, 10):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.snapshot()["buckets"] == {"1": 1, "2": 3, "5": 4, "+Inf": 5}
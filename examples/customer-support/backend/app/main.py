@@ -13,6 +13,7 @@ from chatkit.types import (
     ThreadStreamEvent,
     UserMessageItem,
 )
+from chatkit_stores import store_from_env
 from fastapi import Depends, FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response, StreamingResponse
@@ -20,7 +21,6 @@ from openai.types.responses import ResponseInputContentParam
 from starlette.responses import JSONResponse
 
 from .airline_state import AirlineStateManager, CustomerProfile
-from .memory_store import MemoryStore
 from .support_agent import state_manager, support_agent
 
 DEFAULT_THREAD_ID = "demo_default_thread"
@@ -69,7 +69,7 @@ class CustomerSupportServer(ChatKitServer[dict[str, Any]]):
         self,
         agent_state: AirlineStateManager,
     ) -> None:
-        store = MemoryStore()
+        store = store_from_env()
         super().__init__(store)
         self.store = store
         self.agent_state = agent_state
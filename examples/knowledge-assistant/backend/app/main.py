@@ -21,6 +21,7 @@ from chatkit.types import (
     ThreadStreamEvent,
     UserMessageItem,
 )
+from chatkit_stores import store_from_env
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, Response, StreamingResponse
@@ -37,7 +38,6 @@ from .documents import (
     DocumentMetadata,
     as_dicts,
 )
-from .memory_store import MemoryStore
 
 
 def _normalise_filename(value: str) -> str:
@@ -115,7 +115,7 @@ def _is_tool_completion_item(item: Any) -> bool:
 
 class KnowledgeAssistantServer(ChatKitServer[dict[str, Any]]):
     def __init__(self, agent: Agent[AgentContext]) -> None:
-        self.store = MemoryStore()
+        self.store = store_from_env()
         super().__init__(self.store)
         self.assistant = agent
 
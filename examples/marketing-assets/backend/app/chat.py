@@ -16,6 +16,7 @@ from chatkit.agents import (
     stream_agent_response,
 )
 from chatkit.server import ChatKitServer
+from chatkit.store import Store
 from chatkit.types import (
     AssistantMessageItem,
     Attachment,
@@ -30,13 +31,13 @@ from chatkit.types import (
 from chatkit.widgets import Card
 from chatkit.widgets import Image as WidgetImage
 from chatkit.widgets import Text as WidgetText
+from chatkit_stores import store_from_env
 from openai import AsyncOpenAI
 from openai.types.responses import ResponseInputContentParam
 from pydantic import ConfigDict, Field
 
 from .ad_assets import AdAsset, ad_asset_store
 from .constants import INSTRUCTIONS, MODEL
-from .memory_store import MemoryStore
 
 SUPPORTED_COLOR_SCHEMES: Final[frozenset[str]] = frozenset({"light", "dark"})
 CLIENT_THEME_TOOL_NAME: Final[str] = "switch_theme"
@@ -61,7 +62,7 @@ def _gen_id(prefix: str) -> str:
 
 class AdAgentContext(AgentContext):
     model_config = ConfigDict(arbitrary_types_allowed=True)
-    store: Annotated[MemoryStore, Field(exclude=True)]
+    store: Annotated[Store[dict[str, Any]], Field(exclude=True)]
     request_context: dict[str, Any]
 
 
@@ -309,7 +310,7 @@ class AdCreativeServer(ChatKitServer[dict[str, Any]]):
     """ChatKit server wired up with the ad generation workflow."""
 
     def __init__(self) -> None:
-        self.store: MemoryStore = MemoryStore()
+        self.store: Store[dict[str, Any]] = store_from_env()
         super().__init__(self.store)
         tools = [save_ad_asset, switch_theme, generate_ad_image]
         self.assistant = Agent[AdAgentContext](
@@ -0,0 +1,22 @@
+"""ChatKit store backends shared by the Microgen backend and example apps."""
+
+from .backends import (
+    StoreFactory,
+    available_backends,
+    create_store,
+    register_backend,
+    store_from_env,
+)
+from .index import OrderedIndex
+from .memory import MemoryStore, MemoryStoreStats
+
+__all__ = [
+    "MemoryStore",
+    "MemoryStoreStats",
+    "OrderedIndex",
+    "StoreFactory",
+    "available_backends",
+    "create_store",
+    "register_backend",
+    "store_from_env",
+]
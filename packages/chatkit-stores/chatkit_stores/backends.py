@@ -0,0 +1,67 @@
+"""Registry of named ChatKit store backends."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, Mapping
+
+from chatkit.store import Store
+
+from .memory import MemoryStore
+
+StoreFactory = Callable[..., Store[Any]]
+
+
+def _sqlite_store(**options: Any) -> Store[Any]:
+    # Imported lazily: aiosqlite is only installed with the ``sqlite`` extra.
+    from .sqlite import SQLiteStore
+
+    return SQLiteStore(**options)
+
+
+_BACKENDS: Dict[str, StoreFactory] = {"memory": MemoryStore, "sqlite": _sqlite_store}
+
+
+def register_backend(name: str, factory: StoreFactory) -> None:
+    """Make ``factory`` available to ``create_store`` under ``name``."""
+
+    _BACKENDS[name.strip().lower()] = factory
+
+
+def available_backends() -> list[str]:
+    return sorted(_BACKENDS)
+
+
+def create_store(name: str, **options: Any) -> Store[Any]:
+    """Instantiate the backend registered as ``name`` with ``options``."""
+
+    try:
+        factory = _BACKENDS[name.strip().lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown ChatKit store backend {name!r}; expected one of {available_backends()}"
+        ) from None
+    return factory(**options)
+
+
+def store_from_env(environ: Mapping[str, str] = os.environ) -> Store[Any]:
+    """Create the store named by ``CHATKIT_STORE_BACKEND`` (default ``memory``).
+
+    ``CHATKIT_STORE_PATH`` is passed as ``path`` for file-backed backends such
+    as ``sqlite``.
+    """
+
+    options: dict[str, Any] = {}
+    path = environ.get("CHATKIT_STORE_PATH")
+    if path:
+        options["path"] = path
+    return create_store(environ.get("CHATKIT_STORE_BACKEND", "memory"), **options)
+
+
+__all__ = [
+    "StoreFactory",
+    "available_backends",
+    "create_store",
+    "register_backend",
+    "store_from_env",
+]
@@ -0,0 +1,150 @@
+"""Common throughput benchmark for ChatKit store backends.
+
+Run ``python -m chatkit_stores.benchmark --backend memory --backend sqlite``
+to compare registered backends; ``--threads`` and ``--items-per-thread``
+scale the dataset (e.g. ``--threads 200 --items-per-thread 5000`` for 1M
+items). File-backed backends write to a temporary directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from chatkit.store import Store
+from chatkit.types import AssistantMessageItem, ThreadMetadata
+
+from .backends import available_backends, create_store
+from .conformance import EPOCH, message
+
+
+@dataclass(slots=True)
+class BenchmarkConfig:
+    threads: int = 20
+    items_per_thread: int = 500
+    updates: int = 2_000
+    page_size: int = 50
+    pages: int = 2_000
+    deletes: int = 1_000
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    rates: dict[str, float] = field(default_factory=dict)
+    page_latency_us: dict[str, float] = field(default_factory=dict)
+
+
+# Backends that persist to ``path``; the benchmark points them at a temporary file.
+_FILE_BACKENDS = frozenset({"sqlite"})
+
+
+def _item(thread_id: str, index: int) -> AssistantMessageItem:
+    # ChatKit item ids are globally unique, and durable backends key items by id alone.
+    item = message(thread_id, index)
+    item.id = f"{thread_id}_{item.id}"
+    return item
+
+
+async def _timed(operations: int, action: Callable[[], Awaitable[None]]) -> float:
+    started = time.perf_counter()
+    await action()
+    return operations / (time.perf_counter() - started)
+
+
+async def run_benchmark(store: Store[Any], config: BenchmarkConfig) -> BenchmarkResult:
+    """Measure operations per second for each phase of a chat-shaped workload."""
+
+    thread_ids = [f"thr_{index:04d}" for index in range(config.threads)]
+    for thread_id in thread_ids:
+        await store.save_thread(ThreadMetadata(id=thread_id, created_at=EPOCH), {})
+
+    async def _writes() -> None:
+        for index in range(config.items_per_thread):
+            for thread_id in thread_ids:
+                await store.add_thread_item(thread_id, _item(thread_id, index), {})
+
+    async def _updates() -> None:
+        streamed = _item(thread_ids[0], config.items_per_thread - 1)
+        for index in range(config.updates):
+            streamed.content[0].text = f"token {index}"
+            await store.save_item(thread_ids[0], streamed, {})
+
+    latencies: list[float] = []
+
+    async def _pages() -> None:
+        for index in range(config.pages):
+            thread_id = thread_ids[index % len(thread_ids)]
+            started = time.perf_counter()
+            page = await store.load_thread_items(thread_id, None, config.page_size, "desc", {})
+            latencies.append(time.perf_counter() - started)
+            await store.load_item(thread_id, page.data[0].id, {})
+
+    async def _deletes() -> None:
+        for index in range(config.deletes):
+            thread_id = thread_ids[index % len(thread_ids)]
+            victim = _item(thread_id, index // len(thread_ids))
+            await store.delete_thread_item(thread_id, victim.id, {})
+
+    result = BenchmarkResult()
+    try:
+        result.rates["add_thread_item"] = await _timed(
+            config.threads * config.items_per_thread, _writes
+        )
+        result.rates["save_item"] = await _timed(config.updates, _updates)
+        result.rates["load_thread_items+load_item"] = await _timed(config.pages, _pages)
+        result.rates["delete_thread_item"] = await _timed(config.deletes, _deletes)
+    finally:
+        close = getattr(store, "aclose", None)
+        if close is not None:
+            await close()
+    cut_points = statistics.quantiles(latencies, n=100)
+    result.page_latency_us = {"p50": cut_points[49] * 1e6, "p99": cut_points[98] * 1e6}
+    return result
+
+
+async def _main(backends: list[str], config: BenchmarkConfig) -> None:
+    print(
+        f"{config.threads} threads x {config.items_per_thread} items, "
+        f"{config.updates} updates, {config.pages} pages of {config.page_size}, "
+        f"{config.deletes} deletes"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for name in backends:
+            options = (
+                {"path": os.path.join(directory, f"{name}.db")} if name in _FILE_BACKENDS else {}
+            )
+            result = await run_benchmark(create_store(name, **options), config)
+            print(name)
+            for phase, rate in result.rates.items():
+                print(f"  {phase:<28} {rate:12.0f} ops/s")
+            print(
+                f"  {'load_thread_items latency':<28} "
+                f"p50 {result.page_latency_us['p50']:.0f} us, "
+                f"p99 {result.page_latency_us['p99']:.0f} us"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=available_backends(),
+        help="registered backend to benchmark (default: memory)",
+    )
+    defaults = BenchmarkConfig()
+    parser.add_argument("--threads", type=int, default=defaults.threads)
+    parser.add_argument("--items-per-thread", type=int, default=defaults.items_per_thread)
+    args = parser.parse_args()
+    config = BenchmarkConfig(threads=args.threads, items_per_thread=args.items_per_thread)
+    asyncio.run(_main(args.backend or ["memory"], config))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Behavioural checks every ChatKit store backend must pass.
+
+Each check receives a fresh, empty store. ``run_conformance`` runs them all
+against a factory so backend test suites can share one definition of the
+expected semantics::
+
+    await run_conformance(lambda: MyStore(...))
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from chatkit.store import NotFoundError, Store
+from chatkit.types import AssistantMessageContent, AssistantMessageItem, ThreadMetadata
+
+ConformanceCheck = Callable[[Store[Any]], Awaitable[None]]
+
+EPOCH = datetime(2025, 1, 1)
+
+
+def message(thread_id: str, index: int, *, text: str = "hello") -> AssistantMessageItem:
+    return AssistantMessageItem(
+        id=f"msg_{index:04d}",
+        thread_id=thread_id,
+        created_at=EPOCH + timedelta(seconds=index),
+        content=[AssistantMessageContent(text=text)],
+    )
+
+
+async def _item_ids(store: Store[Any], thread_id: str, order: str, limit: int) -> list[str]:
+    ids: list[str] = []
+    after: str | None = None
+    while True:
+        page = await store.load_thread_items(thread_id, after, limit, order, {})
+        ids.extend(item.id for item in page.data)
+        if not page.has_more:
+            return ids
+        assert page.after == page.data[-1].id
+        after = page.after
+
+
+async def check_thread_round_trip(store: Store[Any]) -> None:
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH, title="first"), {})
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH, title="renamed"), {})
+    assert (await store.load_thread("thr_1", {})).title == "renamed"
+
+
+async def check_thread_pagination(store: Store[Any]) -> None:
+    for index in range(5):
+        await store.save_thread(
+            ThreadMetadata(id=f"thr_{index}", created_at=EPOCH + timedelta(minutes=index)), {}
+        )
+
+    first = await store.load_threads(2, None, "desc", {})
+    assert [thread.id for thread in first.data] == ["thr_4", "thr_3"]
+    assert first.has_more and first.after == "thr_3"
+    rest = await store.load_threads(10, first.after, "desc", {})
+    assert [thread.id for thread in rest.data] == ["thr_2", "thr_1", "thr_0"]
+    assert not rest.has_more and rest.after is None
+
+
+async def check_item_pagination(store: Store[Any]) -> None:
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH), {})
+    for index in (3, 0, 4, 1, 2):
+        await store.add_thread_item("thr_1", message("thr_1", index), {})
+
+    expected = [f"msg_{index:04d}" for index in range(5)]
+    assert await _item_ids(store, "thr_1", "asc", limit=2) == expected
+    assert await _item_ids(store, "thr_1", "desc", limit=2) == expected[::-1]
+
+
+async def check_save_item_replaces(store: Store[Any]) -> None:
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH), {})
+    await store.add_thread_item("thr_1", message("thr_1", 0), {})
+    await store.add_thread_item("thr_1", message("thr_1", 1), {})
+    written = message("thr_1", 0, text="updated")
+    await store.save_item("thr_1", written, {})
+    written.content[0].text = "changed after save"
+
+    loaded = await store.load_item("thr_1", "msg_0000", {})
+    assert isinstance(loaded, AssistantMessageItem)
+    assert loaded.content[0].text == "updated"
+    assert await _item_ids(store, "thr_1", "asc", limit=10) == ["msg_0000", "msg_0001"]
+
+
+async def check_delete_item(store: Store[Any]) -> None:
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH), {})
+    for index in range(40):
+        await store.add_thread_item("thr_1", message("thr_1", index), {})
+    for index in range(0, 40, 2):
+        await store.delete_thread_item("thr_1", f"msg_{index:04d}", {})
+
+    try:
+        await store.load_item("thr_1", "msg_0000", {})
+    except NotFoundError:
+        pass
+    else:
+        raise AssertionError("deleted item is still readable")
+    expected = [f"msg_{index:04d}" for index in range(1, 40, 2)]
+    assert await _item_ids(store, "thr_1", "asc", limit=3) == expected
+
+
+async def check_delete_thread(store: Store[Any]) -> None:
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH), {})
+    await store.add_thread_item("thr_1", message("thr_1", 0), {})
+    await store.delete_thread("thr_1", {})
+
+    try:
+        await store.load_thread("thr_1", {})
+    except NotFoundError:
+        pass
+    else:
+        raise AssertionError("deleted thread is still readable")
+    assert (await store.load_threads(10, None, "asc", {})).data == []
+
+
+async def check_missing_lookups(store: Store[Any]) -> None:
+    try:
+        await store.load_item("thr_missing", "msg_0000", {})
+    except NotFoundError:
+        pass
+    else:
+        raise AssertionError("missing item did not raise NotFoundError")
+    page = await store.load_thread_items("thr_missing", None, 10, "asc", {})
+    assert page.data == [] and not page.has_more
+
+
+CONFORMANCE_CHECKS: tuple[ConformanceCheck, ...] = (
+    check_thread_round_trip,
+    check_thread_pagination,
+    check_item_pagination,
+    check_save_item_replaces,
+    check_delete_item,
+    check_delete_thread,
+    check_missing_lookups,
+)
+
+
+async def run_conformance(factory: Callable[[], Store[Any] | Awaitable[Store[Any]]]) -> None:
+    """Run every check against a fresh store from ``factory``."""
+
+    for check in CONFORMANCE_CHECKS:
+        store = factory()
+        if not isinstance(store, Store):
+            store = await store
+        try:
+            await check(store)
+        finally:
+            close = getattr(store, "aclose", None)
+            if close is not None:
+                await close()
+
+
+__all__ = ["CONFORMANCE_CHECKS", "ConformanceCheck", "message", "run_conformance"]
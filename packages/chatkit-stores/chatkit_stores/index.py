@@ -0,0 +1,114 @@
+"""Sorted id index shared by the in-memory store backends."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import count
+from typing import Dict, Generic, List, Tuple, TypeVar, cast
+
+_T = TypeVar("_T")
+_SortKey = Tuple[datetime, int]
+
+
+class OrderedIndex(Generic[_T]):
+    """Entries kept sorted by ``(created_at, insertion order)`` with an id lookup.
+
+    Cursor pagination bisects to the ``after`` entry instead of sorting and
+    scanning the whole collection, so a page costs ``O(log n + limit)``.
+    Lookups and in-place updates by id are ``O(1)`` and entries created in
+    order are appended. Removals leave a tombstone in the ordering instead of
+    shifting it; tombstones are compacted once they make up half of it, which
+    keeps deletes amortised ``O(log n)`` rather than ``O(n)``.
+    """
+
+    _COMPACT_MIN_TOMBSTONES = 32
+
+    def __init__(self) -> None:
+        self._keys: List[_SortKey] = []
+        self._ids: List[str | None] = []
+        self._entries: Dict[str, Tuple[_SortKey, _T]] = {}
+        self._seq = count()
+        self._tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._entries
+
+    def get(self, entry_id: str) -> _T | None:
+        entry = self._entries.get(entry_id)
+        return entry[1] if entry is not None else None
+
+    def upsert(self, entry_id: str, created_at: datetime, value: _T) -> None:
+        existing = self._entries.get(entry_id)
+        if existing is not None:
+            key = existing[0]
+            if key[0] == created_at:
+                self._entries[entry_id] = (key, value)
+                return
+            self._remove_key(key)
+        key = (created_at, next(self._seq))
+        if not self._keys or self._keys[-1] <= key:
+            self._keys.append(key)
+            self._ids.append(entry_id)
+        else:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, entry_id)
+        self._entries[entry_id] = (key, value)
+
+    def remove(self, entry_id: str) -> _T | None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return None
+        self._remove_key(entry[0])
+        return entry[1]
+
+    def _remove_key(self, key: _SortKey) -> None:
+        self._ids[bisect_left(self._keys, key)] = None
+        self._tombstones += 1
+        if self._tombstones >= self._COMPACT_MIN_TOMBSTONES and self._tombstones * 2 >= len(
+            self._keys
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        live = [
+            (key, entry_id) for key, entry_id in zip(self._keys, self._ids) if entry_id is not None
+        ]
+        self._keys = [key for key, _ in live]
+        self._ids = [entry_id for _, entry_id in live]
+        self._tombstones = 0
+
+    def _live_ids(self, start: int, stop: int, step: int, wanted: int) -> List[str]:
+        if not self._tombstones:
+            if step > 0:
+                return cast(List[str], self._ids[start : min(stop, start + wanted)])
+            return cast(List[str], self._ids[max(stop + 1, start - wanted + 1) : start + 1][::-1])
+        ids: List[str] = []
+        for position in range(start, stop, step):
+            entry_id = self._ids[position]
+            if entry_id is not None:
+                ids.append(entry_id)
+                if len(ids) == wanted:
+                    break
+        return ids
+
+    def page(self, after: str | None, limit: int, order: str) -> Tuple[List[_T], bool]:
+        """Return up to ``limit`` values following ``after`` and a ``has_more`` flag."""
+
+        anchor = self._entries.get(after) if after else None
+        if order == "desc":
+            end = bisect_left(self._keys, anchor[0]) if anchor else len(self._keys)
+            ids = self._live_ids(end - 1, -1, -1, limit + 1)
+        else:
+            start = bisect_right(self._keys, anchor[0]) if anchor else 0
+            ids = self._live_ids(start, len(self._keys), 1, limit + 1)
+
+        has_more = len(ids) > limit
+        return [self._entries[entry_id][1] for entry_id in ids[:limit]], has_more
+
+
+__all__ = ["OrderedIndex"]
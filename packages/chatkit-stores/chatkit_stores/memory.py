@@ -0,0 +1,325 @@
+"""In-memory ChatKit store with indexed pagination and bounded residency."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict
+
+from chatkit.store import NotFoundError, Store
+from chatkit.types import Attachment, Page, Thread, ThreadItem, ThreadMetadata
+
+from .index import OrderedIndex
+
+
+@dataclass
+class _ThreadState:
+    thread: ThreadMetadata
+    items: OrderedIndex[ThreadItem] = field(default_factory=OrderedIndex)
+    item_bytes: Dict[str, int] = field(default_factory=dict)
+    bytes: int = 0
+    owner_id: Any = None
+
+
+@dataclass(slots=True)
+class MemoryStoreStats:
+    evicted_threads: int = 0
+    evicted_items: int = 0
+    spilled_items: int = 0
+
+
+def _thread_sort_key(thread: ThreadMetadata) -> datetime:
+    return thread.created_at or datetime.min
+
+
+def _item_size(item: ThreadItem) -> int:
+    return len(item.model_dump_json())
+
+
+class MemoryStore(Store[dict[str, Any]]):
+    """Simple in-memory store compatible with the ChatKit server interface.
+
+    Thread items are stored as private snapshots: every write copies the
+    caller's item once and replaces the whole entry, and a snapshot is never
+    modified afterwards. Reads return deep copies by default because the
+    ChatKit server edits loaded items in place (for example when it records
+    client tool output). Callers that treat loaded items as read-only (copy
+    before editing, then ``save_item``) can pass ``copy_on_read=False`` to
+    receive the snapshots themselves. Thread metadata is small and commonly
+    edited by the ChatKit server, so it is always copied.
+
+    Resident memory is bounded by ``max_threads``, ``max_items_per_thread``,
+    ``max_bytes`` (serialized item size) and ``idle_ttl`` seconds without
+    access; a limit of zero disables it. Limits are enforced on writes: the
+    oldest items of an oversized thread and the least recently used threads
+    are evicted and handed to ``_on_items_evicted`` so subclasses can spill
+    them to durable storage.
+    """
+
+    def __init__(
+        self,
+        *,
+        copy_on_read: bool = True,
+        max_threads: int = 0,
+        max_items_per_thread: int = 0,
+        max_bytes: int = 0,
+        idle_ttl: float = 0,
+    ) -> None:
+        self._threads: OrderedIndex[_ThreadState] = OrderedIndex()
+        self._copy_on_read = copy_on_read
+        self._max_threads = max_threads
+        self._max_items_per_thread = max_items_per_thread
+        self._max_bytes = max_bytes
+        self._idle_ttl = idle_ttl
+        # thread_id -> last access (monotonic), least recently used first.
+        self._recency: OrderedDict[str, float] = OrderedDict()
+        self._item_count = 0
+        self._bytes = 0
+        self.stats = MemoryStoreStats()
+        # Attachments intentionally unsupported; use a real store that enforces auth.
+
+    @staticmethod
+    def _coerce_thread_metadata(thread: ThreadMetadata | Thread) -> ThreadMetadata:
+        """Return thread metadata without any embedded items (openai-chatkit>=1.0)."""
+        has_items = isinstance(thread, Thread) or "items" in getattr(
+            thread, "model_fields_set", set()
+        )
+        if not has_items:
+            return thread.model_copy(deep=True)
+
+        data = thread.model_dump()
+        data.pop("items", None)
+        return ThreadMetadata(**data)
+
+    def _view(self, item: ThreadItem) -> ThreadItem:
+        return item.model_copy(deep=True) if self._copy_on_read else item
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "threads": len(self._threads),
+            "items": self._item_count,
+            "bytes": self._bytes,
+            "evicted_threads": self.stats.evicted_threads,
+            "evicted_items": self.stats.evicted_items,
+            "spilled_items": self.stats.spilled_items,
+        }
+
+    # -- Subclass hooks --------------------------------------------------
+    async def _on_item_written(
+        self, thread_id: str, item: ThreadItem, context: dict[str, Any]
+    ) -> None:
+        """Called after ``item`` was added or saved."""
+
+    def _on_item_deleted(self, thread_id: str, item_id: str) -> None:
+        """Called after ``item_id`` was deleted from ``thread_id``."""
+
+    def _on_thread_discarded(self, thread_id: str) -> None:
+        """Called after a thread was deleted or evicted (after any spill)."""
+
+    async def _on_items_evicted(
+        self, thread_id: str, owner_id: Any, items: list[ThreadItem]
+    ) -> None:
+        """Called with items evicted to honour the limits, oldest first."""
+
+    # -- Thread metadata -------------------------------------------------
+    async def load_thread(self, thread_id: str, context: dict[str, Any]) -> ThreadMetadata:
+        state = self._state(thread_id)
+        if not state:
+            raise NotFoundError(f"Thread {thread_id} not found")
+        return self._coerce_thread_metadata(state.thread)
+
+    async def save_thread(self, thread: ThreadMetadata, context: dict[str, Any]) -> None:
+        metadata = self._coerce_thread_metadata(thread)
+        state = self._threads.get(thread.id)
+        if state:
+            state.thread = metadata
+        else:
+            state = _ThreadState(thread=metadata)
+        self._threads.upsert(thread.id, _thread_sort_key(metadata), state)
+        self._touch(thread.id, state, context)
+        await self._enforce_limits(thread.id)
+
+    async def load_threads(
+        self,
+        limit: int,
+        after: str | None,
+        order: str,
+        context: dict[str, Any],
+    ) -> Page[ThreadMetadata]:
+        states, has_more = self._threads.page(after, limit, order)
+        slice_threads = [self._coerce_thread_metadata(state.thread) for state in states]
+        next_after = slice_threads[-1].id if has_more and slice_threads else None
+        return Page(
+            data=slice_threads,
+            has_more=has_more,
+            after=next_after,
+        )
+
+    async def delete_thread(self, thread_id: str, context: dict[str, Any]) -> None:
+        self._discard_thread(thread_id)
+        self._on_thread_discarded(thread_id)
+
+    # -- Thread items ----------------------------------------------------
+    def _state(self, thread_id: str) -> _ThreadState | None:
+        state = self._threads.get(thread_id)
+        if state is not None:
+            self._touch(thread_id, state)
+        return state
+
+    def _state_for_write(self, thread_id: str, context: dict[str, Any]) -> _ThreadState:
+        state = self._threads.get(thread_id)
+        if state is None:
+            state = _ThreadState(
+                thread=ThreadMetadata(id=thread_id, created_at=datetime.utcnow()),
+            )
+            self._threads.upsert(thread_id, _thread_sort_key(state.thread), state)
+        self._touch(thread_id, state, context)
+        return state
+
+    def _touch(
+        self, thread_id: str, state: _ThreadState, context: dict[str, Any] | None = None
+    ) -> None:
+        self._recency[thread_id] = time.monotonic()
+        self._recency.move_to_end(thread_id)
+        owner_id = getattr((context or {}).get("user"), "id", None)
+        if owner_id is not None:
+            state.owner_id = owner_id
+
+    async def load_thread_items(
+        self,
+        thread_id: str,
+        after: str | None,
+        limit: int,
+        order: str,
+        context: dict[str, Any],
+    ) -> Page[ThreadItem]:
+        state = self._state(thread_id)
+        if state is None:
+            return Page(data=[], has_more=False, after=None)
+        page, has_more = state.items.page(after, limit, order)
+        slice_items = [self._view(item) for item in page]
+        next_after = slice_items[-1].id if has_more and slice_items else None
+        return Page(data=slice_items, has_more=has_more, after=next_after)
+
+    async def add_thread_item(
+        self, thread_id: str, item: ThreadItem, context: dict[str, Any]
+    ) -> None:
+        await self.save_item(thread_id, item, context)
+
+    async def save_item(self, thread_id: str, item: ThreadItem, context: dict[str, Any]) -> None:
+        state = self._state_for_write(thread_id, context)
+        snapshot = item.model_copy(deep=True)
+        size = _item_size(snapshot)
+        previous = state.item_bytes.get(item.id)
+        state.items.upsert(item.id, item.created_at, snapshot)
+        state.item_bytes[item.id] = size
+        state.bytes += size - (previous or 0)
+        self._bytes += size - (previous or 0)
+        if previous is None:
+            self._item_count += 1
+        await self._on_item_written(thread_id, item, context)
+        await self._enforce_limits(thread_id)
+
+    async def load_item(self, thread_id: str, item_id: str, context: dict[str, Any]) -> ThreadItem:
+        state = self._state(thread_id)
+        item = state.items.get(item_id) if state is not None else None
+        if item is None:
+            raise NotFoundError(f"Item {item_id} not found")
+        return self._view(item)
+
+    async def delete_thread_item(
+        self, thread_id: str, item_id: str, context: dict[str, Any]
+    ) -> None:
+        state = self._state(thread_id)
+        if state is not None:
+            self._drop_item(state, item_id)
+        self._on_item_deleted(thread_id, item_id)
+
+    def _drop_item(self, state: _ThreadState, item_id: str) -> ThreadItem | None:
+        item = state.items.remove(item_id)
+        size = state.item_bytes.pop(item_id, None)
+        if size is not None:
+            state.bytes -= size
+            self._bytes -= size
+            self._item_count -= 1
+        return item
+
+    def _discard_thread(self, thread_id: str) -> _ThreadState | None:
+        state = self._threads.remove(thread_id)
+        self._recency.pop(thread_id, None)
+        if state is not None:
+            self._bytes -= state.bytes
+            self._item_count -= len(state.items)
+        return state
+
+    # -- Eviction --------------------------------------------------------
+    async def _enforce_limits(self, active_thread_id: str) -> None:
+        """Evict until every limit holds again, then hand evicted items to the spill hook."""
+
+        spills: list[tuple[str, Any, list[ThreadItem]]] = []
+        discarded: list[str] = []
+
+        state = self._threads.get(active_thread_id)
+        if state is not None and 0 < self._max_items_per_thread < len(state.items):
+            excess = len(state.items) - self._max_items_per_thread
+            oldest, _ = state.items.page(None, excess, "asc")
+            for item in oldest:
+                self._drop_item(state, item.id)
+            self.stats.evicted_items += len(oldest)
+            spills.append((active_thread_id, state.owner_id, oldest))
+
+        now = time.monotonic()
+        while self._recency:
+            thread_id, last_used = next(iter(self._recency.items()))
+            over_limit = (
+                (0 < self._max_threads < len(self._recency))
+                or (0 < self._max_bytes < self._bytes)
+                or (0 < self._idle_ttl < now - last_used)
+            )
+            if not over_limit or thread_id == active_thread_id:
+                break
+            evicted = self._discard_thread(thread_id)
+            self.stats.evicted_threads += 1
+            discarded.append(thread_id)
+            if evicted is not None and len(evicted.items):
+                self.stats.evicted_items += len(evicted.items)
+                items, _ = evicted.items.page(None, len(evicted.items), "asc")
+                spills.append((thread_id, evicted.owner_id, items))
+
+        for thread_id, owner_id, items in spills:
+            await self._on_items_evicted(thread_id, owner_id, items)
+        for thread_id in discarded:
+            self._on_thread_discarded(thread_id)
+
+    # -- Files -----------------------------------------------------------
+    # These methods are not currently used but required to be compatible with the Store interface.
+
+    async def save_attachment(
+        self,
+        attachment: Attachment,
+        context: dict[str, Any],
+    ) -> None:
+        raise NotImplementedError(
+            "MemoryStore does not persist attachments. Provide a Store implementation "
+            "that enforces authentication and authorization before enabling uploads."
+        )
+
+    async def load_attachment(
+        self,
+        attachment_id: str,
+        context: dict[str, Any],
+    ) -> Attachment:
+        raise NotImplementedError(
+            "MemoryStore does not load attachments. Provide a Store implementation "
+            "that enforces authentication and authorization before enabling uploads."
+        )
+
+    async def delete_attachment(self, attachment_id: str, context: dict[str, Any]) -> None:
+        raise NotImplementedError(
+            "MemoryStore does not delete attachments because they are never stored."
+        )
+
+
+__all__ = ["MemoryStore", "MemoryStoreStats"]
@@ -0,0 +1,417 @@
+"""Durable single-node ChatKit store on SQLite in WAL mode."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, Sequence
+
+import aiosqlite
+from chatkit.store import NotFoundError, Store
+from chatkit.types import Attachment, Page, Thread, ThreadItem, ThreadMetadata
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+_thread_item_adapter: TypeAdapter[ThreadItem] = TypeAdapter(ThreadItem)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS chatkit_threads (
+        id TEXT PRIMARY KEY,
+        owner_id TEXT,
+        created_at REAL NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_chatkit_threads_created
+        ON chatkit_threads (created_at, id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_chatkit_threads_owner_created
+        ON chatkit_threads (owner_id, created_at, id)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chatkit_thread_items (
+        id TEXT PRIMARY KEY,
+        thread_id TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    # Covers the keyset cursor and ordering of load_thread_items, so a page is
+    # one index range scan plus a rowid fetch per returned row.
+    """
+    CREATE INDEX IF NOT EXISTS ix_chatkit_thread_items_thread_created
+        ON chatkit_thread_items (thread_id, created_at, id)
+    """,
+)
+
+# Statements are constant strings so sqlite3's per-connection statement cache
+# prepares each of them once and reuses the compiled program afterwards.
+_UPSERT_THREAD = """
+    INSERT INTO chatkit_threads (id, owner_id, created_at, payload) VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET created_at = excluded.created_at, payload = excluded.payload
+"""
+_ENSURE_THREAD = """
+    INSERT INTO chatkit_threads (id, owner_id, created_at, payload) VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO NOTHING
+"""
+_UPSERT_ITEM = """
+    INSERT INTO chatkit_thread_items (id, thread_id, created_at, payload) VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        thread_id = excluded.thread_id,
+        created_at = excluded.created_at,
+        payload = excluded.payload
+"""
+_SELECT_THREAD = "SELECT owner_id, payload FROM chatkit_threads WHERE id = ?"
+_SELECT_ITEM = "SELECT payload FROM chatkit_thread_items WHERE id = ? AND thread_id = ?"
+_DELETE_ITEM = "DELETE FROM chatkit_thread_items WHERE id = ? AND thread_id = ?"
+_DELETE_THREAD_ITEMS = "DELETE FROM chatkit_thread_items WHERE thread_id = ?"
+_DELETE_THREAD = "DELETE FROM chatkit_threads WHERE id = ?"
+
+
+def _page_query(table: str, scope: str, descending: bool, anchored: bool) -> str:
+    direction, comparison = ("DESC", "<") if descending else ("ASC", ">")
+    conditions = [scope] if scope else []
+    if anchored:
+        conditions.append(f"(created_at, id) {comparison} (?, ?)")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return (
+        f"SELECT payload FROM {table} {where} "
+        f"ORDER BY created_at {direction}, id {direction} LIMIT ?"
+    )
+
+
+# (descending, anchored) -> statement; built once so every page reuses a cached statement.
+_ITEM_PAGES = {
+    (descending, anchored): _page_query(
+        "chatkit_thread_items", "thread_id = ?", descending, anchored
+    )
+    for descending in (False, True)
+    for anchored in (False, True)
+}
+# (owner scoped, descending, anchored) -> statement.
+_THREAD_PAGES = {
+    (scoped, descending, anchored): _page_query(
+        "chatkit_threads", "owner_id = ?" if scoped else "", descending, anchored
+    )
+    for scoped in (False, True)
+    for descending in (False, True)
+    for anchored in (False, True)
+}
+_ITEM_ANCHOR = "SELECT created_at, id FROM chatkit_thread_items WHERE id = ? AND thread_id = ?"
+_THREAD_ANCHOR = "SELECT created_at, id FROM chatkit_threads WHERE id = ?"
+
+
+@dataclass(slots=True)
+class _PendingItem:
+    thread_id: str
+    owner_id: str | None
+    created_at: float
+    payload: str
+
+
+def _timestamp(value: datetime | None) -> float:
+    """Sortable epoch seconds; naive datetimes are treated as UTC like the Postgres store."""
+
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _owner_id(context: dict[str, Any]) -> str | None:
+    owner_id = getattr(context.get("user"), "id", None)
+    return None if owner_id is None else str(owner_id)
+
+
+def _thread_payload(thread: ThreadMetadata | Thread) -> str:
+    return thread.model_dump_json(exclude={"items"})
+
+
+class SQLiteStore(Store[dict[str, Any]]):
+    """ChatKit store persisting threads and items to a local SQLite database.
+
+    Meant for single-node deployments that need history to survive restarts
+    without running Postgres. The database runs in WAL mode with
+    ``synchronous=NORMAL``, so readers never block the writer and a commit is
+    one append to the write-ahead log. Item writes are buffered like the
+    Postgres store's and flushed in one transaction once ``batch_size`` items
+    are pending or ``flush_interval`` seconds have passed; reads flush first so
+    callers observe their own writes, and ``aclose`` flushes before closing.
+    Threads are scoped to ``context["user"].id`` when one is present.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        cache_size_kib: int = 65_536,
+    ) -> None:
+        self._path = path
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._cache_size_kib = cache_size_kib
+        self._db: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+        # Serialises every write on the shared autocommit connection, so a lone
+        # statement never lands inside another caller's transaction.
+        self._write_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._pending: dict[str, _PendingItem] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+
+    # -- Connection ------------------------------------------------------
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._db is not None:
+            return self._db
+        async with self._connect_lock:
+            if self._db is None:
+                db = await aiosqlite.connect(self._path, isolation_level=None, cached_statements=64)
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute("PRAGMA synchronous=NORMAL")
+                await db.execute("PRAGMA temp_store=MEMORY")
+                await db.execute("PRAGMA busy_timeout=5000")
+                await db.execute(f"PRAGMA cache_size=-{int(self._cache_size_kib)}")
+                for statement in _SCHEMA:
+                    await db.execute(statement)
+                self._db = db
+        return self._db
+
+    async def _transaction(self, steps: Iterable[tuple[str, Sequence[Sequence[Any]]]]) -> None:
+        """Run each ``(sql, rows)`` step with ``executemany`` inside one transaction."""
+
+        db = await self._connection()
+        async with self._write_lock:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, rows in steps:
+                    if rows:
+                        await db.executemany(sql, rows)
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+            await db.execute("COMMIT")
+
+    async def _fetchall(self, sql: str, params: Sequence[Any]) -> list[Any]:
+        # One hop to the connection thread instead of execute + fetch + close.
+        db = await self._connection()
+        return list(await db.execute_fetchall(sql, params))
+
+    async def _fetchone(self, sql: str, params: Sequence[Any]) -> Any:
+        rows = await self._fetchall(sql, params)
+        return rows[0] if rows else None
+
+    async def _keyset_page(
+        self,
+        statements: dict[Any, str],
+        scope_key: tuple[Any, ...],
+        scope_params: Sequence[Any],
+        anchor_sql: str,
+        anchor_params: Sequence[Any] | None,
+        limit: int,
+        order: str,
+    ) -> tuple[list[str], bool]:
+        descending = order == "desc"
+        anchor = await self._fetchone(anchor_sql, anchor_params) if anchor_params else None
+        params = [*scope_params]
+        if anchor is not None:
+            params.extend(anchor)
+        params.append(limit + 1)
+        sql = statements[(*scope_key, descending, anchor is not None)]
+        rows = await self._fetchall(sql, params)
+        return [row[0] for row in rows[:limit]], len(rows) > limit
+
+    # -- Thread metadata -------------------------------------------------
+    async def load_thread(self, thread_id: str, context: dict[str, Any]) -> ThreadMetadata:
+        owner_id = _owner_id(context)
+        row = await self._fetchone(_SELECT_THREAD, (thread_id,))
+        if row is None or (owner_id is not None and row[0] not in {None, owner_id}):
+            raise NotFoundError(f"Thread {thread_id} not found")
+        return ThreadMetadata.model_validate_json(row[1])
+
+    async def save_thread(self, thread: ThreadMetadata, context: dict[str, Any]) -> None:
+        row = (
+            thread.id,
+            _owner_id(context),
+            _timestamp(thread.created_at),
+            _thread_payload(thread),
+        )
+        await self._transaction([(_UPSERT_THREAD, [row])])
+
+    async def load_threads(
+        self,
+        limit: int,
+        after: str | None,
+        order: str,
+        context: dict[str, Any],
+    ) -> Page[ThreadMetadata]:
+        owner_id = _owner_id(context)
+        payloads, has_more = await self._keyset_page(
+            _THREAD_PAGES,
+            (owner_id is not None,),
+            [owner_id] if owner_id is not None else [],
+            _THREAD_ANCHOR,
+            (after,) if after else None,
+            limit,
+            order,
+        )
+        threads = [ThreadMetadata.model_validate_json(payload) for payload in payloads]
+        next_after = threads[-1].id if has_more and threads else None
+        return Page(data=threads, has_more=has_more, after=next_after)
+
+    async def delete_thread(self, thread_id: str, context: dict[str, Any]) -> None:
+        for item_id, pending in list(self._pending.items()):
+            if pending.thread_id == thread_id:
+                del self._pending[item_id]
+        await self._transaction(
+            [(_DELETE_THREAD_ITEMS, [(thread_id,)]), (_DELETE_THREAD, [(thread_id,)])]
+        )
+
+    # -- Thread items ----------------------------------------------------
+    async def load_thread_items(
+        self,
+        thread_id: str,
+        after: str | None,
+        limit: int,
+        order: str,
+        context: dict[str, Any],
+    ) -> Page[ThreadItem]:
+        await self.flush()
+        payloads, has_more = await self._keyset_page(
+            _ITEM_PAGES,
+            (),
+            [thread_id],
+            _ITEM_ANCHOR,
+            (after, thread_id) if after else None,
+            limit,
+            order,
+        )
+        items = [_thread_item_adapter.validate_json(payload) for payload in payloads]
+        next_after = items[-1].id if has_more and items else None
+        return Page(data=items, has_more=has_more, after=next_after)
+
+    async def add_thread_item(
+        self, thread_id: str, item: ThreadItem, context: dict[str, Any]
+    ) -> None:
+        await self._enqueue(thread_id, item, context)
+
+    async def save_item(self, thread_id: str, item: ThreadItem, context: dict[str, Any]) -> None:
+        await self._enqueue(thread_id, item, context)
+
+    async def load_item(self, thread_id: str, item_id: str, context: dict[str, Any]) -> ThreadItem:
+        pending = self._pending.get(item_id)
+        if pending is not None and pending.thread_id == thread_id:
+            return _thread_item_adapter.validate_json(pending.payload)
+
+        row = await self._fetchone(_SELECT_ITEM, (item_id, thread_id))
+        if row is None:
+            raise NotFoundError(f"Item {item_id} not found")
+        return _thread_item_adapter.validate_json(row[0])
+
+    async def delete_thread_item(
+        self, thread_id: str, item_id: str, context: dict[str, Any]
+    ) -> None:
+        pending = self._pending.get(item_id)
+        if pending is not None and pending.thread_id == thread_id:
+            del self._pending[item_id]
+        await self._transaction([(_DELETE_ITEM, [(item_id, thread_id)])])
+
+    # -- Write batching --------------------------------------------------
+    async def _enqueue(self, thread_id: str, item: ThreadItem, context: dict[str, Any]) -> None:
+        self._pending[item.id] = _PendingItem(
+            thread_id=thread_id,
+            owner_id=_owner_id(context),
+            created_at=_timestamp(item.created_at),
+            payload=item.model_dump_json(),
+        )
+        if len(self._pending) >= self._batch_size or self._flush_interval <= 0:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        try:
+            await self.flush()
+        except Exception:  # pragma: no cover - retried on the next write or read
+            logger.exception("Failed to flush buffered ChatKit items")
+
+    async def flush(self) -> None:
+        """Write all buffered items in one transaction."""
+
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            await self._write_items(batch)
+
+    async def _write_items(self, batch: dict[str, _PendingItem]) -> None:
+        now = datetime.now(timezone.utc)
+        threads = {
+            pending.thread_id: (
+                pending.thread_id,
+                pending.owner_id,
+                now.timestamp(),
+                _thread_payload(ThreadMetadata(id=pending.thread_id, created_at=now)),
+            )
+            for pending in batch.values()
+        }
+        try:
+            await self._transaction(
+                [
+                    (_ENSURE_THREAD, list(threads.values())),
+                    (
+                        _UPSERT_ITEM,
+                        [
+                            (item_id, pending.thread_id, pending.created_at, pending.payload)
+                            for item_id, pending in batch.items()
+                        ],
+                    ),
+                ]
+            )
+        except BaseException:
+            for item_id, pending in batch.items():
+                self._pending.setdefault(item_id, pending)
+            raise
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"pending_items": len(self._pending)}
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self._db is not None:
+            db, self._db = self._db, None
+            await db.close()
+
+    # -- Files -----------------------------------------------------------
+    async def save_attachment(
+        self,
+        attachment: Attachment,
+        context: dict[str, Any],
+    ) -> None:
+        raise NotImplementedError("SQLiteStore does not persist attachments.")
+
+    async def load_attachment(
+        self,
+        attachment_id: str,
+        context: dict[str, Any],
+    ) -> Attachment:
+        raise NotImplementedError("SQLiteStore does not load attachments.")
+
+    async def delete_attachment(self, attachment_id: str, context: dict[str, Any]) -> None:
+        raise NotImplementedError(
+            "SQLiteStore does not delete attachments because they are never stored."
+        )
+
+
+__all__ = ["SQLiteStore"]
@@ -0,0 +1,32 @@
+"""Run the shared conformance checks against every built-in backend."""
+
+from __future__ import annotations
+
+import pytest
+
+from chatkit_stores import available_backends, create_store
+from chatkit_stores.conformance import CONFORMANCE_CHECKS, ConformanceCheck
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("check", CONFORMANCE_CHECKS, ids=lambda check: check.__name__)
+async def test_backend_conforms(backend: str, check: ConformanceCheck) -> None:
+    store = create_store(backend)
+    try:
+        await check(store)
+    finally:
+        close = getattr(store, "aclose", None)
+        if close is not None:
+            await close()
+
+
+@pytest.mark.parametrize("check", CONFORMANCE_CHECKS, ids=lambda check: check.__name__)
+async def test_shared_snapshot_memory_store_conforms(check: ConformanceCheck) -> None:
+    await check(create_store("memory", copy_on_read=False))
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        create_store("carrier-pigeon")
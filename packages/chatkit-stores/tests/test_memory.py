@@ -0,0 +1,71 @@
+"""Tests for the shared in-memory store's eviction and hooks."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from chatkit.store import NotFoundError
+from chatkit.types import ThreadItem
+
+from chatkit_stores import MemoryStore
+from chatkit_stores.conformance import message
+
+pytestmark = pytest.mark.anyio
+
+
+class _SpillingStore(MemoryStore):
+    def __init__(self, **limits: Any) -> None:
+        super().__init__(**limits)
+        self.spilled: list[tuple[str, Any, list[str]]] = []
+        self.discarded: list[str] = []
+
+    async def _on_items_evicted(
+        self, thread_id: str, owner_id: Any, items: list[ThreadItem]
+    ) -> None:
+        self.spilled.append((thread_id, owner_id, [item.id for item in items]))
+
+    def _on_thread_discarded(self, thread_id: str) -> None:
+        self.discarded.append(thread_id)
+
+
+async def test_oldest_items_are_trimmed_per_thread() -> None:
+    store = _SpillingStore(max_items_per_thread=2)
+    owner = SimpleNamespace(id="user_1")
+    for index in range(4):
+        await store.add_thread_item("thr_1", message("thr_1", index), {"user": owner})
+
+    page = await store.load_thread_items("thr_1", None, 10, "asc", {})
+    assert [item.id for item in page.data] == ["msg_0002", "msg_0003"]
+    assert store.spilled == [
+        ("thr_1", "user_1", ["msg_0000"]),
+        ("thr_1", "user_1", ["msg_0001"]),
+    ]
+    assert store.snapshot()["items"] == 2
+
+
+async def test_least_recently_used_thread_is_evicted() -> None:
+    store = _SpillingStore(max_threads=2)
+    await store.add_thread_item("thr_a", message("thr_a", 0), {})
+    await store.add_thread_item("thr_b", message("thr_b", 0), {})
+    await store.load_item("thr_a", "msg_0000", {})
+    await store.add_thread_item("thr_c", message("thr_c", 0), {})
+
+    with pytest.raises(NotFoundError):
+        await store.load_thread("thr_b", {})
+    assert store.spilled == [("thr_b", None, ["msg_0000"])]
+    assert store.discarded == ["thr_b"]
+    assert store.snapshot()["evicted_threads"] == 1
+
+
+async def test_idle_threads_expire_on_the_next_write(monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr("chatkit_stores.memory.time.monotonic", lambda: clock[0])
+    store = _SpillingStore(idle_ttl=60)
+    await store.add_thread_item("thr_a", message("thr_a", 0), {})
+    clock[0] += 61
+    await store.add_thread_item("thr_b", message("thr_b", 0), {})
+
+    assert store.discarded == ["thr_a"]
+    assert store.snapshot()["threads"] == 1
@@ -0,0 +1,69 @@
+"""Tests for the SQLite store's durability, batching and owner scoping."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from chatkit.store import NotFoundError
+from chatkit.types import ThreadMetadata
+
+from chatkit_stores.conformance import EPOCH, message
+
+pytest.importorskip("aiosqlite")
+
+from chatkit_stores.sqlite import SQLiteStore  # noqa: E402
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_threads_and_items_survive_a_restart(tmp_path) -> None:
+    path = str(tmp_path / "chatkit.db")
+    store = SQLiteStore(path, flush_interval=60)
+    await store.save_thread(ThreadMetadata(id="thr_1", created_at=EPOCH, title="kept"), {})
+    for index in range(3):
+        await store.add_thread_item("thr_1", message("thr_1", index), {})
+    assert store.snapshot() == {"pending_items": 3}
+    await store.aclose()
+
+    reopened = SQLiteStore(path)
+    try:
+        assert (await reopened.load_thread("thr_1", {})).title == "kept"
+        page = await reopened.load_thread_items("thr_1", None, 10, "asc", {})
+        assert [item.id for item in page.data] == ["msg_0000", "msg_0001", "msg_0002"]
+        journal_mode = await reopened._fetchone("PRAGMA journal_mode", ())
+        assert journal_mode[0] == "wal"
+    finally:
+        await reopened.aclose()
+
+
+async def test_buffered_items_are_readable_before_the_flush() -> None:
+    store = SQLiteStore(batch_size=100, flush_interval=60)
+    try:
+        await store.add_thread_item("thr_1", message("thr_1", 0, text="draft"), {})
+        assert (await store.load_item("thr_1", "msg_0000", {})).content[0].text == "draft"
+        assert store.snapshot()["pending_items"] == 1
+
+        page = await store.load_thread_items("thr_1", None, 10, "asc", {})
+        assert [item.id for item in page.data] == ["msg_0000"]
+        assert store.snapshot()["pending_items"] == 0
+        # Writing an item creates its thread, as in the other stores.
+        await store.load_thread("thr_1", {})
+    finally:
+        await store.aclose()
+
+
+async def test_threads_are_scoped_to_their_owner() -> None:
+    store = SQLiteStore()
+    alice, bob = SimpleNamespace(id="user_a"), SimpleNamespace(id="user_b")
+    try:
+        await store.save_thread(ThreadMetadata(id="thr_a", created_at=EPOCH), {"user": alice})
+        await store.save_thread(ThreadMetadata(id="thr_b", created_at=EPOCH), {"user": bob})
+
+        page = await store.load_threads(10, None, "asc", {"user": alice})
+        assert [thread.id for thread in page.data] == ["thr_a"]
+        with pytest.raises(NotFoundError):
+            await store.load_thread("thr_a", {"user": bob})
+        assert len((await store.load_threads(10, None, "asc", {})).data) == 2
+    finally:
+        await store.aclose()